@@ -5,7 +5,6 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 from django.contrib.auth import authenticate
 
@@ -21,6 +20,7 @@ from ..utils import (
     create_success_response,
     create_error_response
 )
+from ..tokens import FilteredRefreshToken
 
 
 class RegisterView(APIView):
@@ -75,7 +75,7 @@ def create_login_response(user):
     Returns:
         Response: Login response with user data and JWT cookies
     """
-    refresh = RefreshToken.for_user(user)
+    refresh = FilteredRefreshToken.for_user(user)
     response = Response(
         {'detail': 'Login successfully!', 'user': UserSerializer(user).data},
         status=status.HTTP_200_OK
@@ -142,7 +142,7 @@ def blacklist_refresh_token(refresh_token):
         refresh_token: JWT refresh token string to blacklist
     """
     if refresh_token:
-        token = RefreshToken(refresh_token)
+        token = FilteredRefreshToken(refresh_token)
         token.blacklist()
 
 
@@ -215,7 +215,7 @@ def process_token_refresh(refresh_token):
         tuple: (Response object or None, Error response or None)
     """
     try:
-        token = RefreshToken(refresh_token)
+        token = FilteredRefreshToken(refresh_token)
         return create_refresh_response(token.access_token), None
     except TokenError:
         error = create_error_response(
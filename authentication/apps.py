@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class AuthenticationConfig(AppConfig):
     name = 'authentication'
+
+    def ready(self):
+        """
+        Connect the user cache invalidation signal handlers.
+        """
+        from . import signals  # noqa: F401
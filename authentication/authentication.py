@@ -1,8 +1,79 @@
 """
 Custom JWT Authentication using HTTP-only cookies.
 """
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+# In-process TTL cache of authenticated users by str(user ID), the
+# form in which the ID is stored in token claims
+_user_cache = OrderedDict()
+_user_cache_lock = threading.Lock()
+
+
+def get_cached_user(user_id):
+    """
+    Get a user from the in-process cache.
+
+    Args:
+        user_id: Primary key of the user
+
+    Returns:
+        User: Copy of the cached user or None if missing or expired
+    """
+    key = str(user_id)
+    with _user_cache_lock:
+        entry = _user_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del _user_cache[key]
+            return None
+        _user_cache.move_to_end(key)
+        return copy.copy(user)
+
+
+def cache_user(user):
+    """
+    Store a user in the in-process cache.
+
+    Args:
+        user: User model instance
+    """
+    if not settings.AUTH_USER_CACHE_TTL:
+        return
+    expires_at = time.monotonic() + settings.AUTH_USER_CACHE_TTL
+    with _user_cache_lock:
+        _user_cache[str(user.pk)] = (expires_at, copy.copy(user))
+        _user_cache.move_to_end(str(user.pk))
+        while len(_user_cache) > settings.AUTH_USER_CACHE_SIZE:
+            _user_cache.popitem(last=False)
+
+
+def invalidate_cached_user(user_id):
+    """
+    Drop a user from the in-process cache.
+
+    Args:
+        user_id: Primary key of the user
+    """
+    with _user_cache_lock:
+        _user_cache.pop(str(user_id), None)
+
+
+def clear_user_cache():
+    """
+    Drop all cached users.
+    """
+    with _user_cache_lock:
+        _user_cache.clear()
 
 
 class CookieJWTAuthentication(JWTAuthentication):
@@ -26,3 +97,23 @@ class CookieJWTAuthentication(JWTAuthentication):
             return self.get_user(validated_token), validated_token
         except InvalidToken:
             return None
+
+    def get_user(self, validated_token):
+        """
+        Get the token's user, from the in-process cache when possible.
+
+        Users are cached for AUTH_USER_CACHE_TTL seconds and dropped
+        when saved or deleted (e.g. deactivated or password changed),
+        so most requests skip the user query.
+
+        Args:
+            validated_token: Validated access token
+
+        Returns:
+            User: Active user the token was issued for
+        """
+        user = get_cached_user(validated_token.get(api_settings.USER_ID_CLAIM))
+        if user is None:
+            user = super().get_user(validated_token)
+            cache_user(user)
+        return user
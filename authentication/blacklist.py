@@ -0,0 +1,218 @@
+"""
+Token blacklist pre-check and pruning.
+Refresh tokens are checked against an in-memory Bloom filter of
+blacklisted JTIs before the blacklist table is queried, so the common
+case of a token that was never blacklisted skips the database. The
+filter has no false negatives for entries it has loaded; it is topped
+up incrementally with rows added since the last refresh.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken
+)
+
+# Rows with IDs just below the highest one loaded are read again, in
+# case concurrent transactions committed them out of ID order
+RELOAD_OVERLAP = 100
+
+_filter_state = {'filter': None, 'last_id': 0, 'refreshed_at': None}
+_filter_lock = threading.Lock()
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter of strings.
+
+    Args:
+        capacity: Expected number of entries
+        error_rate: Target false positive rate at capacity
+    """
+
+    def __init__(self, capacity, error_rate):
+        bits = -capacity * math.log(error_rate) / math.log(2) ** 2
+        self.size = max(8, int(math.ceil(bits)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.capacity = capacity
+        self.count = 0
+
+    def positions(self, value):
+        """
+        Get the bit positions of a value (double hashing).
+
+        Args:
+            value: String to hash
+
+        Returns:
+            list: Bit indexes
+        """
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        """
+        Add a value to the filter unless already present.
+
+        Args:
+            value: String to add
+        """
+        if value in self:
+            return
+        for position in self.positions(value):
+            self.bits[position // 8] |= 1 << position % 8
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(
+            self.bits[position // 8] & 1 << position % 8
+            for position in self.positions(value)
+        )
+
+
+def new_blacklist_filter():
+    """
+    Create an empty filter for the current blacklist.
+
+    It holds BLACKLIST_FILTER_CAPACITY entries or twice the blacklist
+    rows, whichever is more, so a larger blacklist does not leave it
+    over capacity (and rebuilt on every check) right after loading.
+
+    Returns:
+        BloomFilter: Empty filter
+    """
+    rows = BlacklistedToken.objects.count()
+    return BloomFilter(
+        max(settings.BLACKLIST_FILTER_CAPACITY, 2 * rows),
+        settings.BLACKLIST_FILTER_ERROR_RATE
+    )
+
+
+def load_blacklisted(bloom, last_id):
+    """
+    Add blacklist rows newer than last_id to a filter.
+
+    Args:
+        bloom: Filter to add the JTIs to
+        last_id: Highest BlacklistedToken ID already loaded
+
+    Returns:
+        int: Highest BlacklistedToken ID loaded
+    """
+    rows = BlacklistedToken.objects.filter(
+        id__gt=last_id - RELOAD_OVERLAP
+    ).order_by('id')
+    for row_id, jti in rows.values_list('id', 'token__jti').iterator():
+        bloom.add(jti)
+        last_id = max(last_id, row_id)
+    return last_id
+
+
+def is_refresh_due(state, now):
+    """
+    Check whether the filter should be topped up.
+
+    A missing or over-capacity filter is replaced by an empty one,
+    which always needs loading.
+
+    Args:
+        state: Filter state dictionary
+        now: Current time.monotonic() value
+
+    Returns:
+        bool: True if a rebuild or refresh is needed
+    """
+    bloom, refreshed_at = state['filter'], state['refreshed_at']
+    if bloom is None or bloom.count > bloom.capacity:
+        state.update(filter=new_blacklist_filter(), last_id=0)
+        return True
+    return now - refreshed_at >= settings.BLACKLIST_FILTER_REFRESH_SECONDS
+
+
+def refresh_blacklist_filter(force=False):
+    """
+    Top up the filter with newly blacklisted tokens.
+
+    Runs at most every BLACKLIST_FILTER_REFRESH_SECONDS unless forced.
+    Rebuilding an over-capacity filter also drops JTIs of pruned tokens.
+
+    Args:
+        force: Refresh regardless of when the last refresh happened
+
+    Returns:
+        BloomFilter: Current filter
+    """
+    state, now = _filter_state, time.monotonic()
+    with _filter_lock:
+        if is_refresh_due(state, now) or force:
+            state['last_id'] = load_blacklisted(
+                state['filter'], state['last_id']
+            )
+            state['refreshed_at'] = now
+        return state['filter']
+
+
+def might_be_blacklisted(jti):
+    """
+    Check whether a JTI may be in the blacklist table.
+
+    Args:
+        jti: Token ID claim
+
+    Returns:
+        bool: False only if the token is certainly not blacklisted
+            (as of the last refresh)
+    """
+    if not settings.BLACKLIST_FILTER_ENABLED:
+        return True
+    return jti in refresh_blacklist_filter()
+
+
+def remember_blacklisted(jti):
+    """
+    Add a JTI blacklisted by this process to the filter immediately.
+
+    Args:
+        jti: Token ID claim
+    """
+    if settings.BLACKLIST_FILTER_ENABLED:
+        bloom = refresh_blacklist_filter()
+        with _filter_lock:
+            bloom.add(jti)
+
+
+def reset_blacklist_filter():
+    """
+    Drop the filter so the next check reloads it.
+    """
+    with _filter_lock:
+        _filter_state.update(filter=None, last_id=0, refreshed_at=None)
+
+
+def prune_expired_tokens(batch_size):
+    """
+    Delete expired outstanding tokens and their blacklist rows.
+
+    Rows are removed in batches of primary keys so each delete stays
+    short and does not lock the tables for long.
+
+    Args:
+        batch_size: Maximum rows deleted per statement
+
+    Returns:
+        int: Number of outstanding tokens deleted
+    """
+    expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+    deleted = 0
+    while ids := list(expired.values_list('pk', flat=True)[:batch_size]):
+        BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        deleted += OutstandingToken.objects.filter(pk__in=ids).delete()[0]
+    return deleted
@@ -0,0 +1,51 @@
+"""
+Management command to delete expired outstanding and blacklisted tokens.
+Run with: python manage.py prune_token_blacklist --loop --interval 3600
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...blacklist import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = 'Delete expired rows from the token blacklist tables in batches'
+
+    def add_arguments(self, parser):
+        """
+        Add batch size and loop options.
+        """
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.BLACKLIST_PRUNE_BATCH_SIZE,
+            help='Rows deleted per statement'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep pruning every --interval seconds until interrupted'
+        )
+        parser.add_argument(
+            '--interval', type=int, default=settings.BLACKLIST_PRUNE_INTERVAL,
+            help='Seconds between runs in loop mode'
+        )
+
+    def prune(self, batch_size):
+        """
+        Run one pruning pass and report the deleted row count.
+        """
+        deleted = prune_expired_tokens(batch_size)
+        self.stdout.write(f'Deleted {deleted} expired tokens')
+
+    def handle(self, *args, **options):
+        """
+        Prune once, or repeatedly in loop mode.
+        """
+        self.prune(options['batch_size'])
+        try:
+            while options['loop']:
+                time.sleep(options['interval'])
+                self.prune(options['batch_size'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped pruning.')
@@ -0,0 +1,16 @@
+"""
+Signal handlers for authentication app.
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    """
+    Drop a saved, deactivated or deleted user from the auth cache.
+    """
+    invalidate_cached_user(instance.pk)
@@ -294,6 +294,162 @@ class CookieJWTAuthenticationTests(TestCase):
             pass
 
 
+class AuthenticatedUserCacheTests(TestCase):
+    """Tests for the in-process cache of authenticated users."""
+
+    def setUp(self):
+        """Create a user and an empty cache."""
+        from authentication.authentication import clear_user_cache
+        clear_user_cache()
+        self.user = User.objects.create_user(
+            username='cacheuser', password='TestPass123!'
+        )
+        self.token = RefreshToken.for_user(self.user).access_token
+
+    def authenticate(self):
+        """Authenticate a request carrying the access token cookie."""
+        from authentication.authentication import CookieJWTAuthentication
+        from rest_framework.test import APIRequestFactory
+        request = APIRequestFactory().get('/test/')
+        request.COOKIES = {'access_token': str(self.token)}
+        return CookieJWTAuthentication().authenticate(request)
+
+    def test_user_cached_between_requests(self):
+        """Test the user query only runs on the first request."""
+        self.assertEqual(self.authenticate()[0], self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate()[0], self.user)
+
+    def test_deactivated_user_invalidated(self):
+        """Test saving a user drops it so deactivation applies at once."""
+        from rest_framework_simplejwt.exceptions import AuthenticationFailed
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_cache_expires(self):
+        """Test cached users are reloaded after the TTL."""
+        self.authenticate()
+        with self.settings(AUTH_USER_CACHE_TTL=0):
+            from authentication.authentication import clear_user_cache
+            clear_user_cache()
+            self.authenticate()
+            with self.assertNumQueries(1):
+                self.authenticate()
+
+
+class TokenBlacklistFilterTests(TestCase):
+    """Tests for the Bloom filter pre-check of the token blacklist."""
+
+    def setUp(self):
+        """Create a user, a refresh token and an empty filter."""
+        from authentication.blacklist import reset_blacklist_filter
+        reset_blacklist_filter()
+        self.user = User.objects.create_user(
+            username='filteruser', password='TestPass123!'
+        )
+        self.refresh = RefreshToken.for_user(self.user)
+
+    def test_bloom_filter_membership(self):
+        """Test added values are always found and others rarely."""
+        from authentication.blacklist import BloomFilter
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        self.assertTrue(all(f'jti-{i}' in bloom for i in range(1000)))
+        false_hits = sum(f'other-{i}' in bloom for i in range(1000))
+        self.assertLess(false_hits, 50)
+        count = bloom.count
+        bloom.add('jti-0')
+        self.assertEqual(bloom.count, count)
+
+    def test_unlisted_token_skips_blacklist_query(self):
+        """Test a token absent from the filter is not looked up."""
+        from authentication.blacklist import refresh_blacklist_filter
+        from authentication.tokens import FilteredRefreshToken
+        refresh_blacklist_filter(force=True)
+        with self.assertNumQueries(0):
+            FilteredRefreshToken(str(self.refresh))
+
+    def test_blacklisted_token_rejected(self):
+        """Test tokens blacklisted here or elsewhere are rejected."""
+        from authentication.blacklist import refresh_blacklist_filter
+        from authentication.tokens import FilteredRefreshToken
+        from rest_framework_simplejwt.exceptions import TokenError
+        FilteredRefreshToken(str(self.refresh)).blacklist()
+        with self.assertRaises(TokenError):
+            FilteredRefreshToken(str(self.refresh))
+        other = RefreshToken.for_user(self.user)
+        other.blacklist()
+        refresh_blacklist_filter(force=True)
+        with self.assertRaises(TokenError):
+            FilteredRefreshToken(str(other))
+
+    def test_filter_sized_for_large_blacklist(self):
+        """Test a blacklist above capacity is not reloaded every check."""
+        from authentication.blacklist import (
+            might_be_blacklisted, refresh_blacklist_filter
+        )
+        for _ in range(30):
+            RefreshToken.for_user(self.user).blacklist()
+        with self.settings(BLACKLIST_FILTER_CAPACITY=10):
+            self.assertGreaterEqual(
+                refresh_blacklist_filter(force=True).capacity, 60
+            )
+            with self.assertNumQueries(0):
+                for _ in range(3):
+                    might_be_blacklisted('unknown')
+
+    def test_refresh_after_logout_rejected(self):
+        """Test the refresh endpoint rejects a logged out token."""
+        client = APIClient()
+        client.cookies['access_token'] = str(self.refresh.access_token)
+        client.cookies['refresh_token'] = str(self.refresh)
+        client.post('/api/logout/')
+        client.cookies['refresh_token'] = str(self.refresh)
+        response = client.post('/api/token/refresh/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PruneTokenBlacklistTests(TestCase):
+    """Tests for the prune_token_blacklist management command."""
+
+    def create_token(self, jti, days, blacklisted=False):
+        """Create an outstanding token expiring in the given days."""
+        from datetime import timedelta
+        from django.utils import timezone
+        from rest_framework_simplejwt.token_blacklist.models import (
+            BlacklistedToken, OutstandingToken
+        )
+        token = OutstandingToken.objects.create(
+            jti=jti, token=jti,
+            expires_at=timezone.now() + timedelta(days=days)
+        )
+        if blacklisted:
+            BlacklistedToken.objects.create(token=token)
+
+    def test_expired_tokens_deleted_in_batches(self):
+        """Test only expired rows are deleted, across several batches."""
+        from io import StringIO
+        from django.core.management import call_command
+        from rest_framework_simplejwt.token_blacklist.models import (
+            BlacklistedToken, OutstandingToken
+        )
+        for i in range(5):
+            self.create_token(f'old-{i}', -1, blacklisted=i % 2 == 0)
+        self.create_token('live', 1, blacklisted=True)
+        out = StringIO()
+        call_command('prune_token_blacklist', batch_size=2, stdout=out)
+        self.assertIn('Deleted 5 expired tokens', out.getvalue())
+        self.assertEqual(
+            list(OutstandingToken.objects.values_list('jti', flat=True)),
+            ['live']
+        )
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+
 class LogoutErrorHandlingTests(TestCase):
     """Tests for logout error handling."""
 
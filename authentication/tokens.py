@@ -0,0 +1,32 @@
+"""
+Refresh token with a Bloom filter pre-check of the blacklist.
+"""
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .blacklist import might_be_blacklisted, remember_blacklisted
+
+
+class FilteredRefreshToken(RefreshToken):
+    """
+    Refresh token that only queries the blacklist table when the
+    in-memory filter says the token may be blacklisted.
+    """
+
+    def check_blacklist(self):
+        """
+        Raise TokenError if this token is blacklisted.
+        """
+        if might_be_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        """
+        Blacklist this token and add it to this process's filter.
+
+        Returns:
+            tuple: (BlacklistedToken, created)
+        """
+        result = super().blacklist()
+        remember_blacklisted(self.payload[api_settings.JTI_CLAIM])
+        return result
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_asgi_application()
+
+# Optionally load the Whisper model before the first request
+from quizzes.transcription import warm_up_if_configured  # noqa: E402
+
+warm_up_if_configured()
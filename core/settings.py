@@ -184,8 +184,72 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Caches: 'quizzes' holds rendered quiz payloads under keys versioned by
+# their updated_at, so edits are seen by every process. Local memory
+# (LRU, per process) by default; point QUIZ_CACHE_BACKEND/LOCATION at
+# e.g. django.core.cache.backends.redis.RedisCache to share the
+# rendered payloads between processes. 'llm' holds
+# the LLM rate windows and call counters; LLM_RATE_CACHE_BACKEND must be
+# shared (Redis, Memcached) for the rate limits to span processes
+QUIZ_CACHE_ALIAS = 'quizzes'
+LLM_RATE_CACHE_ALIAS = 'llm'
+QUIZ_CACHE_ENABLED = os.getenv('QUIZ_CACHE_ENABLED', 'True') == 'True'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    QUIZ_CACHE_ALIAS: {
+        'BACKEND': os.getenv(
+            'QUIZ_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('QUIZ_CACHE_LOCATION', 'quizzes'),
+        'TIMEOUT': int(os.getenv('QUIZ_CACHE_TIMEOUT', '86400')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('QUIZ_CACHE_MAX_ENTRIES', '5000')),
+        },
+    },
+    LLM_RATE_CACHE_ALIAS: {
+        'BACKEND': os.getenv(
+            'LLM_RATE_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('LLM_RATE_CACHE_LOCATION', 'llm'),
+        'TIMEOUT': None,
+    },
+}
+
+# Quiz list cursor pagination: default and largest page size
+QUIZ_LIST_PAGE_SIZE = int(os.getenv('QUIZ_LIST_PAGE_SIZE', '20'))
+QUIZ_LIST_MAX_PAGE_SIZE = int(os.getenv('QUIZ_LIST_MAX_PAGE_SIZE', '100'))
+
 
 # JWT Settings
+# Authenticated users are cached in-process for this many seconds and
+# dropped on save/delete (0 disables); bounded to AUTH_USER_CACHE_SIZE
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', '60'))
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', '1024'))
+# Refresh tokens are checked against an in-memory Bloom filter of
+# blacklisted JTIs, topped up from the table every few seconds, before
+# the blacklist table is queried. The capacity is a minimum; a larger
+# blacklist gets a filter of twice its size
+BLACKLIST_FILTER_ENABLED = os.getenv(
+    'BLACKLIST_FILTER_ENABLED', 'True'
+) == 'True'
+BLACKLIST_FILTER_REFRESH_SECONDS = float(
+    os.getenv('BLACKLIST_FILTER_REFRESH_SECONDS', '5')
+)
+BLACKLIST_FILTER_CAPACITY = int(
+    os.getenv('BLACKLIST_FILTER_CAPACITY', '100000')
+)
+BLACKLIST_FILTER_ERROR_RATE = float(
+    os.getenv('BLACKLIST_FILTER_ERROR_RATE', '0.001')
+)
+# Defaults of the prune_token_blacklist command
+BLACKLIST_PRUNE_BATCH_SIZE = int(
+    os.getenv('BLACKLIST_PRUNE_BATCH_SIZE', '1000')
+)
+BLACKLIST_PRUNE_INTERVAL = int(os.getenv('BLACKLIST_PRUNE_INTERVAL', '3600'))
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
@@ -217,3 +281,163 @@ JWT_COOKIE_MAX_AGE = 60 * 60 * 24 * 7  # 7 days
 # Gemini API Settings
 # Get your API key from: https://aistudio.google.com/app/apikey
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
+GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.5-flash')
+# Alternative endpoint, e.g. a proxy or a local stand-in for load tests
+GEMINI_BASE_URL = os.getenv('GEMINI_BASE_URL', '')
+# One client is shared per process: request timeout in seconds, maximum
+# concurrent requests (0 = unlimited) and idle keep-alive in seconds
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', '120'))
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '4'))
+GEMINI_KEEPALIVE_SECONDS = float(os.getenv('GEMINI_KEEPALIVE_SECONDS', '60'))
+
+
+# LLM Provider Settings
+# Quiz generation backend: 'gemini', 'openai' (self-hosted server with an
+# OpenAI-compatible API, e.g. llama.cpp or vLLM) or 'fake' (deterministic
+# offline quizzes for load tests)
+LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'gemini')
+LLM_BASE_URL = os.getenv('LLM_BASE_URL', 'http://127.0.0.1:8080/v1')
+LLM_MODEL = os.getenv('LLM_MODEL', 'local-model')
+LLM_API_KEY = os.getenv('LLM_API_KEY', '')
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '300'))
+# Simulated model latency of the fake provider in seconds
+LLM_FAKE_LATENCY = float(os.getenv('LLM_FAKE_LATENCY', '0'))
+# Request JSON constrained to the quiz schema, and replace invalid or
+# missing questions with up to LLM_REPAIR_ATTEMPTS follow-up calls
+LLM_STRUCTURED_OUTPUT = os.getenv('LLM_STRUCTURED_OUTPUT', 'True') == 'True'
+LLM_REPAIR_ATTEMPTS = int(os.getenv('LLM_REPAIR_ATTEMPTS', '2'))
+QUIZ_QUESTION_COUNT = int(os.getenv('QUIZ_QUESTION_COUNT', '10'))
+# Provider quotas per minute shared through the 'llm' cache (0 disables
+# a limit); calls wait for the next minute up to LLM_RATE_MAX_WAIT
+# seconds. Token costs are estimated from the prompt plus
+# LLM_COMPLETION_TOKENS and corrected by the reported usage
+LLM_REQUESTS_PER_MINUTE = int(os.getenv('LLM_REQUESTS_PER_MINUTE', '0'))
+LLM_TOKENS_PER_MINUTE = int(os.getenv('LLM_TOKENS_PER_MINUTE', '0'))
+LLM_COMPLETION_TOKENS = int(os.getenv('LLM_COMPLETION_TOKENS', '1500'))
+LLM_RATE_MAX_WAIT = float(os.getenv('LLM_RATE_MAX_WAIT', '300'))
+# Retries of throttled (429), 5xx and network failures with full-jitter
+# exponential backoff, waiting at least as long as Retry-After
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '3'))
+LLM_RETRY_BASE_SECONDS = float(os.getenv('LLM_RETRY_BASE_SECONDS', '1'))
+LLM_RETRY_MAX_SECONDS = float(os.getenv('LLM_RETRY_MAX_SECONDS', '30'))
+# Send a second request when a call outlasts this percentile of recent
+# latencies (needs LLM_HEDGE_MIN_SAMPLES calls); costs extra quota
+LLM_HEDGE_ENABLED = os.getenv('LLM_HEDGE_ENABLED', 'False') == 'True'
+LLM_HEDGE_PERCENTILE = float(os.getenv('LLM_HEDGE_PERCENTILE', '95'))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv('LLM_HEDGE_MIN_SAMPLES', '20'))
+
+
+# Whisper Settings
+# Model used for transcription; transcripts are cached per model name
+WHISPER_MODEL_NAME = os.getenv('WHISPER_MODEL_NAME', 'base')
+# Load the model when the WSGI/ASGI app starts instead of on first use
+WHISPER_PRELOAD = os.getenv('WHISPER_PRELOAD', 'False') == 'True'
+
+# Shared transcription server ('unix:/path/to.sock' or 'host:port');
+# empty transcribes with an in-process model
+TRANSCRIPTION_SERVER_ADDRESS = os.getenv('TRANSCRIPTION_SERVER_ADDRESS', '')
+TRANSCRIPTION_SERVER_MODELS = int(
+    os.getenv('TRANSCRIPTION_SERVER_MODELS', '2'))
+TRANSCRIPTION_SERVER_TIMEOUT = float(
+    os.getenv('TRANSCRIPTION_SERVER_TIMEOUT', '900'))
+# Use the in-process model when the server cannot be reached
+TRANSCRIPTION_SERVER_FALLBACK = os.getenv(
+    'TRANSCRIPTION_SERVER_FALLBACK', 'True') == 'True'
+
+# Parallel chunked transcription: number of Whisper worker processes
+# (1 disables chunking; run by the transcription server if one is used),
+# chunk length window and overlap in seconds
+TRANSCRIPTION_PARALLELISM = int(os.getenv('TRANSCRIPTION_PARALLELISM', '1'))
+TRANSCRIPTION_CHUNK_MIN_SECONDS = float(
+    os.getenv('TRANSCRIPTION_CHUNK_MIN_SECONDS', '30'))
+TRANSCRIPTION_CHUNK_MAX_SECONDS = float(
+    os.getenv('TRANSCRIPTION_CHUNK_MAX_SECONDS', '60'))
+TRANSCRIPTION_CHUNK_OVERLAP_SECONDS = float(
+    os.getenv('TRANSCRIPTION_CHUNK_OVERLAP_SECONDS', '1'))
+# Torch threads per worker; 0 divides the CPU cores between workers
+TRANSCRIPTION_THREADS_PER_WORKER = int(
+    os.getenv('TRANSCRIPTION_THREADS_PER_WORKER', '0'))
+
+# Audio download profile: 'minimal' picks the smallest audio-only format
+# of at least AUDIO_MIN_BITRATE kbps, 'best' the highest quality one
+AUDIO_FORMAT_PROFILE = os.getenv('AUDIO_FORMAT_PROFILE', 'minimal')
+AUDIO_MIN_BITRATE = int(os.getenv('AUDIO_MIN_BITRATE', '48'))
+AUDIO_CONCURRENT_FRAGMENTS = int(os.getenv('AUDIO_CONCURRENT_FRAGMENTS', '4'))
+# Only fetch the first N seconds of audio; 0 fetches the whole video
+AUDIO_MAX_SECONDS = int(os.getenv('AUDIO_MAX_SECONDS', '0'))
+
+# Pipe the audio stream through ffmpeg into memory instead of writing a
+# temporary file; falls back to downloading when streaming fails
+AUDIO_STREAMING = os.getenv('AUDIO_STREAMING', 'True') == 'True'
+AUDIO_STREAM_BLOCK_SECONDS = float(
+    os.getenv('AUDIO_STREAM_BLOCK_SECONDS', '5'))
+# Audio longer than this is buffered in a memory-mapped temporary file
+AUDIO_STREAM_MEMMAP_SECONDS = float(
+    os.getenv('AUDIO_STREAM_MEMMAP_SECONDS', '3600'))
+
+
+# YouTube Pre-flight Settings
+# Metadata-only info dicts are cached in-process to skip re-extraction
+VIDEO_INFO_CACHE_TTL = int(os.getenv('VIDEO_INFO_CACHE_TTL', '600'))
+VIDEO_INFO_CACHE_SIZE = int(os.getenv('VIDEO_INFO_CACHE_SIZE', '256'))
+# Admission limits checked from pre-flight metadata before any audio is
+# fetched (0 disables a limit). 'reject' refuses oversized videos with
+# 422/413, 'truncate' only transcribes the window the limits allow
+VIDEO_MAX_DURATION = int(os.getenv('VIDEO_MAX_DURATION', '0'))
+VIDEO_MAX_BYTES = int(os.getenv('VIDEO_MAX_BYTES', '0'))
+VIDEO_OVERSIZE_POLICY = os.getenv('VIDEO_OVERSIZE_POLICY', 'reject')
+# Concurrent requests for one video share its work within a process.
+# Enable the database lease to also coalesce across processes and nodes;
+# an abandoned lease expires after SINGLE_FLIGHT_LEASE_SECONDS
+SINGLE_FLIGHT_DB_LEASE = os.getenv('SINGLE_FLIGHT_DB_LEASE', 'False') == 'True'
+SINGLE_FLIGHT_LEASE_SECONDS = int(
+    os.getenv('SINGLE_FLIGHT_LEASE_SECONDS', '1800'))
+SINGLE_FLIGHT_POLL_SECONDS = float(
+    os.getenv('SINGLE_FLIGHT_POLL_SECONDS', '2'))
+# Reuse questions of an existing quiz for the same video
+QUIZ_REUSE_EXISTING = os.getenv('QUIZ_REUSE_EXISTING', 'False') == 'True'
+
+
+# Transcript Source Settings
+# captions_only, prefer_captions or whisper_only
+TRANSCRIPT_SOURCE_POLICY = os.getenv(
+    'TRANSCRIPT_SOURCE_POLICY', 'prefer_captions')
+# Manual subtitle languages tried after the video's own language
+# (automatic captions are only used in the original language)
+CAPTION_LANGUAGES = [
+    lang.strip()
+    for lang in os.getenv('CAPTION_LANGUAGES', 'de,en').split(',')
+    if lang.strip()
+]
+# Clean transcripts (fillers, stutters, repeated lines) before
+# prompting and keep only the most informative sentences of ones
+# estimated above TRANSCRIPT_TOKEN_BUDGET tokens (0: no limit)
+TRANSCRIPT_COMPACTION = os.getenv('TRANSCRIPT_COMPACTION', 'True') == 'True'
+TRANSCRIPT_TOKEN_BUDGET = int(os.getenv('TRANSCRIPT_TOKEN_BUDGET', '8000'))
+
+
+# Quiz Generation Jobs
+# Number of background threads per process running quiz pipelines
+QUIZ_JOB_WORKERS = int(os.getenv('QUIZ_JOB_WORKERS', '2'))
+# Seconds between updated_at heartbeats of the jobs a process holds;
+# jobs without heartbeat for QUIZ_JOB_STALE_SECONDS are recovered
+QUIZ_JOB_HEARTBEAT_SECONDS = float(
+    os.getenv('QUIZ_JOB_HEARTBEAT_SECONDS', '30')
+)
+# Admission limits on creating jobs, counted over all processes from
+# the QuizJob table (0 disables a limit): active jobs per user, jobs
+# per user in QUIZ_RATE_WINDOW seconds and active jobs overall
+QUIZ_MAX_ACTIVE_JOBS_PER_USER = int(
+    os.getenv('QUIZ_MAX_ACTIVE_JOBS_PER_USER', '3')
+)
+QUIZ_RATE_LIMIT = int(os.getenv('QUIZ_RATE_LIMIT', '20'))
+QUIZ_RATE_WINDOW = int(os.getenv('QUIZ_RATE_WINDOW', '3600'))
+QUIZ_MAX_QUEUE_DEPTH = int(os.getenv('QUIZ_MAX_QUEUE_DEPTH', '100'))
+# Jobs not updated for this long are orphaned: they no longer count as
+# active and are re-queued (pending) or failed (running)
+QUIZ_JOB_STALE_SECONDS = int(os.getenv('QUIZ_JOB_STALE_SECONDS', '300'))
+# Retry-After estimates: finished jobs averaged, fallback job duration
+# and upper bound
+QUIZ_ADMISSION_HISTORY = int(os.getenv('QUIZ_ADMISSION_HISTORY', '50'))
+QUIZ_JOB_DEFAULT_SECONDS = int(os.getenv('QUIZ_JOB_DEFAULT_SECONDS', '120'))
+QUIZ_RETRY_AFTER_MAX = int(os.getenv('QUIZ_RETRY_AFTER_MAX', '3600'))
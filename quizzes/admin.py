@@ -2,7 +2,7 @@
 Admin configuration for quizzes app.
 """
 from django.contrib import admin
-from .models import Quiz, Question
+from .models import Quiz, Question, QuizJob, Transcript
 
 
 class QuestionInline(admin.TabularInline):
@@ -79,3 +79,44 @@ class QuestionAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(QuizJob)
+class QuizJobAdmin(admin.ModelAdmin):
+    """
+    Admin for QuizJob model.
+    """
+    list_display = (
+        'id',
+        'user',
+        'status',
+        'stage',
+        'created_at',
+        'finished_at'
+    )
+    list_filter = ('status', 'created_at')
+    search_fields = ('url', 'user__username', 'error')
+    readonly_fields = (
+        'created_at',
+        'updated_at',
+        'started_at',
+        'finished_at',
+        'metrics'
+    )
+
+
+@admin.register(Transcript)
+class TranscriptAdmin(admin.ModelAdmin):
+    """
+    Admin for Transcript model.
+    """
+    list_display = (
+        'id',
+        'video_id',
+        'model_name',
+        'language',
+        'created_at'
+    )
+    list_filter = ('model_name', 'language')
+    search_fields = ('video_id', 'text')
+    readonly_fields = ('created_at',)
@@ -0,0 +1,215 @@
+"""
+Admission control for quiz creation.
+The QuizJob table doubles as the shared counter for all web processes:
+a user's active and recent jobs and the global number of active jobs
+decide whether a new job is accepted. Rejected requests get 429 (per
+user) or 503 (global queue full) with a Retry-After estimated from
+the stage durations recorded by finished jobs.
+"""
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .jobs import get_stale_cutoff
+from .models import QuizJob
+
+
+class QuizAdmissionError(Exception):
+    """
+    Raised when a quiz job is refused to protect the worker pool.
+    """
+
+    def __init__(self, message, status_code, retry_after):
+        """
+        Store the HTTP status and the suggested wait.
+
+        Args:
+            message: Human readable reason
+            status_code: 429 for per-user limits, 503 for a full queue
+            retry_after: Seconds after which the client may retry
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def clamp_retry_after(seconds):
+    """
+    Round a wait to whole seconds within 1..QUIZ_RETRY_AFTER_MAX.
+
+    Args:
+        seconds: Estimated wait
+
+    Returns:
+        int: Retry-After value
+    """
+    return max(1, min(int(math.ceil(seconds)), settings.QUIZ_RETRY_AFTER_MAX))
+
+
+def get_active_jobs():
+    """
+    Get pending and running jobs, ignoring ones that stopped updating.
+
+    Live jobs get heartbeats from their process, so jobs without one
+    for QUIZ_JOB_STALE_SECONDS (lost in a restart or crash) no longer
+    count against the limits, even before they are recovered.
+
+    Returns:
+        QuerySet: Active QuizJob rows
+    """
+    return QuizJob.objects.filter(
+        status__in=[QuizJob.Status.PENDING, QuizJob.Status.RUNNING],
+        updated_at__gte=get_stale_cutoff()
+    )
+
+
+def get_stage_durations():
+    """
+    Average the stage durations of recently finished jobs.
+
+    Returns:
+        dict: Mean seconds per stage name
+    """
+    recent = QuizJob.objects.filter(
+        status=QuizJob.Status.SUCCEEDED
+    ).order_by('-finished_at')[:settings.QUIZ_ADMISSION_HISTORY]
+    totals = {}
+    for metrics in recent.values_list('metrics', flat=True):
+        for stage, seconds in (metrics or {}).get('stages', {}).items():
+            totals.setdefault(stage, []).append(seconds)
+    return {stage: sum(v) / len(v) for stage, v in totals.items()}
+
+
+def get_expected_job_seconds():
+    """
+    Estimate how long a job takes from observed stage durations.
+
+    Returns:
+        float: Sum of the mean stage durations, or QUIZ_JOB_DEFAULT_SECONDS
+            without any history
+    """
+    return sum(get_stage_durations().values()) or \
+        settings.QUIZ_JOB_DEFAULT_SECONDS
+
+
+def get_remaining_seconds(job, expected, now):
+    """
+    Estimate the time left until an active job finishes.
+
+    Args:
+        job: Active QuizJob
+        expected: Expected seconds for a whole job
+        now: Current time
+
+    Returns:
+        float: Seconds left (never negative)
+    """
+    if job.started_at is None:
+        return expected
+    return max(0.0, expected - (now - job.started_at).total_seconds())
+
+
+def check_user_concurrency(user):
+    """
+    Refuse a job while the user has too many jobs in flight.
+
+    Args:
+        user: User creating the quiz
+
+    Raises:
+        QuizAdmissionError: 429 with the wait for their next job to end
+    """
+    limit = settings.QUIZ_MAX_ACTIVE_JOBS_PER_USER
+    if not limit:
+        return
+    active = list(get_active_jobs().filter(user=user).only('started_at'))
+    if len(active) < limit:
+        return
+    expected, now = get_expected_job_seconds(), timezone.now()
+    wait = min(get_remaining_seconds(job, expected, now) for job in active)
+    raise QuizAdmissionError(
+        f'At most {limit} quizzes can be generated at a time',
+        429, clamp_retry_after(wait)
+    )
+
+
+def check_user_rate(user):
+    """
+    Refuse a job once the user has created too many in the window.
+
+    Args:
+        user: User creating the quiz
+
+    Raises:
+        QuizAdmissionError: 429 with the wait until the oldest job in
+            the window drops out of it
+    """
+    limit, window = settings.QUIZ_RATE_LIMIT, settings.QUIZ_RATE_WINDOW
+    if not limit:
+        return
+    since = timezone.now() - timedelta(seconds=window)
+    times = list(QuizJob.objects.filter(
+        user=user, created_at__gte=since
+    ).order_by('created_at').values_list('created_at', flat=True)[:limit])
+    if len(times) < limit:
+        return
+    wait = (times[0] - since).total_seconds()
+    raise QuizAdmissionError(
+        f'At most {limit} quizzes can be created per {window} seconds',
+        429, clamp_retry_after(wait)
+    )
+
+
+def check_queue_depth():
+    """
+    Refuse a job while the global queue is full.
+
+    The wait assumes the jobs ahead are worked off at the rate of the
+    jobs currently running across all processes.
+
+    Raises:
+        QuizAdmissionError: 503 with the estimated time to free a slot
+    """
+    limit = settings.QUIZ_MAX_QUEUE_DEPTH
+    if not limit:
+        return
+    depth = get_active_jobs().count()
+    if depth < limit:
+        return
+    running = get_active_jobs().filter(status=QuizJob.Status.RUNNING).count()
+    wait = (depth - limit + 1) * get_expected_job_seconds() / max(1, running)
+    raise QuizAdmissionError(
+        'Quiz generation is at capacity, please retry later',
+        503, clamp_retry_after(wait)
+    )
+
+
+def create_quiz_job(user, **fields):
+    """
+    Create a quiz job if the user and global limits allow it.
+
+    The user row is locked (where the database supports it) so
+    concurrent requests of one user are admitted one at a time.
+
+    Args:
+        user: User creating the quiz
+        **fields: QuizJob fields such as url and transcript_source
+
+    Returns:
+        QuizJob: Created pending job
+
+    Raises:
+        QuizAdmissionError: If a limit is reached
+    """
+    with transaction.atomic():
+        list(User.objects.select_for_update().filter(
+            pk=user.pk
+        ).values_list('pk', flat=True))
+        check_user_concurrency(user)
+        check_user_rate(user)
+        check_queue_depth()
+        return QuizJob.objects.create(user=user, **fields)
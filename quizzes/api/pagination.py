@@ -0,0 +1,23 @@
+"""
+Pagination classes for quizzes app.
+"""
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class QuizCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (created_at, id), newest first.
+
+    Pages are fetched with an indexed range query instead of an
+    OFFSET, so deep pages cost the same as the first one.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+
+    def __init__(self):
+        """
+        Read the default and largest page size from the settings.
+        """
+        self.page_size = settings.QUIZ_LIST_PAGE_SIZE
+        self.max_page_size = settings.QUIZ_LIST_MAX_PAGE_SIZE
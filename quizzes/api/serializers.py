@@ -2,7 +2,39 @@
 Serializers for quizzes app.
 """
 from rest_framework import serializers
-from ..models import Quiz, Question
+from ..models import Quiz, Question, QuizJob
+
+
+def get_requested_fields(request):
+    """
+    Get the sparse fieldset a client asked for with ?fields=.
+
+    Args:
+        request: DRF request or None
+
+    Returns:
+        set: Requested field names, or None to return all fields
+    """
+    fields = request.query_params.get('fields') if request else None
+    if not fields:
+        return None
+    return {name.strip() for name in fields.split(',') if name.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin dropping fields not listed in ?fields=.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Remove fields the request did not ask for.
+        """
+        super().__init__(*args, **kwargs)
+        requested = get_requested_fields(self.context.get('request'))
+        if requested is not None:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -22,7 +54,7 @@ class QuestionSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at', 'updated_at')
 
 
-class QuizSerializer(serializers.ModelSerializer):
+class QuizSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Quiz model with nested questions.
     """
@@ -42,8 +74,49 @@ class QuizSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at', 'updated_at')
 
 
+class QuizSummarySerializer(SparseFieldsMixin, serializers.Serializer):
+    """
+    Serializer for quiz list summaries built from values() rows.
+    """
+    id = serializers.IntegerField(read_only=True)
+    title = serializers.CharField(read_only=True)
+    description = serializers.CharField(read_only=True)
+    video_url = serializers.URLField(read_only=True)
+    question_count = serializers.IntegerField(read_only=True)
+    created_at = serializers.DateTimeField(read_only=True)
+    updated_at = serializers.DateTimeField(read_only=True)
+
+
 class CreateQuizSerializer(serializers.Serializer):
     """
     Serializer for creating a new quiz from YouTube URL.
     """
     url = serializers.URLField(required=True)
+    transcript_source = serializers.ChoiceField(
+        choices=QuizJob.TranscriptSource.choices,
+        required=False
+    )
+
+
+class QuizJobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for QuizJob model with the resulting quiz once done.
+    """
+    quiz = QuizSerializer(read_only=True)
+
+    class Meta:
+        model = QuizJob
+        fields = (
+            'id',
+            'url',
+            'transcript_source',
+            'status',
+            'stage',
+            'error',
+            'quiz',
+            'created_at',
+            'updated_at',
+            'started_at',
+            'finished_at'
+        )
+        read_only_fields = fields
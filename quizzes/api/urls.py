@@ -5,11 +5,19 @@ from django.urls import path
 from .views import (
     CreateQuizView,
     QuizListView,
-    QuizDetailView
+    QuizDetailView,
+    QuizJobDetailView,
+    StatsView
 )
 
 urlpatterns = [
     path('createQuiz/', CreateQuizView.as_view(), name='create_quiz'),
     path('quizzes/', QuizListView.as_view(), name='quiz_list'),
     path('quizzes/<int:pk>/', QuizDetailView.as_view(), name='quiz_detail'),
+    path(
+        'jobs/<int:pk>/',
+        QuizJobDetailView.as_view(),
+        name='quiz_job_detail'
+    ),
+    path('stats/', StatsView.as_view(), name='stats'),
 ]
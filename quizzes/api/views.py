@@ -1,75 +1,369 @@
 """
 Views for quizzes app.
 """
+import hashlib
+
+from django.http import Http404
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
 from rest_framework import generics, status
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
-from ..models import Quiz
-from .serializers import QuizSerializer, CreateQuizSerializer
-from ..functions import create_quiz_from_url
-from ..utils import create_quiz_in_db
+from ..models import QuizJob
+from ..admission import create_quiz_job, QuizAdmissionError
+from .pagination import QuizCursorPagination
+from .serializers import (
+    QuizSerializer,
+    QuizSummarySerializer,
+    CreateQuizSerializer,
+    QuizJobSerializer,
+    get_requested_fields
+)
+from ..functions import check_video_limits, VideoTooLargeError
+from ..jobs import enqueue_quiz_job, recover_if_stale
+from ..llm_calls import get_llm_stats
+from ..quiz_cache import (
+    get_cache_stats,
+    get_quiz_version,
+    get_rendered_quizzes
+)
+from ..utils import (
+    get_question_states,
+    get_user_quizzes,
+    get_user_quiz_summaries,
+    get_quiz_list_state,
+    get_quiz_state
+)
+
+
+def build_etag(request, state):
+    """
+    Build an ETag from quiz change indicators.
+
+    No Last-Modified is derived from them: the latest updated_at does
+    not move when a quiz or question is deleted and has only second
+    resolution, so only the ETag (which includes the counts) decides
+    freshness.
+
+    Args:
+        request: DRF request (user and query string are part of the ETag)
+        state: Dictionary of counts and updated_at timestamps
+
+    Returns:
+        str: Quoted ETag, or None if there is nothing to validate against
+    """
+    if not any(v for k, v in state.items() if k.endswith('_updated')):
+        return None
+    key = repr((request.user.pk, request.GET.urlencode(), sorted(
+        (k, str(v)) for k, v in state.items()
+    )))
+    digest = hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+    return quote_etag(digest)
+
+
+class ConditionalGetMixin:
+    """
+    Answer GET with 304 Not Modified when the client's copy is current.
+
+    Views provide get_state(); the response is only serialized when
+    the ETag no longer matches.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        Return 304 for unchanged data, else the response with its ETag.
+        """
+        self.state = self.get_state()
+        etag = build_etag(request, self.state)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if etag is not None:
+            response['ETag'] = etag
+        patch_vary_headers(response, ['Cookie'])
+        return response
+
+
+def build_rejection(error):
+    """
+    Build the response for a refused quiz request.
+
+    Args:
+        error: VideoTooLargeError or QuizAdmissionError
+
+    Returns:
+        Response: Error detail with the error's status code and, for
+            admission errors, a Retry-After header
+    """
+    response = Response({'detail': str(error)}, status=error.status_code)
+    if getattr(error, 'retry_after', None):
+        response['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def check_job_video(job):
+    """
+    Run the video pre-flight for a new job, removing it if that fails.
+
+    Any failure (an oversized video, a network or yt-dlp error) deletes
+    the job, so no pending job is left that recovery would run later.
+
+    Args:
+        job: Freshly created QuizJob
+
+    Raises:
+        VideoTooLargeError: If the video exceeds the configured limits
+    """
+    try:
+        check_video_limits(job.url)
+    except Exception:
+        job.delete()
+        raise
 
 
 class CreateQuizView(APIView):
-    """Create quiz from YouTube URL."""
+    """Queue quiz generation from YouTube URL."""
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
         """
-        Create quiz from YouTube URL.
+        Queue a background job that creates a quiz from a YouTube URL.
+
+        Admission limits are checked before the network pre-flight, so
+        refused clients cost no metadata fetch; a job whose pre-flight
+        rejects the video or fails is removed again.
 
         Args:
             request: HTTP request with YouTube URL
 
         Returns:
-            Response: Created quiz data or error message
+            Response: Queued job data (202), validation errors (400),
+                a rejected oversized video (422/413) or a refused job
+                with Retry-After (429/503)
         """
         serializer = CreateQuizSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status.HTTP_400_BAD_REQUEST)
-
         try:
-            url = serializer.validated_data['url']
-            quiz_data, normalized_url = create_quiz_from_url(url, request.user)
-            quiz = create_quiz_in_db(request.user, quiz_data, normalized_url)
-            return Response(
-                QuizSerializer(quiz).data,
-                status.HTTP_201_CREATED
-            )
-        except Exception as e:
-            return Response(
-                {'detail': f'Error creating quiz: {str(e)}'},
-                status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-
-class QuizListView(generics.ListAPIView):
-    """Get all quizzes for the authenticated user."""
+            job = create_quiz_job(request.user, **serializer.validated_data)
+            check_job_video(job)
+        except (QuizAdmissionError, VideoTooLargeError) as e:
+            return build_rejection(e)
+        enqueue_quiz_job(job)
+        return Response(QuizJobSerializer(job).data, status.HTTP_202_ACCEPTED)
+
+
+class RenderedQuizMixin:
+    """
+    Serve full quiz representations from the rendered quiz cache.
+    """
+
+    def load_quizzes(self, quiz_ids):
+        """
+        Load quizzes of the user that are missing from the cache.
+
+        Args:
+            quiz_ids: Primary keys of the quizzes to render
+
+        Returns:
+            QuerySet: Quizzes with prefetched questions
+        """
+        return get_user_quizzes(self.request.user).filter(pk__in=quiz_ids)
+
+    def render_quizzes(self, quiz_versions):
+        """
+        Get rendered quizzes of the user from the cache or the database.
+
+        Args:
+            quiz_versions: Current version by primary key, in the order
+                to return
+
+        Returns:
+            list: Rendered quiz data
+        """
+        return get_rendered_quizzes(
+            quiz_versions, self.request.user, self.load_quizzes
+        )
+
+
+class QuizListView(
+    RenderedQuizMixin, ConditionalGetMixin, generics.ListAPIView
+):
+    """Get all quizzes for the authenticated user, one page at a time."""
     serializer_class = QuizSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = QuizCursorPagination
+
+    def get_state(self):
+        """
+        Get change indicators for the user's quiz list.
+
+        Returns:
+            dict: Quiz and question counts and latest updates
+        """
+        return get_quiz_list_state(self.request.user)
+
+    def is_summary(self):
+        """
+        Check whether the client asked for ?view=summary.
+
+        Returns:
+            bool: True for the lightweight summary representation
+        """
+        return self.request.query_params.get('view') == 'summary'
+
+    def get_serializer_class(self):
+        """
+        Get the serializer for the requested representation.
+
+        Returns:
+            type: QuizSummarySerializer or QuizSerializer
+        """
+        if self.is_summary():
+            return QuizSummarySerializer
+        return super().get_serializer_class()
 
     def get_queryset(self):
         """
         Get all quizzes for the authenticated user.
 
+        Summaries only count questions; full quizzes prefetch them
+        unless a sparse fieldset leaves them out.
+
+        Returns:
+            QuerySet: User's quizzes or quiz summary rows
+        """
+        if self.is_summary():
+            return get_user_quiz_summaries(self.request.user)
+        fields = get_requested_fields(self.request)
+        return get_user_quizzes(
+            self.request.user,
+            with_questions=fields is None or 'questions' in fields
+        )
+
+    def list(self, request, *args, **kwargs):
+        """
+        List a page of quizzes, rendering only those not cached.
+
+        Summaries and sparse fieldsets are serialized directly.
+
+        Args:
+            request: HTTP request
+
         Returns:
-            QuerySet: User's quizzes
+            Response: Paginated quiz data
         """
-        return Quiz.objects.filter(user=self.request.user)
+        if self.is_summary() or get_requested_fields(request) is not None:
+            return super().list(request, *args, **kwargs)
+        page = self.paginate_queryset(get_user_quizzes(
+            request.user, with_questions=False
+        ).only('id', 'created_at', 'updated_at'))
+        states = get_question_states([quiz.pk for quiz in page])
+        data = self.render_quizzes({quiz.pk: get_quiz_version(
+            quiz.updated_at, *states.get(quiz.pk, (0, None))
+        ) for quiz in page})
+        return self.get_paginated_response(data)
 
 
-class QuizDetailView(generics.RetrieveUpdateDestroyAPIView):
+class QuizDetailView(
+    RenderedQuizMixin,
+    ConditionalGetMixin,
+    generics.RetrieveUpdateDestroyAPIView
+):
     """Retrieve, update, or delete a specific quiz."""
     serializer_class = QuizSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_state(self):
+        """
+        Get change indicators for the requested quiz.
+
+        Returns:
+            dict: Quiz update time, question count and latest update
+        """
+        return get_quiz_state(self.request.user, self.kwargs['pk'])
+
     def get_queryset(self):
         """
         Get queryset filtered by authenticated user.
 
         Returns:
-            QuerySet: User's quizzes
+            QuerySet: User's quizzes with prefetched questions
+        """
+        return get_user_quizzes(self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Return a quiz from the rendered quiz cache when possible.
+
+        The cache version comes from the state loaded for the
+        conditional GET.
+
+        Args:
+            request: HTTP request
+
+        Returns:
+            Response: Quiz data
+
+        Raises:
+            Http404: If the user has no such quiz
+        """
+        if get_requested_fields(request) is not None:
+            return super().retrieve(request, *args, **kwargs)
+        version = get_quiz_version(**self.state)
+        data = self.render_quizzes({int(kwargs['pk']): version})
+        if not data:
+            raise Http404
+        return Response(data[0])
+
+
+class QuizJobDetailView(generics.RetrieveAPIView):
+    """Report state, stage and result of a quiz generation job."""
+    serializer_class = QuizJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """
+        Get jobs of the authenticated user.
+
+        Returns:
+            QuerySet: User's quiz jobs with their quizzes
+        """
+        return QuizJob.objects.filter(
+            user=self.request.user
+        ).select_related('quiz')
+
+    def get_object(self):
+        """
+        Get the job, resolving it first if its process stopped.
+
+        Returns:
+            QuizJob: Requested job
+        """
+        job = super().get_object()
+        recover_if_stale(job)
+        return job
+
+
+class StatsView(APIView):
+    """Report the counters kept by the serving process."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """
+        Return the rendered quiz cache and LLM call counters.
+
+        With local-memory caches they cover the answering process only.
+
+        Args:
+            request: HTTP request
+
+        Returns:
+            Response: Counters by subsystem
         """
-        return Quiz.objects.filter(user=self.request.user)
+        return Response({
+            'quiz_cache': get_cache_stats(),
+            'llm': get_llm_stats(),
+        })
@@ -0,0 +1,228 @@
+"""
+Streaming audio decoding for transcription.
+The audio stream selected during pre-flight is piped through a single
+ffmpeg process that emits mono 16 kHz float32 samples, so no temporary
+audio file is written and transcription can start before the download
+has finished.
+"""
+import subprocess
+import tempfile
+
+import numpy as np
+from django.conf import settings
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 4
+
+
+class AudioStreamError(RuntimeError):
+    """
+    Raised when the audio stream cannot be fetched or decoded.
+    """
+
+
+def get_audio_window(max_seconds=None):
+    """
+    Get how many seconds of audio to fetch from the start.
+
+    Args:
+        max_seconds: Per-video limit, e.g. from admission control
+
+    Returns:
+        int: Seconds to fetch, or None to fetch everything
+    """
+    limits = [s for s in (max_seconds, settings.AUDIO_MAX_SECONDS) if s]
+    return min(limits) if limits else None
+
+
+def select_stream_format(info):
+    """
+    Get the audio format chosen by yt-dlp's format selection.
+
+    Args:
+        info: yt-dlp info dict from the pre-flight resolution
+
+    Returns:
+        dict: Format dictionary with url and http_headers keys
+
+    Raises:
+        AudioStreamError: If no streamable audio format was selected
+    """
+    formats = info.get('requested_formats') or [info]
+    for fmt in formats:
+        if fmt.get('url') and fmt.get('acodec') != 'none':
+            return fmt
+    raise AudioStreamError('No streamable audio format selected')
+
+
+def format_ffmpeg_headers(headers):
+    """
+    Format HTTP headers for ffmpeg's -headers option.
+
+    Args:
+        headers: Dictionary of HTTP headers
+
+    Returns:
+        str: CRLF separated header lines
+    """
+    return ''.join(f'{name}: {value}\r\n' for name, value in headers.items())
+
+
+def build_ffmpeg_command(info, max_seconds=None):
+    """
+    Build the ffmpeg command that streams audio as 16 kHz float32 PCM.
+
+    Args:
+        info: yt-dlp info dict from the pre-flight resolution
+        max_seconds: Only read this many seconds from the start,
+            capped by AUDIO_MAX_SECONDS
+
+    Returns:
+        list: Command line arguments
+    """
+    fmt = select_stream_format(info)
+    command = ['ffmpeg', '-nostdin', '-loglevel', 'error']
+    headers = fmt.get('http_headers') or info.get('http_headers')
+    if headers:
+        command += ['-headers', format_ffmpeg_headers(headers)]
+    if max_seconds := get_audio_window(max_seconds):
+        command += ['-t', str(max_seconds)]
+    command += ['-i', fmt['url']]
+    return command + [
+        '-vn', '-f', 'f32le', '-ac', '1', '-ar', str(SAMPLE_RATE), '-'
+    ]
+
+
+def check_ffmpeg_exit(process):
+    """
+    Wait for ffmpeg and raise if it failed.
+
+    Args:
+        process: Finished or finishing ffmpeg Popen object
+
+    Raises:
+        AudioStreamError: If ffmpeg exited with an error
+    """
+    stderr = process.stderr.read().decode('utf-8', 'replace')
+    if process.wait() != 0:
+        raise AudioStreamError(f'ffmpeg failed: {stderr.strip()}')
+
+
+def start_ffmpeg(command):
+    """
+    Start the decoding process with piped output.
+
+    Args:
+        command: Command line arguments
+
+    Returns:
+        subprocess.Popen: Running process
+
+    Raises:
+        AudioStreamError: If ffmpeg cannot be started
+    """
+    try:
+        return subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except OSError as e:
+        raise AudioStreamError(f'Cannot start ffmpeg: {e}') from e
+
+
+def iter_pcm_blocks(info, command=None, max_seconds=None):
+    """
+    Yield decoded samples while the audio is still downloading.
+
+    Args:
+        info: yt-dlp info dict from the pre-flight resolution
+        command: Optional ffmpeg command, built from info by default
+        max_seconds: Only decode this many seconds from the start
+
+    Yields:
+        numpy.ndarray: Blocks of float32 samples
+    """
+    block_bytes = int(
+        settings.AUDIO_STREAM_BLOCK_SECONDS * SAMPLE_RATE
+    ) * BYTES_PER_SAMPLE
+    process = start_ffmpeg(
+        command or build_ffmpeg_command(info, max_seconds)
+    )
+    try:
+        while data := process.stdout.read(block_bytes):
+            usable = len(data) - len(data) % BYTES_PER_SAMPLE
+            yield np.frombuffer(data[:usable], dtype=np.float32)
+        check_ffmpeg_exit(process)
+    finally:
+        process.kill()
+        process.stdout.close()
+
+
+def allocate_buffer(duration):
+    """
+    Allocate a sample buffer, memory-mapped for long inputs.
+
+    Args:
+        duration: Expected audio length in seconds (may be None)
+
+    Returns:
+        numpy.ndarray: Buffer to fill, or None to collect in memory
+    """
+    if not duration or duration < settings.AUDIO_STREAM_MEMMAP_SECONDS:
+        return None
+    samples = int((duration + 2) * SAMPLE_RATE)
+    return np.memmap(
+        tempfile.TemporaryFile(),
+        dtype=np.float32,
+        mode='w+',
+        shape=(samples,)
+    )
+
+
+def fill_buffer(buffer, blocks):
+    """
+    Copy streamed blocks into a preallocated buffer.
+
+    Samples beyond the buffer (if the duration was underestimated)
+    are appended in memory instead of being dropped.
+
+    Args:
+        buffer: Preallocated np.memmap
+        blocks: Iterable of float32 sample blocks
+
+    Returns:
+        numpy.ndarray: Filled part of the buffer plus any overflow
+    """
+    filled, overflow = 0, []
+    for block in blocks:
+        size = min(len(block), len(buffer) - filled)
+        buffer[filled:filled + size] = block[:size]
+        filled += size
+        if size < len(block):
+            overflow.append(block[size:])
+    if overflow:
+        return np.concatenate([buffer[:filled], *overflow])
+    return buffer[:filled]
+
+
+def collect_pcm(blocks, duration=None):
+    """
+    Gather streamed blocks into one array for model.transcribe.
+
+    Args:
+        blocks: Iterable of float32 sample blocks
+        duration: Expected audio length in seconds
+
+    Returns:
+        numpy.ndarray: All samples
+
+    Raises:
+        AudioStreamError: If the stream contained no audio
+    """
+    buffer = allocate_buffer(duration)
+    if buffer is None:
+        samples = np.concatenate(list(blocks) or [np.empty(0, np.float32)])
+    else:
+        samples = fill_buffer(buffer, blocks)
+    if len(samples) == 0:
+        raise AudioStreamError('Audio stream was empty')
+    return samples
@@ -1,16 +1,106 @@
 """
 Utility functions for quiz generation.
-Contains functions for YouTube download, Whisper transcription, and Gemini AI.
+Contains functions for YouTube download, Whisper transcription, and LLM quiz
+generation.
 """
 import os
+import re
+import copy
+import html
 import json
-import yt_dlp
-import whisper
+import logging
+import time
+import threading
+from collections import OrderedDict
+from functools import partial
+from xml.etree import ElementTree
+
 from django.conf import settings
-from google import genai
 
-# Preload Whisper model at module level
-WHISPER_MODEL = whisper.load_model("base")
+from .audio_stream import (
+    AudioStreamError,
+    get_audio_window,
+    iter_pcm_blocks
+)
+from .llm_calls import generate_with_policy
+from .single_flight import hold_lease, run_single_flight
+from .structured_output import (
+    LLMSession,
+    build_json_fix_prompt,
+    build_json_schema,
+    build_repair_prompt,
+    constrain_quiz_schema,
+    find_repair_slots
+)
+from .transcript_compaction import compact_transcript
+from .transcription import transcribe_file, transcribe_pcm_stream
+from .utils import (
+    get_cached_transcript,
+    store_transcript,
+    get_quiz_data_for_video
+)
+
+logger = logging.getLogger(__name__)
+
+YOUTUBE_ID_PATTERN = re.compile(
+    r'(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|embed/|live/)'
+    r'|youtu\.be/)([A-Za-z0-9_-]{11})'
+)
+
+# Transcript source policies
+CAPTIONS_ONLY = 'captions_only'
+PREFER_CAPTIONS = 'prefer_captions'
+WHISPER_ONLY = 'whisper_only'
+
+# Model name under which caption-based transcripts are cached
+CAPTION_MODEL_NAME = 'youtube-captions'
+CAPTION_FORMATS = ('vtt', 'srv3', 'srv2', 'srv1')
+VTT_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# Oversize video policies
+REJECT_OVERSIZE = 'reject'
+TRUNCATE_OVERSIZE = 'truncate'
+
+# In-process TTL cache of metadata-only yt-dlp info dicts
+_video_info_cache = OrderedDict()
+_video_info_lock = threading.Lock()
+
+
+def get_audio_format(profile=None):
+    """
+    Get the yt-dlp format selector for a download profile.
+
+    The 'minimal' profile picks the smallest audio-only format at or
+    above AUDIO_MIN_BITRATE, which is plenty for 16 kHz transcription.
+
+    Args:
+        profile: 'minimal' or 'best', defaults to AUDIO_FORMAT_PROFILE
+
+    Returns:
+        str: yt-dlp format selector
+    """
+    profile = profile or settings.AUDIO_FORMAT_PROFILE
+    if profile == 'best':
+        return 'bestaudio/best'
+    floor = settings.AUDIO_MIN_BITRATE
+    return f'worstaudio[acodec!=none][abr>=?{floor}]/bestaudio/best'
+
+
+class VideoTooLargeError(ValueError):
+    """
+    Raised when a video exceeds the configured length or size limits.
+    """
+
+    def __init__(self, message, status_code=422):
+        """
+        Store the HTTP status to report for the rejected video.
+
+        Args:
+            message: Human readable reason
+            status_code: 422 for too long, 413 for too large
+        """
+        super().__init__(message)
+        self.status_code = status_code
 
 
 def get_youtube_download_opts(output_path):
@@ -24,7 +114,7 @@ def get_youtube_download_opts(output_path):
         dict: yt-dlp configuration dictionary
     """
     return {
-        'format': 'bestaudio/best',
+        'format': get_audio_format(),
         'outtmpl': output_path,
         'quiet': True,
         'noplaylist': True,
@@ -32,30 +122,174 @@ def get_youtube_download_opts(output_path):
         'noprogress': True,
         'logger': None,
         'no_color': True,
+        'concurrent_fragment_downloads': settings.AUDIO_CONCURRENT_FRAGMENTS,
     }
 
 
-def download_youtube_audio(url):
+def add_download_range(opts, max_seconds):
     """
-    Download audio from YouTube URL.
+    Limit a download to the first max_seconds of the media.
 
     Args:
-        url: YouTube video URL string
+        opts: yt-dlp configuration dictionary
+        max_seconds: Length to download, or None/0 for everything
 
     Returns:
-        tuple: (audio_file_path, video_id)
+        dict: The updated configuration dictionary
+    """
+    if max_seconds:
+        from yt_dlp.utils import download_range_func
+        opts['download_ranges'] = download_range_func(
+            None, [(0, max_seconds)]
+        )
+    return opts
+
+
+def get_audio_output_template():
+    """
+    Get output path template for downloaded audio files.
+
+    Returns:
+        str: yt-dlp output template inside MEDIA_ROOT/temp_audio
     """
     output_dir = settings.MEDIA_ROOT / 'temp_audio'
     output_dir.mkdir(parents=True, exist_ok=True)
-    output_path = str(output_dir / '%(id)s.%(ext)s')
+    return str(output_dir / '%(id)s.%(ext)s')
+
+
+def get_youtube_info_opts():
+    """
+    Get yt-dlp options for metadata-only pre-flight resolution.
+
+    Returns:
+        dict: yt-dlp configuration that never downloads media
+    """
+    opts = get_youtube_download_opts(get_audio_output_template())
+    opts['skip_download'] = True
+    return opts
+
+
+def get_cached_video_info(key):
+    """
+    Get a pre-flight info dict from the in-process cache.
+
+    Args:
+        key: URL or video ID the info was cached under
+
+    Returns:
+        dict: yt-dlp info dict or None if missing or expired
+    """
+    with _video_info_lock:
+        entry = _video_info_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, info = entry
+        if expires_at < time.monotonic():
+            del _video_info_cache[key]
+            return None
+        return info
 
-    ydl_opts = get_youtube_download_opts(output_path)
+
+def cache_video_info(keys, info):
+    """
+    Store a pre-flight info dict under several keys.
+
+    Args:
+        keys: Iterable of URLs or video IDs
+        info: yt-dlp info dict
+    """
+    expires_at = time.monotonic() + settings.VIDEO_INFO_CACHE_TTL
+    with _video_info_lock:
+        for key in keys:
+            _video_info_cache[key] = (expires_at, info)
+            _video_info_cache.move_to_end(key)
+        while len(_video_info_cache) > settings.VIDEO_INFO_CACHE_SIZE:
+            _video_info_cache.popitem(last=False)
+
+
+def clear_video_info_cache():
+    """
+    Drop all cached pre-flight info dicts.
+    """
+    with _video_info_lock:
+        _video_info_cache.clear()
+
+
+def resolve_video_info(url):
+    """
+    Resolve video metadata without downloading any media.
+
+    The info dict carries the canonical ID, duration, selected audio
+    format and available caption tracks.
+
+    Args:
+        url: YouTube video URL string
+
+    Returns:
+        dict: yt-dlp info dict
+    """
+    import yt_dlp
+    info = get_cached_video_info(url)
+    if info is None:
+        with yt_dlp.YoutubeDL(get_youtube_info_opts()) as ydl:
+            info = ydl.extract_info(url, download=False)
+        cache_video_info((url, info['id']), info)
+    return info
+
+
+def get_downloaded_path(ydl, info):
+    """
+    Get the path of the file yt-dlp wrote for an info dict.
+
+    Args:
+        ydl: YoutubeDL instance that performed the download
+        info: Processed info dict
+
+    Returns:
+        str: Path of the downloaded audio file
+    """
+    downloads = info.get('requested_downloads') or [{}]
+    return downloads[0].get('filepath') or ydl.prepare_filename(info)
+
+
+def download_youtube_audio(url, info=None, max_seconds=None):
+    """
+    Download audio from YouTube URL.
+
+    Args:
+        url: YouTube video URL string
+        info: Optional pre-flight info dict, avoids a second extraction
+        max_seconds: Only fetch this many seconds from the start,
+            capped by AUDIO_MAX_SECONDS
+
+    Returns:
+        tuple: (audio_file_path, video_id)
+    """
+    import yt_dlp
+    ydl_opts = add_download_range(
+        get_youtube_download_opts(get_audio_output_template()),
+        get_audio_window(max_seconds)
+    )
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(url, download=True)
-        audio_file = ydl.prepare_filename(info)
-        video_id = info['id']
+        if info is None:
+            info = ydl.extract_info(url, download=True)
+        else:
+            info = ydl.process_ie_result(copy.deepcopy(info), download=True)
+        return get_downloaded_path(ydl, info), info['id']
 
-    return audio_file, video_id
+
+def extract_youtube_video_id(url):
+    """
+    Extract the video ID from a YouTube URL without network access.
+
+    Args:
+        url: YouTube video URL string
+
+    Returns:
+        str: YouTube video ID or None if the URL is not recognized
+    """
+    match = YOUTUBE_ID_PATTERN.search(url)
+    return match.group(1) if match else None
 
 
 def get_normalized_youtube_url(video_id):
@@ -131,7 +365,7 @@ def get_prompt_structure():
     structure = get_quiz_structure_dict()
     return (
         json.dumps(structure, indent=2) +
-        "\n    ...\n    (exactly 10 questions)"
+        f"\n    ...\n    (exactly {settings.QUIZ_QUESTION_COUNT} questions)"
     )
 
 
@@ -153,24 +387,287 @@ Requirements:
   JSON."""
 
 
-def transcribe_audio(audio_file_path):
+def transcribe_audio_result(audio_file_path):
     """
-    Transcribe audio file using Whisper AI.
+    Transcribe audio file using Whisper AI and keep segment details.
 
     Args:
         audio_file_path: Path to audio file
 
     Returns:
-        str: Transcribed text from audio
+        dict: Whisper result with text, segments and language
     """
     try:
-        result = WHISPER_MODEL.transcribe(audio_file_path)
-        transcript = result["text"]
-        return transcript
+        return transcribe_file(audio_file_path)
     finally:
         cleanup_audio_file(audio_file_path)
 
 
+def transcribe_streamed_audio(info, max_seconds=None):
+    """
+    Transcribe a video's audio stream without writing it to disk.
+
+    Args:
+        info: yt-dlp info dict from the pre-flight resolution
+        max_seconds: Only transcribe this many seconds from the start
+
+    Returns:
+        dict: Whisper result with text, segments and language
+
+    Raises:
+        AudioStreamError: If the stream cannot be fetched or decoded
+    """
+    max_seconds = get_audio_window(max_seconds)
+    duration = info.get('duration')
+    if duration and max_seconds:
+        duration = min(duration, max_seconds)
+    blocks = iter_pcm_blocks(info, max_seconds=max_seconds)
+    return transcribe_pcm_stream(blocks, duration)
+
+
+def transcribe_audio(audio_file_path):
+    """
+    Transcribe audio file using Whisper AI.
+
+    Args:
+        audio_file_path: Path to audio file
+
+    Returns:
+        str: Transcribed text from audio
+    """
+    return transcribe_audio_result(audio_file_path)["text"]
+
+
+def get_caption_languages(info):
+    """
+    Get caption languages to try, original video language first.
+
+    Args:
+        info: yt-dlp info dict
+
+    Returns:
+        list: Language codes in order of preference
+    """
+    languages = list(settings.CAPTION_LANGUAGES)
+    original = info.get('language')
+    if original:
+        languages.insert(0, original)
+    return list(dict.fromkeys(languages))
+
+
+def pick_caption_format(formats):
+    """
+    Pick the first caption format that can be converted to text.
+
+    Args:
+        formats: List of yt-dlp caption format dictionaries
+
+    Returns:
+        dict: Caption format with url and ext keys or None
+    """
+    by_ext = {f.get('ext'): f for f in formats if f.get('url')}
+    for ext in CAPTION_FORMATS:
+        if ext in by_ext:
+            return by_ext[ext]
+    return None
+
+
+def select_subtitle_track(info):
+    """
+    Select manual subtitles, original video language first.
+
+    Args:
+        info: yt-dlp info dict from the pre-flight resolution
+
+    Returns:
+        tuple: (caption_format, language) or (None, None)
+    """
+    tracks = info.get('subtitles') or {}
+    for language in get_caption_languages(info):
+        track = pick_caption_format(tracks.get(language) or [])
+        if track is not None:
+            return track, language
+    return None, None
+
+
+def select_automatic_track(info):
+    """
+    Select automatic captions in the video's original language.
+
+    YouTube also lists machine translations of them into every
+    language, so only '-orig' tracks and the track of the video's own
+    language are accepted.
+
+    Args:
+        info: yt-dlp info dict from the pre-flight resolution
+
+    Returns:
+        tuple: (caption_format, language) or (None, None)
+    """
+    tracks = info.get('automatic_captions') or {}
+    keys = [key for key in tracks if key.endswith('-orig')]
+    if info.get('language'):
+        keys.append(info['language'])
+    for key in keys:
+        track = pick_caption_format(tracks.get(key) or [])
+        if track is not None:
+            return track, key.removesuffix('-orig')
+    return None, None
+
+
+def select_caption_track(info):
+    """
+    Select the best caption track, manual subtitles before automatic.
+
+    Args:
+        info: yt-dlp info dict from the pre-flight resolution
+
+    Returns:
+        tuple: (caption_format, language) or (None, None)
+    """
+    track, language = select_subtitle_track(info)
+    if track is None:
+        return select_automatic_track(info)
+    return track, language
+
+
+def parse_vtt_timestamp(value):
+    """
+    Convert a WebVTT timestamp to seconds.
+
+    Args:
+        value: Timestamp like '00:01:02.500' or '01:02.500'
+
+    Returns:
+        float: Seconds
+    """
+    seconds = 0.0
+    for part in value.strip().split()[0].split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def append_caption_segment(segments, start, end, text):
+    """
+    Append a caption cue, skipping empty and repeated lines.
+
+    Auto-generated captions repeat the previous line in every cue,
+    so only lines that differ from the last emitted one are kept.
+
+    Args:
+        segments: List of segment dictionaries to extend
+        start: Cue start in seconds
+        end: Cue end in seconds
+        text: Cue text, possibly multi-line
+    """
+    for line in text.splitlines():
+        line = html.unescape(VTT_TAG_PATTERN.sub('', line)).strip()
+        if line and (not segments or segments[-1]['text'] != line):
+            segments.append({'start': start, 'end': end, 'text': line})
+
+
+def parse_vtt(content):
+    """
+    Convert WebVTT captions into transcript segments.
+
+    Args:
+        content: WebVTT file content
+
+    Returns:
+        list: Segments with start, end and text keys
+    """
+    segments = []
+    for block in re.split(r'\n\s*\n', content.replace('\r', '')):
+        lines = block.strip().splitlines()
+        timing = next((i for i, ln in enumerate(lines) if '-->' in ln), None)
+        if timing is None:
+            continue
+        start, end = lines[timing].split('-->')
+        append_caption_segment(
+            segments,
+            parse_vtt_timestamp(start),
+            parse_vtt_timestamp(end),
+            '\n'.join(lines[timing + 1:])
+        )
+    return segments
+
+
+def get_srv_timing(element):
+    """
+    Read start and end seconds of an SRV caption element.
+
+    srv1 uses 'start'/'dur' in seconds, srv2/srv3 use 't'/'d' in ms.
+
+    Args:
+        element: XML element of a caption cue
+
+    Returns:
+        tuple: (start_seconds, end_seconds)
+    """
+    if 'start' in element.attrib:
+        start = float(element.get('start'))
+        return start, start + float(element.get('dur', 0))
+    start = float(element.get('t', 0)) / 1000
+    return start, start + float(element.get('d', 0)) / 1000
+
+
+def parse_srv(content):
+    """
+    Convert YouTube SRV (srv1/srv2/srv3) XML captions into segments.
+
+    Args:
+        content: SRV XML content
+
+    Returns:
+        list: Segments with start, end and text keys
+    """
+    segments = []
+    root = ElementTree.fromstring(content.encode('utf-8'))
+    for element in root.iter():
+        if element.tag in ('text', 'p'):
+            start, end = get_srv_timing(element)
+            text = ''.join(element.itertext())
+            append_caption_segment(segments, start, end, text)
+    return segments
+
+
+def captions_to_result(content, ext, language):
+    """
+    Convert caption file content into a Whisper-like result.
+
+    Args:
+        content: Caption file content
+        ext: Caption format ('vtt' or an SRV variant)
+        language: Caption language code
+
+    Returns:
+        dict: Result with text, segments and language keys
+    """
+    if ext == 'vtt':
+        segments = parse_vtt(content)
+    else:
+        segments = parse_srv(content)
+    text = ' '.join(segment['text'] for segment in segments)
+    return {'text': text, 'segments': segments, 'language': language}
+
+
+def download_captions(track, language):
+    """
+    Fetch a caption track through yt-dlp and convert it to text.
+
+    Args:
+        track: Caption format dictionary with url and ext keys
+        language: Caption language code
+
+    Returns:
+        dict: Result with text, segments and language keys
+    """
+    import yt_dlp
+    with yt_dlp.YoutubeDL(get_youtube_info_opts()) as ydl:
+        content = ydl.urlopen(track['url']).read().decode('utf-8')
+    return captions_to_result(content, track['ext'], language)
+
+
 def build_gemini_prompt(transcript):
     """
     Build prompt for Gemini AI.
@@ -228,62 +725,650 @@ def normalize_question_keys(quiz_data):
     return quiz_data
 
 
-def call_gemini_api(prompt):
+def get_quiz_schema():
+    """
+    Get the JSON schema of the quiz structure requested in the prompt.
+
+    Returns:
+        dict: Schema with the question and option counts fixed
+    """
+    return constrain_quiz_schema(
+        build_json_schema(get_quiz_structure_dict()),
+        settings.QUIZ_QUESTION_COUNT
+    )
+
+
+def call_llm(prompt, schema=None):
+    """
+    Run a prompt through the configured LLM provider.
+
+    Calls are rate limited, retried and optionally hedged
+    (see llm_calls).
+
+    Args:
+        prompt: Complete prompt string
+        schema: Optional JSON schema the output must follow
+
+    Returns:
+        dict: Provider result with text, provider, model, usage and
+            latency
+    """
+    return generate_with_policy(prompt, schema)
+
+
+def request_json(session, prompt, schema):
+    """
+    Get parsed JSON from the model, asking once to fix invalid JSON.
+
+    Args:
+        session: LLMSession sending the prompts
+        prompt: Prompt string
+        schema: JSON schema to request, or None
+
+    Returns:
+        dict: Parsed response with normalized question keys
+
+    Raises:
+        ValueError: If the corrected output is still not valid JSON
+    """
+    text = session(prompt, schema)
+    try:
+        data = json.loads(clean_json_response(text))
+    except ValueError:
+        text = session(build_json_fix_prompt(text), schema)
+        data = json.loads(clean_json_response(text))
+    return normalize_question_keys(data)
+
+
+def get_repair_schema(count):
+    """
+    Get the schema of a repair answer with count questions.
+
+    Args:
+        count: Number of replacement questions
+
+    Returns:
+        dict: Schema with only a questions list, or None if
+            structured output is disabled
+    """
+    if not settings.LLM_STRUCTURED_OUTPUT:
+        return None
+    schema = get_quiz_schema()
+    schema['properties'] = {'questions': schema['properties']['questions']}
+    schema['required'] = ['questions']
+    return constrain_quiz_schema(schema, count)
+
+
+def repair_quiz(session, quiz_data, transcript):
+    """
+    Replace invalid or missing questions with targeted follow-up calls.
+
+    Args:
+        session: LLMSession sending the prompts
+        quiz_data: Normalized quiz data, repaired in place
+        transcript: Transcript the quiz was generated from
+
+    Raises:
+        ValueError: If questions are still invalid after
+            LLM_REPAIR_ATTEMPTS follow-up calls
+    """
+    questions = quiz_data.setdefault('questions', [])
+    for _ in range(settings.LLM_REPAIR_ATTEMPTS):
+        slots = find_repair_slots(questions, settings.QUIZ_QUESTION_COUNT)
+        if not slots:
+            return
+        prompt = build_repair_prompt(quiz_data, slots, transcript)
+        reply = request_json(session, prompt, get_repair_schema(len(slots)))
+        for index, question in zip(slots, reply.get('questions', [])):
+            questions[index:index + 1] = [question]
+    if find_repair_slots(questions, settings.QUIZ_QUESTION_COUNT):
+        raise ValueError("Generated quiz questions are still invalid")
+
+
+def prepare_transcript(transcript, on_stage=None):
     """
-    Call Gemini API with prompt.
+    Compact a transcript to TRANSCRIPT_TOKEN_BUDGET before prompting.
+
+    Token counts before and after are reported as the 'transcript'
+    job metric.
 
     Args:
-        prompt: Complete prompt string for API
+        transcript: Transcribed text from audio
+        on_stage: Optional progress callback receiving metrics
 
     Returns:
-        str: Raw response text from Gemini
+        str: Compacted transcript, or the original one when
+            TRANSCRIPT_COMPACTION is off
     """
-    client = genai.Client(api_key=settings.GEMINI_API_KEY)
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt
+    if not settings.TRANSCRIPT_COMPACTION:
+        return transcript
+    compacted, stats = compact_transcript(
+        transcript, settings.TRANSCRIPT_TOKEN_BUDGET
     )
-    return response.text
+    report_metric(on_stage, 'transcript', stats)
+    return compacted
 
 
-def generate_quiz_with_gemini(transcript):
+def generate_quiz(transcript, on_stage=None):
     """
-    Generate quiz from transcript using Gemini AI.
+    Generate quiz from transcript using the configured LLM provider.
+
+    The transcript is compacted first. The quiz schema is requested
+    when LLM_STRUCTURED_OUTPUT is on, and invalid questions are
+    repaired instead of regenerating the quiz. Provider, model, calls,
+    token usage and latency are reported as the 'llm' job metric.
 
     Args:
         transcript: Transcribed text from audio
+        on_stage: Optional progress callback receiving metrics
 
     Returns:
         dict: Quiz data with title, description, questions
 
     Raises:
-        ValueError: If GEMINI_API_KEY is not configured
+        ValueError: If the provider is unknown, GEMINI_API_KEY is
+            missing for Gemini, or the output cannot be repaired
     """
-    if not settings.GEMINI_API_KEY:
-        raise ValueError("GEMINI_API_KEY is not set")
+    transcript = prepare_transcript(transcript, on_stage)
+    session = LLMSession(call_llm)
+    schema = get_quiz_schema() if settings.LLM_STRUCTURED_OUTPUT else None
+    try:
+        prompt = build_gemini_prompt(transcript)
+        quiz_data = request_json(session, prompt, schema)
+        repair_quiz(session, quiz_data, transcript)
+    finally:
+        report_metric(on_stage, 'llm', session.summary())
+    return quiz_data
 
-    prompt = build_gemini_prompt(transcript)
-    response_text = call_gemini_api(prompt)
-    cleaned_text = clean_json_response(response_text)
-    quiz_data = json.loads(cleaned_text)
-    quiz_data = normalize_question_keys(quiz_data)
 
-    return quiz_data
+def report_stage(on_stage, stage):
+    """
+    Notify an optional progress callback about a pipeline stage.
+
+    Args:
+        on_stage: Callable accepting a stage name, or None
+        stage: Name of the stage that is about to start
+    """
+    if on_stage is not None:
+        on_stage(stage)
+
+
+def report_metric(on_stage, name, value):
+    """
+    Pass a metric to a progress callback that records metrics.
+
+    Args:
+        on_stage: Progress callback, or None
+        name: Metric name
+        value: JSON serializable value
+    """
+    record = getattr(on_stage, 'record', None)
+    if record is not None:
+        record(name, value)
+
+
+def resolve_video_id(url):
+    """
+    Resolve the canonical video ID, parsing the URL when possible.
+
+    Args:
+        url: YouTube video URL
+
+    Returns:
+        str: YouTube video ID
+    """
+    video_id = extract_youtube_video_id(url)
+    if video_id is None:
+        video_id = resolve_video_info(url)['id']
+    return video_id
+
+
+def get_video_info(video_id):
+    """
+    Get pre-flight info of a video from the cache or YouTube.
+
+    Args:
+        video_id: YouTube video ID string
+
+    Returns:
+        dict: yt-dlp info dict
+    """
+    info = get_cached_video_info(video_id)
+    if info is None:
+        info = resolve_video_info(get_normalized_youtube_url(video_id))
+    return info
+
+
+def get_audio_size(info):
+    """
+    Get the approximate size of the selected audio in bytes.
+
+    Args:
+        info: yt-dlp info dict from the pre-flight resolution
+
+    Returns:
+        int: Size in bytes, 0 if yt-dlp reported none
+    """
+    formats = info.get('requested_formats') or [info]
+    return sum(
+        fmt.get('filesize') or fmt.get('filesize_approx') or 0
+        for fmt in formats
+    )
+
+
+def get_duration_window(info):
+    """
+    Get the seconds allowed by VIDEO_MAX_DURATION if it is exceeded.
+
+    Videos of unknown length (e.g. running livestreams) count as
+    exceeding the limit.
+
+    Args:
+        info: yt-dlp info dict from the pre-flight resolution
+
+    Returns:
+        int: Allowed seconds, or None if the video is within the limit
+    """
+    limit = settings.VIDEO_MAX_DURATION
+    duration = info.get('duration')
+    if limit and (not duration or duration > limit):
+        return limit
+    return None
+
+
+def get_size_window(info):
+    """
+    Get the seconds allowed by VIDEO_MAX_BYTES if it is exceeded.
+
+    Args:
+        info: yt-dlp info dict from the pre-flight resolution
+
+    Returns:
+        int: Allowed seconds, or None if the audio is within the limit
+    """
+    limit = settings.VIDEO_MAX_BYTES
+    size = get_audio_size(info)
+    duration = info.get('duration')
+    if limit and size > limit and duration:
+        return int(duration * limit / size)
+    return None
+
+
+def reject_oversized_video(info):
+    """
+    Raise if a video exceeds the duration or size limits.
+
+    Args:
+        info: yt-dlp info dict from the pre-flight resolution
+
+    Raises:
+        VideoTooLargeError: If a limit is exceeded
+    """
+    if get_duration_window(info):
+        raise VideoTooLargeError(
+            f'Video is longer than {settings.VIDEO_MAX_DURATION} seconds'
+        )
+    if get_size_window(info):
+        raise VideoTooLargeError(
+            f'Video audio exceeds {settings.VIDEO_MAX_BYTES} bytes', 413
+        )
+
+
+def admit_video(info):
+    """
+    Apply the length and size limits to a video before fetching audio.
+
+    With VIDEO_OVERSIZE_POLICY 'truncate' an oversized video is cut to
+    the longest window the limits allow instead of being rejected.
+
+    Args:
+        info: yt-dlp info dict from the pre-flight resolution
+
+    Returns:
+        int: Seconds to fetch, or None to fetch the whole video
+
+    Raises:
+        VideoTooLargeError: If a limit is exceeded and not truncating
+    """
+    if settings.VIDEO_OVERSIZE_POLICY != TRUNCATE_OVERSIZE:
+        reject_oversized_video(info)
+        return None
+    windows = [get_duration_window(info), get_size_window(info)]
+    windows = [window for window in windows if window]
+    return min(windows) if windows else None
+
+
+def check_video_limits(url):
+    """
+    Reject an oversized video from pre-flight metadata before queueing.
+
+    Pre-flight failures are left to the job, which reports them.
+
+    Args:
+        url: YouTube video URL
+
+    Raises:
+        VideoTooLargeError: If a limit is exceeded and not truncating
+    """
+    from yt_dlp.utils import DownloadError
+    if not (settings.VIDEO_MAX_DURATION or settings.VIDEO_MAX_BYTES):
+        return
+    if settings.VIDEO_OVERSIZE_POLICY == TRUNCATE_OVERSIZE:
+        return
+    try:
+        info = resolve_video_info(url)
+    except DownloadError:
+        return
+    reject_oversized_video(info)
+
+
+def stream_youtube_video(info, on_stage=None, max_seconds=None):
+    """
+    Transcribe a video while its audio is still streaming in.
+
+    Args:
+        info: yt-dlp info dict from the pre-flight resolution
+        on_stage: Optional callable notified with each stage name
+        max_seconds: Only transcribe this many seconds from the start
+
+    Returns:
+        dict: Whisper result or None if streaming failed
+    """
+    report_stage(on_stage, 'streaming')
+    try:
+        return transcribe_streamed_audio(info, max_seconds)
+    except AudioStreamError as e:
+        logger.warning('Audio streaming failed, downloading: %s', e)
+        return None
+
+
+def download_youtube_video(video_id, info, on_stage=None, max_seconds=None):
+    """
+    Download a video's audio to a file and transcribe it.
+
+    Args:
+        video_id: YouTube video ID string
+        info: yt-dlp info dict from the pre-flight resolution
+        on_stage: Optional callable notified with each stage name
+        max_seconds: Only fetch this many seconds from the start
+
+    Returns:
+        dict: Whisper result with text, segments and language
+    """
+    url = get_normalized_youtube_url(video_id)
+    report_stage(on_stage, 'downloading')
+    audio_file, _ = download_youtube_audio(url, info, max_seconds)
+    report_stage(on_stage, 'transcribing')
+    return transcribe_audio_result(audio_file)
+
+
+def get_whisper_model_name(info, max_seconds=None):
+    """
+    Get the name Whisper transcripts of a video are stored under.
+
+    Transcripts of only the first seconds of a video (truncated
+    oversized videos, AUDIO_MAX_SECONDS) carry the window in the name,
+    so they are never served as the full transcript and are
+    transcribed again when the limits change.
+
+    Args:
+        info: yt-dlp info dict from the pre-flight resolution
+        max_seconds: Window from admission control, or None
+
+    Returns:
+        str: WHISPER_MODEL_NAME, with '@<seconds>s' for a window
+    """
+    window = get_audio_window(max_seconds)
+    duration = info.get('duration')
+    if not window or (duration and duration <= window):
+        return settings.WHISPER_MODEL_NAME
+    return f'{settings.WHISPER_MODEL_NAME}@{int(window)}s'
+
+
+def transcribe_video_audio(video_id, info, on_stage=None, max_seconds=None):
+    """
+    Transcribe a video by streaming, or by downloading its audio.
+
+    Args:
+        video_id: YouTube video ID string
+        info: yt-dlp info dict from the pre-flight resolution
+        on_stage: Optional callable notified with each stage name
+        max_seconds: Only transcribe this many seconds from the start
+
+    Returns:
+        dict: Whisper result with text, segments and language
+    """
+    result = None
+    if settings.AUDIO_STREAMING:
+        result = stream_youtube_video(info, on_stage, max_seconds)
+    if result is None:
+        result = download_youtube_video(
+            video_id, info, on_stage, max_seconds
+        )
+    return result
+
 
+def transcribe_youtube_video(video_id, on_stage=None):
+    """
+    Download and transcribe a video, storing the transcript.
+
+    A transcript of the same window stored earlier is reused.
+
+    Args:
+        video_id: YouTube video ID string
+        on_stage: Optional callable notified with each stage name
+
+    Returns:
+        str: Transcript text
+
+    Raises:
+        VideoTooLargeError: If the video exceeds the configured limits
+    """
+    info = get_video_info(video_id)
+    max_seconds = admit_video(info)
+    model_name = get_whisper_model_name(info, max_seconds)
+    cached = get_cached_transcript(video_id, model_name)
+    if cached is not None:
+        return cached.text
+    result = transcribe_video_audio(video_id, info, on_stage, max_seconds)
+    store_transcript(video_id, model_name, result)
+    return result['text']
+
+
+def fetch_caption_transcript(video_id, on_stage=None):
+    """
+    Build a transcript from existing YouTube captions, if any.
+
+    Args:
+        video_id: YouTube video ID string
+        on_stage: Optional callable notified with each stage name
+
+    Returns:
+        str: Transcript text or None if no usable captions exist
+    """
+    track, language = select_caption_track(get_video_info(video_id))
+    if track is None:
+        return None
+    report_stage(on_stage, 'fetching_captions')
+    result = download_captions(track, language)
+    if not result['text'].strip():
+        return None
+    store_transcript(video_id, CAPTION_MODEL_NAME, result)
+    return result['text']
 
-def create_quiz_from_url(url, user):
+
+def get_transcript_model_names(policy):
+    """
+    Get cached transcript model names acceptable for a source policy.
+
+    Args:
+        policy: Transcript source policy
+
+    Returns:
+        list: Model names in order of preference
+    """
+    if policy == WHISPER_ONLY:
+        return [settings.WHISPER_MODEL_NAME]
+    if policy == CAPTIONS_ONLY:
+        return [CAPTION_MODEL_NAME]
+    return [CAPTION_MODEL_NAME, settings.WHISPER_MODEL_NAME]
+
+
+def get_stored_transcript(video_id, policy):
+    """
+    Get a cached transcript acceptable for a source policy.
+
+    Args:
+        video_id: YouTube video ID string
+        policy: Transcript source policy
+
+    Returns:
+        Transcript: Stored transcript or None
+    """
+    for model_name in get_transcript_model_names(policy):
+        cached = get_cached_transcript(video_id, model_name)
+        if cached is not None:
+            return cached
+    return None
+
+
+def transcribe_once(video_id, on_stage=None):
+    """
+    Transcribe a video, sharing the work with concurrent callers.
+
+    The key is the video alone, whatever source policy led here, so
+    two jobs never download into the same audio file at once.
+
+    Args:
+        video_id: YouTube video ID string
+        on_stage: Optional callable notified with each stage name
+
+    Returns:
+        str: Transcript text
+    """
+    return run_single_flight(
+        ('transcribe', video_id),
+        partial(transcribe_youtube_video, video_id, on_stage),
+        on_wait=partial(report_stage, on_stage, 'waiting')
+    )
+
+
+def fetch_transcript(video_id, policy, on_stage=None):
+    """
+    Get a new transcript from captions or by transcribing.
+
+    Args:
+        video_id: YouTube video ID string
+        policy: Transcript source policy
+        on_stage: Optional callable notified with each stage name
+
+    Returns:
+        str: Transcript text
+
+    Raises:
+        ValueError: If captions are required but none exist
+    """
+    if policy != WHISPER_ONLY:
+        transcript = fetch_caption_transcript(video_id, on_stage)
+        if transcript is not None:
+            return transcript
+        if policy == CAPTIONS_ONLY:
+            raise ValueError("No captions available for this video")
+    return transcribe_once(video_id, on_stage)
+
+
+def get_transcript(video_id, on_stage=None, source=None):
+    """
+    Get a transcript from the cache, captions, or by transcribing.
+
+    While another process holds the video's lease it is waited for,
+    and its stored transcript is used afterwards if the policy accepts
+    it. The lease is per video, since all policies share the download.
+
+    Args:
+        video_id: YouTube video ID string
+        on_stage: Optional callable notified with each stage name
+        source: Transcript source policy, defaults to the setting
+
+    Returns:
+        str: Transcript text
+
+    Raises:
+        ValueError: If captions are required but none exist
+    """
+    policy = source or settings.TRANSCRIPT_SOURCE_POLICY
+    cached = get_stored_transcript(video_id, policy)
+    if cached is not None:
+        return cached.text
+    on_wait = partial(report_stage, on_stage, 'waiting')
+    with hold_lease(video_id, on_wait):
+        cached = get_stored_transcript(video_id, policy)
+        if cached is not None:
+            return cached.text
+        return fetch_transcript(video_id, policy, on_stage)
+
+
+def generate_quiz_for_video(video_id, on_stage=None, source=None):
+    """
+    Get the transcript of a video and generate quiz data from it.
+
+    Args:
+        video_id: YouTube video ID string
+        on_stage: Optional callable notified with each stage name
+        source: Transcript source policy, defaults to the setting
+
+    Returns:
+        dict: Quiz data
+    """
+    transcript = get_transcript(video_id, on_stage, source)
+    report_stage(on_stage, 'generating')
+    return generate_quiz(transcript, on_stage)
+
+
+def get_reusable_quiz_data(normalized_url):
+    """
+    Get quiz data of an earlier quiz for the same video, if enabled.
+
+    Args:
+        normalized_url: Normalized YouTube URL
+
+    Returns:
+        dict: Quiz data or None if reuse is disabled or nothing exists
+    """
+    if not settings.QUIZ_REUSE_EXISTING:
+        return None
+    return get_quiz_data_for_video(normalized_url)
+
+
+def create_quiz_from_url(url, user, on_stage=None, transcript_source=None):
     """
     Create quiz from YouTube URL.
 
+    The video ID is resolved before any audio is fetched, so cached
+    transcripts (and optionally existing quizzes) short-circuit the
+    download and Whisper transcription entirely. Existing captions
+    are used instead of Whisper unless the policy forbids it.
+    Concurrent requests for the same video in this process share one
+    download, transcript and quiz generation.
+
     Args:
         url: YouTube video URL
         user: User model instance (currently unused)
+        on_stage: Optional callable notified with each stage name
+        transcript_source: Optional transcript source policy
 
     Returns:
         tuple: (quiz_data, normalized_url)
     """
-    audio_file, video_id = download_youtube_audio(url)
+    report_stage(on_stage, 'resolving')
+    video_id = resolve_video_id(url)
     normalized_url = get_normalized_youtube_url(video_id)
-    transcript = transcribe_audio(audio_file)
-    quiz_data = generate_quiz_with_gemini(transcript)
+    quiz_data = get_reusable_quiz_data(normalized_url)
+    if quiz_data is None:
+        policy = transcript_source or settings.TRANSCRIPT_SOURCE_POLICY
+        quiz_data = run_single_flight(
+            (video_id, policy),
+            partial(generate_quiz_for_video, video_id, on_stage, policy),
+            on_wait=partial(report_stage, on_stage, 'waiting')
+        )
     return quiz_data, normalized_url
@@ -0,0 +1,138 @@
+"""
+Process-wide Gemini client.
+One genai.Client (and with it one pooled HTTP connection) is shared by
+all quiz jobs of a process instead of being built per call, a
+semaphore caps concurrent requests, and a forked child process builds
+its own client rather than reusing the parent's sockets.
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+_client_state = {'client': None, 'semaphore': None, 'pid': None}
+_client_lock = threading.Lock()
+
+
+def get_http_options():
+    """
+    Build HTTP options with timeout, keep-alive and optional base URL.
+
+    Returns:
+        google.genai.types.HttpOptions: Options for genai.Client
+    """
+    import httpx
+    from google.genai import types
+    return types.HttpOptions(
+        base_url=settings.GEMINI_BASE_URL or None,
+        timeout=int(settings.GEMINI_TIMEOUT * 1000),
+        client_args={'limits': httpx.Limits(
+            max_keepalive_connections=max(1, settings.GEMINI_MAX_CONCURRENCY),
+            keepalive_expiry=settings.GEMINI_KEEPALIVE_SECONDS
+        )}
+    )
+
+
+def create_gemini_client():
+    """
+    Construct a new Gemini client from settings.
+
+    Returns:
+        google.genai.Client: Client with its own connection pool
+    """
+    from google import genai
+    return genai.Client(
+        api_key=settings.GEMINI_API_KEY, http_options=get_http_options()
+    )
+
+
+def get_client_state():
+    """
+    Get the client state of this process, starting fresh after a fork.
+
+    The parent's client is dropped without closing it, since closing
+    would shut down connections the parent is still using.
+
+    Returns:
+        dict: State with client, semaphore and pid
+    """
+    with _client_lock:
+        if _client_state['pid'] != os.getpid():
+            limit = settings.GEMINI_MAX_CONCURRENCY
+            _client_state.update(
+                client=None,
+                semaphore=threading.BoundedSemaphore(limit) if limit else None,
+                pid=os.getpid()
+            )
+        return _client_state
+
+
+def get_gemini_client():
+    """
+    Get the shared Gemini client, creating it on first use.
+
+    Returns:
+        google.genai.Client: Process-wide client
+    """
+    state = get_client_state()
+    with _client_lock:
+        if state['client'] is None:
+            state['client'] = create_gemini_client()
+        return state['client']
+
+
+@contextmanager
+def gemini_slot():
+    """
+    Wait for one of GEMINI_MAX_CONCURRENCY request slots.
+    """
+    semaphore = get_client_state()['semaphore']
+    if semaphore is None:
+        yield
+        return
+    with semaphore:
+        yield
+
+
+def reset_gemini_client():
+    """
+    Close the shared client so the next call builds a new one.
+    """
+    with _client_lock:
+        client = _client_state['client']
+        _client_state.update(client=None, semaphore=None, pid=None)
+    if client is not None:
+        client.close()
+
+
+def generate_response(prompt, client=None, config=None):
+    """
+    Send a prompt to the configured Gemini model.
+
+    Args:
+        prompt: Complete prompt string
+        client: Client to use instead of the shared one
+        config: Optional GenerateContentConfig (dict), e.g. a schema
+
+    Returns:
+        google.genai.types.GenerateContentResponse: Full response
+    """
+    with gemini_slot():
+        return (client or get_gemini_client()).models.generate_content(
+            model=settings.GEMINI_MODEL, contents=prompt, config=config
+        )
+
+
+def generate_content(prompt, client=None):
+    """
+    Send a prompt to the configured Gemini model and get the text.
+
+    Args:
+        prompt: Complete prompt string
+        client: Client to use instead of the shared one
+
+    Returns:
+        str: Response text
+    """
+    return generate_response(prompt, client).text
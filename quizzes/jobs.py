@@ -0,0 +1,335 @@
+"""
+Background worker pool for quiz generation jobs.
+Runs the download, transcription and Gemini pipeline outside the
+request/response cycle so web workers stay free for API traffic.
+Jobs only live in the memory of the process that queued them, so each
+process touches its jobs' updated_at on a heartbeat; jobs left without
+heartbeat by a restart or crash are re-queued (pending) or failed
+(running) by any other process.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .functions import create_quiz_from_url
+from .utils import create_quiz_in_db
+
+logger = logging.getLogger(__name__)
+
+ORPHANED_ERROR = 'The server stopped before the job finished'
+
+_executor = None
+_executor_lock = threading.Lock()
+_held_jobs = set()
+_held_jobs_lock = threading.Lock()
+
+
+def get_job_executor():
+    """
+    Get the process-wide thread pool that runs quiz jobs.
+
+    The heartbeat thread is started with it.
+
+    Returns:
+        ThreadPoolExecutor: Lazily created executor
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.QUIZ_JOB_WORKERS,
+                thread_name_prefix='quiz-job'
+            )
+            threading.Thread(
+                target=run_heartbeat, name='quiz-job-heartbeat', daemon=True
+            ).start()
+    return _executor
+
+
+def submit_job(job_id):
+    """
+    Hold a job in this process and run it on the worker pool.
+
+    Args:
+        job_id: Primary key of the QuizJob to run
+    """
+    with _held_jobs_lock:
+        _held_jobs.add(job_id)
+    get_job_executor().submit(run_quiz_job, job_id)
+
+
+def enqueue_quiz_job(job):
+    """
+    Schedule a job on the worker pool once the transaction commits.
+
+    Args:
+        job: Saved QuizJob model instance
+    """
+    job_id = job.pk
+    transaction.on_commit(lambda: submit_job(job_id))
+
+
+def get_stale_cutoff():
+    """
+    Get the time before which an active job counts as orphaned.
+
+    Returns:
+        datetime: Now minus QUIZ_JOB_STALE_SECONDS
+    """
+    return timezone.now() - timedelta(seconds=settings.QUIZ_JOB_STALE_SECONDS)
+
+
+def send_heartbeat():
+    """
+    Touch updated_at of the jobs held by this process.
+    """
+    from .models import QuizJob
+    with _held_jobs_lock:
+        job_ids = list(_held_jobs)
+    if job_ids:
+        QuizJob.objects.filter(pk__in=job_ids).update(
+            updated_at=timezone.now()
+        )
+
+
+def requeue_pending_jobs(cutoff):
+    """
+    Claim orphaned pending jobs and run them in this process.
+
+    A job is claimed by moving its updated_at, so only one process
+    re-queues it.
+
+    Args:
+        cutoff: Jobs not updated since are orphaned
+
+    Returns:
+        int: Number of re-queued jobs
+    """
+    from .models import QuizJob
+    pending = QuizJob.objects.filter(
+        status=QuizJob.Status.PENDING, updated_at__lt=cutoff
+    )
+    claimed = [
+        job_id for job_id in pending.values_list('pk', flat=True)
+        if pending.filter(pk=job_id).update(updated_at=timezone.now())
+    ]
+    for job_id in claimed:
+        submit_job(job_id)
+    return len(claimed)
+
+
+def recover_stale_jobs():
+    """
+    Recover jobs whose process stopped sending heartbeats.
+
+    Pending jobs are re-queued. Running jobs are failed, since their
+    pipeline may be what brought the process down.
+
+    Returns:
+        tuple: (number of failed jobs, number of re-queued jobs)
+    """
+    from .models import QuizJob
+    cutoff, now = get_stale_cutoff(), timezone.now()
+    failed = QuizJob.objects.filter(
+        status=QuizJob.Status.RUNNING, updated_at__lt=cutoff
+    ).update(
+        status=QuizJob.Status.FAILED, error=ORPHANED_ERROR,
+        finished_at=now, updated_at=now
+    )
+    return failed, requeue_pending_jobs(cutoff)
+
+
+def recover_if_stale(job):
+    """
+    Recover orphaned jobs if the given one is among them.
+
+    Lets a client polling a job of a stopped process see it resolved.
+
+    Args:
+        job: QuizJob model instance, refreshed if recovery ran
+    """
+    if job.status in (job.Status.PENDING, job.Status.RUNNING) and \
+            job.updated_at < get_stale_cutoff():
+        recover_stale_jobs()
+        job.refresh_from_db()
+
+
+def run_heartbeat():
+    """
+    Send heartbeats and recover orphaned jobs until the process exits.
+    """
+    while True:
+        close_old_connections()
+        try:
+            send_heartbeat()
+            recover_stale_jobs()
+        except Exception:
+            logger.exception('Quiz job heartbeat failed')
+        finally:
+            close_old_connections()
+        time.sleep(settings.QUIZ_JOB_HEARTBEAT_SECONDS)
+
+
+def update_job(job, **fields):
+    """
+    Set fields on a job and persist only those columns.
+
+    Args:
+        job: QuizJob model instance
+        **fields: Field names and values to update
+    """
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.save(update_fields=[*fields, 'updated_at'])
+
+
+class JobProgress:
+    """
+    Stage callback that records the current stage and its duration,
+    plus metrics reported by the pipeline.
+    """
+
+    def __init__(self, job):
+        """
+        Start tracking stages for a job.
+
+        Args:
+            job: QuizJob model instance
+        """
+        self.job = job
+        self.stage = None
+        self.started = time.monotonic()
+
+    def __call__(self, stage):
+        """
+        Close the running stage and mark a new one as current.
+
+        Args:
+            stage: Name of the stage that is about to start
+        """
+        self.finish()
+        self.stage = stage
+        self.started = time.monotonic()
+        update_job(self.job, stage=stage)
+
+    def record(self, name, value):
+        """
+        Store a pipeline metric, saved with the job's outcome.
+
+        Args:
+            name: Metric name
+            value: JSON serializable value
+        """
+        self.job.metrics[name] = value
+
+    def finish(self):
+        """
+        Store the elapsed seconds of the running stage in job metrics.
+        """
+        if self.stage is None:
+            return
+        stages = self.job.metrics.setdefault('stages', {})
+        stages[self.stage] = round(time.monotonic() - self.started, 3)
+        self.stage = None
+
+
+def fail_job(job, progress, error):
+    """
+    Mark a job as failed with the given error.
+
+    Args:
+        job: QuizJob model instance
+        progress: JobProgress tracking the job
+        error: Exception raised by the pipeline
+    """
+    progress.finish()
+    update_job(
+        job,
+        status=job.Status.FAILED,
+        error=str(error),
+        metrics=job.metrics,
+        finished_at=timezone.now()
+    )
+
+
+def complete_job(job, progress, quiz):
+    """
+    Mark a job as succeeded and link the created quiz.
+
+    Args:
+        job: QuizJob model instance
+        progress: JobProgress tracking the job
+        quiz: Created Quiz model instance
+    """
+    progress.finish()
+    update_job(
+        job,
+        status=job.Status.SUCCEEDED,
+        stage='done',
+        quiz=quiz,
+        metrics=job.metrics,
+        finished_at=timezone.now()
+    )
+
+
+def run_pipeline(job, progress):
+    """
+    Generate quiz data for a job and persist the quiz.
+
+    Args:
+        job: QuizJob model instance
+        progress: JobProgress receiving stage updates
+
+    Returns:
+        Quiz: Created quiz model instance
+    """
+    quiz_data, normalized_url = create_quiz_from_url(
+        job.url,
+        job.user,
+        on_stage=progress,
+        transcript_source=job.transcript_source or None
+    )
+    progress('saving')
+    return create_quiz_in_db(job.user, quiz_data, normalized_url)
+
+
+def execute_quiz_job(job):
+    """
+    Run the quiz generation pipeline for a job and record the outcome.
+
+    Args:
+        job: QuizJob model instance
+    """
+    progress = JobProgress(job)
+    update_job(job, status=job.Status.RUNNING, started_at=timezone.now())
+    try:
+        quiz = run_pipeline(job, progress)
+    except Exception as e:
+        logger.exception('Quiz job %s failed', job.pk)
+        fail_job(job, progress, e)
+        return
+    complete_job(job, progress, quiz)
+
+
+def run_quiz_job(job_id):
+    """
+    Worker entry point: load a job and execute it.
+
+    Args:
+        job_id: Primary key of the QuizJob to run
+    """
+    from .models import QuizJob
+    close_old_connections()
+    try:
+        job = QuizJob.objects.select_related('user').get(pk=job_id)
+        execute_quiz_job(job)
+    finally:
+        with _held_jobs_lock:
+            _held_jobs.discard(job_id)
+        close_old_connections()
@@ -0,0 +1,399 @@
+"""
+Rate limiting, retries and hedging around LLM provider calls.
+Requests and tokens per minute are counted in a Django cache, so
+processes sharing a cache backend (Redis, Memcached) share one budget.
+Throttled (429) and transient failures are retried with exponential
+backoff and jitter, honoring Retry-After, and a slow call can be
+hedged with a second request once it exceeds the recent p95 latency.
+"""
+import email.utils
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from .llm_providers import estimate_tokens, get_llm_provider
+
+RETRYABLE_STATUS = (408, 429, 500, 502, 503, 504)
+COUNTER_NAMES = ('calls', 'throttled', 'retried', 'hedged', 'hedge_wins')
+WINDOW_SECONDS = 60
+RETRY_DELAY_PATTERN = re.compile(r"'retryDelay': '([\d.]+)s'")
+
+_latencies = deque(maxlen=200)
+_latencies_lock = threading.Lock()
+_hedge_executor = None
+_hedge_lock = threading.Lock()
+
+
+class LLMRateLimitTimeout(RuntimeError):
+    """
+    Raised when the rate budget stays exhausted for LLM_RATE_MAX_WAIT.
+    """
+
+
+def get_rate_cache():
+    """
+    Get the cache holding rate windows and call counters.
+
+    Returns:
+        BaseCache: Configured LLM_RATE_CACHE_ALIAS cache
+    """
+    return caches[settings.LLM_RATE_CACHE_ALIAS]
+
+
+def record_counter(name, count=1):
+    """
+    Add to an LLM call counter.
+
+    Args:
+        name: One of COUNTER_NAMES
+        count: Amount to add
+    """
+    cache = get_rate_cache()
+    cache.add(f'llm-stats:{name}', 0, timeout=None)
+    cache.incr(f'llm-stats:{name}', count)
+
+
+def get_llm_stats():
+    """
+    Get the LLM call counters.
+
+    Returns:
+        dict: Count per name in COUNTER_NAMES
+    """
+    values = get_rate_cache().get_many(
+        [f'llm-stats:{name}' for name in COUNTER_NAMES]
+    )
+    return {name: values.get(f'llm-stats:{name}', 0) for name in COUNTER_NAMES}
+
+
+def take_from_window(name, cost, limit, now):
+    """
+    Try to spend cost from the current one-minute budget.
+
+    Counters are updated with atomic cache increments and the spend
+    is returned when it would exceed the limit.
+
+    Args:
+        name: Budget name ('requests' or 'tokens')
+        cost: Amount to spend, capped at limit
+        limit: Budget per minute, 0 for unlimited
+        now: Current UNIX time
+
+    Returns:
+        float: 0 if spent, else seconds until the next window
+    """
+    if not limit:
+        return 0
+    cost = min(cost, limit)
+    key = f'llm-rate:{name}:{int(now // WINDOW_SECONDS)}'
+    cache = get_rate_cache()
+    cache.add(key, 0, timeout=WINDOW_SECONDS * 2)
+    if cache.incr(key, cost) <= limit:
+        return 0
+    cache.decr(key, cost)
+    return WINDOW_SECONDS - now % WINDOW_SECONDS
+
+
+def take_budget(tokens, now):
+    """
+    Try to spend one request and its tokens from the current minute.
+
+    Args:
+        tokens: Estimated tokens of the call
+        now: Current UNIX time
+
+    Returns:
+        float: 0 if spent, else seconds until the next window
+    """
+    wait_for = take_from_window(
+        'requests', 1, settings.LLM_REQUESTS_PER_MINUTE, now
+    )
+    if wait_for:
+        return wait_for
+    wait_for = take_from_window(
+        'tokens', tokens, settings.LLM_TOKENS_PER_MINUTE, now
+    )
+    if wait_for:
+        release_request(now)
+    return wait_for
+
+
+def acquire_budget(tokens):
+    """
+    Wait until the request and token budgets allow one more call.
+
+    Args:
+        tokens: Estimated tokens of the call
+
+    Raises:
+        LLMRateLimitTimeout: If no budget frees up in LLM_RATE_MAX_WAIT
+    """
+    deadline = time.monotonic() + settings.LLM_RATE_MAX_WAIT
+    while wait_for := take_budget(tokens, time.time()):
+        if time.monotonic() + wait_for > deadline:
+            raise LLMRateLimitTimeout('LLM rate budget exhausted')
+        record_counter('throttled')
+        time.sleep(wait_for + random.uniform(0, 1))
+
+
+def release_request(now):
+    """
+    Give back a request that was counted but could not be sent.
+
+    Args:
+        now: UNIX time the request was counted at
+    """
+    if settings.LLM_REQUESTS_PER_MINUTE:
+        key = f'llm-rate:requests:{int(now // WINDOW_SECONDS)}'
+        get_rate_cache().decr(key)
+
+
+def settle_tokens(estimate, result):
+    """
+    Correct the token budget by the difference to the reported usage.
+
+    Args:
+        estimate: Tokens counted before the call
+        result: Provider result with usage
+    """
+    usage = result.get('usage') or {}
+    if not settings.LLM_TOKENS_PER_MINUTE or \
+            usage.get('prompt_tokens') is None:
+        return
+    actual = usage['prompt_tokens'] + (usage.get('completion_tokens') or 0)
+    key = f'llm-rate:tokens:{int(time.time() // WINDOW_SECONDS)}'
+    cache = get_rate_cache()
+    cache.add(key, 0, timeout=WINDOW_SECONDS * 2)
+    cache.incr(key, actual - estimate)
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header given in seconds or as an HTTP date.
+
+    Args:
+        value: Header value
+
+    Returns:
+        float: Seconds to wait, or None if unparsable
+    """
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - timezone.now()).total_seconds())
+
+
+def get_error_response(error):
+    """
+    Get the HTTP status and headers of a failed provider call.
+
+    Args:
+        error: Exception raised by a provider
+
+    Returns:
+        tuple: (status code or None, headers mapping)
+    """
+    import httpx
+    from google.genai.errors import APIError
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code, error.response.headers
+    if isinstance(error, APIError):
+        return error.code, getattr(error.response, 'headers', None) or {}
+    return None, {}
+
+
+def get_retry_after(error):
+    """
+    Decide whether a failed call may be retried.
+
+    Args:
+        error: Exception raised by a provider
+
+    Returns:
+        float: Seconds the server asked to wait (0 if it did not say),
+            or None if the error is not retryable
+    """
+    import httpx
+    if isinstance(error, httpx.TransportError):
+        return 0.0
+    status, headers = get_error_response(error)
+    if status not in RETRYABLE_STATUS:
+        return None
+    if headers.get('Retry-After'):
+        return parse_retry_after(headers['Retry-After']) or 0.0
+    match = RETRY_DELAY_PATTERN.search(str(error))
+    return float(match.group(1)) if match else 0.0
+
+
+def get_backoff(attempt):
+    """
+    Get a full-jitter exponential backoff delay.
+
+    Args:
+        attempt: Number of the failed attempt, starting at 0
+
+    Returns:
+        float: Seconds to wait
+    """
+    ceiling = min(
+        settings.LLM_RETRY_MAX_SECONDS,
+        settings.LLM_RETRY_BASE_SECONDS * 2 ** attempt
+    )
+    return random.uniform(0, ceiling)
+
+
+def record_latency(seconds):
+    """
+    Remember the latency of a successful call.
+
+    Args:
+        seconds: Call duration
+    """
+    with _latencies_lock:
+        _latencies.append(seconds)
+
+
+def get_hedge_delay():
+    """
+    Get how long to wait before hedging a call.
+
+    Returns:
+        float: LLM_HEDGE_PERCENTILE of recent latencies, or None if
+            hedging is disabled or there are too few samples
+    """
+    with _latencies_lock:
+        samples = sorted(_latencies)
+    if not settings.LLM_HEDGE_ENABLED or \
+            len(samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+        return None
+    index = int(len(samples) * settings.LLM_HEDGE_PERCENTILE / 100)
+    return samples[min(index, len(samples) - 1)]
+
+
+def get_hedge_executor():
+    """
+    Get the process-wide pool running hedged calls.
+
+    Returns:
+        ThreadPoolExecutor: Lazily created executor
+    """
+    global _hedge_executor
+    with _hedge_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=max(2, settings.QUIZ_JOB_WORKERS * 2),
+                thread_name_prefix='llm-hedge'
+            )
+    return _hedge_executor
+
+
+def send_request(provider, prompt, schema):
+    """
+    Send one rate-limited request and record its latency.
+
+    Args:
+        provider: LLMProvider to call
+        prompt: Prompt string
+        schema: Optional JSON schema
+
+    Returns:
+        dict: Provider result
+    """
+    estimate = estimate_tokens(prompt) + settings.LLM_COMPLETION_TOKENS
+    acquire_budget(estimate)
+    record_counter('calls')
+    result = provider.generate(prompt, schema)
+    settle_tokens(estimate, result)
+    record_latency(result['latency'])
+    return result
+
+
+def first_result(futures):
+    """
+    Return the first successful result of racing calls.
+
+    Args:
+        futures: Futures of the primary and hedged call
+
+    Returns:
+        dict: Provider result of the call that succeeded first
+
+    Raises:
+        Exception: The last error if every call failed
+    """
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is futures[-1]:
+                    record_counter('hedge_wins')
+                return future.result()
+    return futures[-1].result()
+
+
+def send_hedged(provider, prompt, schema):
+    """
+    Send a request, racing a second one if it exceeds the hedge delay.
+
+    The slower call keeps running in the background and its result is
+    discarded.
+
+    Args:
+        provider: LLMProvider to call
+        prompt: Prompt string
+        schema: Optional JSON schema
+
+    Returns:
+        dict: Provider result
+    """
+    delay = get_hedge_delay()
+    if delay is None:
+        return send_request(provider, prompt, schema)
+    executor = get_hedge_executor()
+    futures = [executor.submit(send_request, provider, prompt, schema)]
+    done, _ = wait(futures, timeout=delay)
+    if not done:
+        record_counter('hedged')
+        futures.append(executor.submit(send_request, provider, prompt, schema))
+    return first_result(futures)
+
+
+def generate_with_policy(prompt, schema=None, provider=None):
+    """
+    Call the LLM with rate limits, retries and optional hedging.
+
+    Args:
+        prompt: Prompt string
+        schema: Optional JSON schema the output must follow
+        provider: Provider to call, defaults to LLM_PROVIDER
+
+    Returns:
+        dict: Provider result with text, usage and latency
+
+    Raises:
+        Exception: The provider error once it is not retryable or
+            LLM_MAX_RETRIES retries have failed
+    """
+    provider = provider or get_llm_provider()
+    for attempt in range(settings.LLM_MAX_RETRIES + 1):
+        try:
+            return send_hedged(provider, prompt, schema)
+        except Exception as error:
+            retry_after = get_retry_after(error)
+            if retry_after is None or attempt == settings.LLM_MAX_RETRIES:
+                raise
+            record_counter('retried')
+            time.sleep(max(retry_after, get_backoff(attempt)))
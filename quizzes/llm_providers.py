@@ -0,0 +1,284 @@
+"""
+Pluggable LLM providers for quiz generation.
+A provider turns a prompt into the model's quiz JSON text plus token
+usage and latency. LLM_PROVIDER selects Gemini, a deterministic fake
+for load tests, or a locally hosted OpenAI-compatible server
+(llama.cpp, vLLM) for air-gapped deployments.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+from .gemini_client import generate_response
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+class LLMProvider:
+    """
+    Base class of LLM providers.
+
+    Subclasses set name and implement complete().
+    """
+    name = ''
+
+    def get_model(self):
+        """
+        Get the model name reported with results.
+
+        Returns:
+            str: Model name
+        """
+        return self.name
+
+    def complete(self, prompt, schema=None):
+        """
+        Run a prompt through the model.
+
+        Args:
+            prompt: Complete prompt string
+            schema: Optional JSON schema the output must follow
+
+        Returns:
+            tuple: (response text, usage dict with prompt_tokens and
+                completion_tokens)
+        """
+        raise NotImplementedError
+
+    def generate(self, prompt, schema=None):
+        """
+        Run a prompt and measure the call.
+
+        Args:
+            prompt: Complete prompt string
+            schema: Optional JSON schema the output must follow
+
+        Returns:
+            dict: text, provider, model, usage and latency (seconds)
+        """
+        started = time.monotonic()
+        text, usage = self.complete(prompt, schema)
+        return {
+            'text': text,
+            'provider': self.name,
+            'model': self.get_model(),
+            'usage': usage,
+            'latency': round(time.monotonic() - started, 3),
+        }
+
+
+class GeminiProvider(LLMProvider):
+    """
+    Google Gemini through the shared process-wide client.
+    """
+    name = 'gemini'
+
+    def get_model(self):
+        """
+        Get the configured Gemini model.
+
+        Returns:
+            str: GEMINI_MODEL
+        """
+        return settings.GEMINI_MODEL
+
+    def complete(self, prompt, schema=None):
+        """
+        Run a prompt through Gemini, in JSON mode when given a schema.
+
+        Raises:
+            ValueError: If GEMINI_API_KEY is not configured
+        """
+        if not settings.GEMINI_API_KEY:
+            raise ValueError("GEMINI_API_KEY is not set")
+        config = schema and {
+            'response_mime_type': 'application/json',
+            'response_json_schema': schema,
+        }
+        response = generate_response(prompt, config=config or None)
+        meta = response.usage_metadata
+        return response.text, {
+            'prompt_tokens': getattr(meta, 'prompt_token_count', None),
+            'completion_tokens': getattr(meta, 'candidates_token_count', None),
+        }
+
+
+def estimate_tokens(text):
+    """
+    Roughly estimate the token count of a text (4 characters a token).
+
+    Args:
+        text: Any text
+
+    Returns:
+        int: Estimated tokens
+    """
+    return (len(text) + 3) // 4
+
+
+def build_fake_question(seed, number):
+    """
+    Build one deterministic multiple choice question.
+
+    Args:
+        seed: Hex digest derived from the prompt
+        number: Question number starting at 1
+
+    Returns:
+        dict: Question in the prompt's JSON structure
+    """
+    digit = seed[number % len(seed)]
+    options = [f'Option {letter}{digit}' for letter in 'ABCD']
+    return {
+        'question_title': f'Question {number} ({seed[:8]})',
+        'question_options': options,
+        'answer': options[int(digit, 16) % 4],
+    }
+
+
+class FakeProvider(LLMProvider):
+    """
+    Deterministic offline provider for load and capacity tests.
+
+    The same prompt always yields the same quiz; LLM_FAKE_LATENCY adds
+    a simulated model delay.
+    """
+    name = 'fake'
+
+    def complete(self, prompt, schema=None):
+        """
+        Build a QUIZ_QUESTION_COUNT question quiz from the prompt hash.
+        """
+        time.sleep(settings.LLM_FAKE_LATENCY)
+        seed = hashlib.sha256(prompt.encode()).hexdigest()
+        text = json.dumps({
+            'title': f'Quiz {seed[:8]}',
+            'description': 'Generated offline by the fake provider.',
+            'questions': [
+                build_fake_question(seed, n)
+                for n in range(1, settings.QUIZ_QUESTION_COUNT + 1)
+            ],
+        })
+        return text, {
+            'prompt_tokens': estimate_tokens(prompt),
+            'completion_tokens': estimate_tokens(text),
+        }
+
+
+def build_chat_request(prompt, schema=None):
+    """
+    Build an OpenAI-style chat completion request body.
+
+    Args:
+        prompt: Prompt sent as the user message
+        schema: Optional JSON schema for the response format
+
+    Returns:
+        dict: Request body
+    """
+    body = {
+        'model': settings.LLM_MODEL,
+        'messages': [{'role': 'user', 'content': prompt}],
+        'temperature': 0,
+    }
+    if schema:
+        body['response_format'] = {'type': 'json_schema', 'json_schema': {
+            'name': 'quiz', 'schema': schema, 'strict': True
+        }}
+    return body
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """
+    Chat completions of a self-hosted OpenAI-compatible server.
+
+    One HTTP client with kept-alive connections is used per process.
+    """
+    name = 'openai'
+
+    def __init__(self):
+        """
+        Create the HTTP client for LLM_BASE_URL.
+        """
+        import httpx
+        headers = {}
+        if settings.LLM_API_KEY:
+            headers['Authorization'] = f'Bearer {settings.LLM_API_KEY}'
+        self.client = httpx.Client(
+            base_url=settings.LLM_BASE_URL.rstrip('/'),
+            headers=headers,
+            timeout=settings.LLM_TIMEOUT
+        )
+
+    def get_model(self):
+        """
+        Get the configured model name.
+
+        Returns:
+            str: LLM_MODEL
+        """
+        return settings.LLM_MODEL
+
+    def complete(self, prompt, schema=None):
+        """
+        Run a prompt as a single user message.
+
+        A schema is passed as a json_schema response format, which
+        llama.cpp and vLLM enforce with constrained decoding.
+        """
+        response = self.client.post(
+            '/chat/completions', json=build_chat_request(prompt, schema)
+        )
+        response.raise_for_status()
+        data = response.json()
+        usage = data.get('usage') or {}
+        return data['choices'][0]['message']['content'], {
+            'prompt_tokens': usage.get('prompt_tokens'),
+            'completion_tokens': usage.get('completion_tokens'),
+        }
+
+
+PROVIDERS = {
+    provider.name: provider
+    for provider in (GeminiProvider, FakeProvider, OpenAICompatibleProvider)
+}
+
+
+def get_llm_provider(name=None):
+    """
+    Get the provider instance of this process for a name.
+
+    Args:
+        name: Provider name, defaults to LLM_PROVIDER
+
+    Returns:
+        LLMProvider: Shared provider instance
+
+    Raises:
+        ValueError: If the provider name is unknown
+    """
+    name = name or settings.LLM_PROVIDER
+    if name not in PROVIDERS:
+        raise ValueError(f'Unknown LLM provider: {name}')
+    key = (name, os.getpid())
+    with _providers_lock:
+        if key not in _providers:
+            _providers[key] = PROVIDERS[name]()
+        return _providers[key]
+
+
+def reset_llm_providers():
+    """
+    Drop provider instances so the next call builds them from settings.
+    """
+    with _providers_lock:
+        providers = list(_providers.values())
+        _providers.clear()
+    for provider in providers:
+        if hasattr(provider, 'client'):
+            provider.client.close()
@@ -0,0 +1,105 @@
+"""
+Local stand-in for the LLM endpoints used by quiz generation.
+Answers Gemini generateContent and OpenAI-style chat completion
+requests with a fixed text, so client overhead (construction,
+connections, TLS) and provider adapters can be measured and tested
+without a remote API. Queued failures (e.g. 429 with Retry-After)
+exercise retries. Point GEMINI_BASE_URL or LLM_BASE_URL at its
+base_url.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def build_reply(path, text):
+    """
+    Build a response body in the format of the requested endpoint.
+
+    Args:
+        path: Request path
+        text: Text returned as the model's answer
+
+    Returns:
+        dict: generateContent or chat completion response
+    """
+    if path.rstrip('/').endswith('/chat/completions'):
+        return {
+            'choices': [{'message': {'role': 'assistant', 'content': text}}],
+            'usage': {'prompt_tokens': 10, 'completion_tokens': 20},
+        }
+    return {
+        'candidates': [{
+            'content': {'role': 'model', 'parts': [{'text': text}]},
+            'finishReason': 'STOP',
+        }],
+    }
+
+
+class LLMStandInHandler(BaseHTTPRequestHandler):
+    """
+    Request handler mimicking the generate endpoints.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        """
+        Reply with the next queued failure or the server's text in the
+        endpoint's format.
+        """
+        length = int(self.headers.get('Content-Length', 0))
+        self.server.requests.append(json.loads(self.rfile.read(length)))
+        self.server.connections.add(self.client_address)
+        time.sleep(self.server.delay)
+        if self.server.failures:
+            status, headers = self.server.failures.pop(0)
+            error = {'error': {'code': status, 'message': 'Stand-in error'}}
+            return self.send_json(status, error, headers)
+        reply = build_reply(self.path, self.server.reply_text)
+        self.send_json(200, reply, {})
+
+    def send_json(self, status, data, headers):
+        """
+        Send a JSON response.
+
+        Args:
+            status: HTTP status code
+            data: Response body
+            headers: Extra response headers
+        """
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        for name, value in {'Content-Type': 'application/json', **headers,
+                            'Content-Length': str(len(body))}.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """
+        Keep request logs out of test and benchmark output.
+        """
+
+
+def start_stand_in_server(reply_text='{}', delay=0.0):
+    """
+    Serve the stand-in endpoints on a free localhost port.
+
+    Args:
+        reply_text: Text returned as the model's answer
+        delay: Seconds to wait before answering, like model latency
+
+    Returns:
+        ThreadingHTTPServer: Running server with base_url, requests
+            (decoded bodies), connections (client addresses) and
+            failures ((status, headers) answered before succeeding)
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), LLMStandInHandler)
+    server.daemon_threads = True
+    server.reply_text, server.delay = reply_text, delay
+    server.requests, server.connections = [], set()
+    server.failures = []
+    server.base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
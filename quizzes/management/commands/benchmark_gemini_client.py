@@ -0,0 +1,82 @@
+"""
+Management command to measure the latency saved by the shared client.
+Run with: python manage.py benchmark_gemini_client --calls 20 --stand-in
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from ...gemini_client import (
+    create_gemini_client,
+    generate_content,
+    reset_gemini_client
+)
+from ...llm_stand_in import start_stand_in_server
+
+
+def call_with_new_client(prompt):
+    """
+    Send a prompt through a client built only for this call.
+
+    Args:
+        prompt: Prompt string
+    """
+    client = create_gemini_client()
+    try:
+        generate_content(prompt, client=client)
+    finally:
+        client.close()
+
+
+class Command(BaseCommand):
+    help = 'Compare a client per Gemini call with the shared client'
+
+    def add_arguments(self, parser):
+        """
+        Add call count and stand-in server options.
+        """
+        parser.add_argument(
+            '--calls', type=int, default=20, help='Calls per variant'
+        )
+        parser.add_argument(
+            '--stand-in', action='store_true',
+            help='Call a local stand-in server instead of GEMINI_BASE_URL'
+        )
+
+    def timed(self, label, func, calls):
+        """
+        Run calls sequentially and report the mean latency.
+
+        Args:
+            label: Name printed with the latency
+            func: Callable taking a prompt
+            calls: Number of calls
+
+        Returns:
+            float: Mean seconds per call
+        """
+        started = time.perf_counter()
+        for _ in range(calls):
+            func('Say hello')
+        mean = (time.perf_counter() - started) / calls
+        self.stdout.write(f'{label}: {mean * 1000:.1f} ms/call')
+        return mean
+
+    def handle(self, *args, **options):
+        """
+        Time both variants and print the difference per call.
+        """
+        overrides = {}
+        if options['stand_in']:
+            overrides['GEMINI_BASE_URL'] = start_stand_in_server().base_url
+        with override_settings(**overrides):
+            reset_gemini_client()
+            fresh = self.timed('New client', call_with_new_client,
+                               options['calls'])
+            shared = self.timed('Shared client', generate_content,
+                                options['calls'])
+            reset_gemini_client()
+        self.stdout.write(self.style.SUCCESS(
+            f'Saved per call: {(fresh - shared) * 1000:.1f} ms'
+        ))
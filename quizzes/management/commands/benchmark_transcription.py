@@ -0,0 +1,66 @@
+"""
+Management command to compare sequential and parallel transcription.
+Run with: python manage.py benchmark_transcription lecture.m4a --workers 4
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from ...parallel_transcription import (
+    decode_audio,
+    get_transcription_pool,
+    transcribe_parallel
+)
+from ...transcription import get_whisper_model
+
+
+class Command(BaseCommand):
+    help = 'Benchmark sequential vs. parallel chunked Whisper transcription'
+
+    def add_arguments(self, parser):
+        """
+        Add audio file and worker count arguments.
+        """
+        parser.add_argument('audio_file', help='Path to an audio file')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of parallel worker processes'
+        )
+
+    def timed(self, label, func, audio):
+        """
+        Run a transcription function and report its duration.
+
+        Args:
+            label: Name printed with the duration
+            func: Transcription callable taking decoded audio
+            audio: Decoded audio samples
+
+        Returns:
+            float: Elapsed seconds
+        """
+        started = time.perf_counter()
+        func(audio)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'{label}: {elapsed:.1f}s')
+        return elapsed
+
+    def handle(self, *args, **options):
+        """
+        Transcribe the file both ways and print the speedup.
+        """
+        audio = decode_audio(options['audio_file'])
+        self.stdout.write(f'Audio length: {len(audio) / 16000:.0f}s')
+        sequential = self.timed(
+            'Sequential', get_whisper_model().transcribe, audio
+        )
+        workers = options['workers']
+        with override_settings(TRANSCRIPTION_PARALLELISM=workers):
+            list(get_transcription_pool().map(int, range(workers)))
+            parallel = self.timed('Parallel', transcribe_parallel, audio)
+        self.stdout.write(self.style.SUCCESS(
+            f'Speedup: {sequential / parallel:.2f}x'
+        ))
@@ -2,18 +2,21 @@
 Management command to download Whisper model.
 Run this before first use: python manage.py download_whisper
 """
+from django.conf import settings
 from django.core.management.base import BaseCommand
-import whisper
+
+from ...transcription import load_whisper_model
 
 
 class Command(BaseCommand):
     help = 'Download Whisper AI model for transcription'
 
     def handle(self, *args, **options):
-        self.stdout.write('Downloading Whisper base model (~140 MB)...')
+        name = settings.WHISPER_MODEL_NAME
+        self.stdout.write(f'Downloading Whisper {name} model...')
         self.stdout.write('This only needs to be done once. Please wait...')
 
-        whisper.load_model("base")
+        load_whisper_model(name)
 
         msg = '✓ Whisper model downloaded successfully!'
         self.stdout.write(self.style.SUCCESS(msg))
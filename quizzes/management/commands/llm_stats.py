@@ -0,0 +1,30 @@
+"""
+Management command to report LLM call counters.
+Run with: python manage.py llm_stats
+"""
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from ...llm_calls import get_llm_stats, get_rate_cache
+
+
+class Command(BaseCommand):
+    help = 'Show throttled, retried and hedged LLM call counters'
+
+    def handle(self, *args, **options):
+        """
+        Print the counters.
+
+        Raises:
+            CommandError: If the counters live in server process memory
+        """
+        if isinstance(get_rate_cache(), LocMemCache):
+            raise CommandError(
+                'The LLM cache is local to each server process; set '
+                'LLM_RATE_CACHE_BACKEND to a shared cache or read '
+                'GET /api/stats/ as a staff user'
+            )
+        stats = get_llm_stats()
+        self.stdout.write(
+            ' '.join(f'{name}={count}' for name, count in stats.items())
+        )
@@ -0,0 +1,31 @@
+"""
+Management command to report quiz cache hit and miss counters.
+Run with: python manage.py quiz_cache_stats
+"""
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from ...quiz_cache import get_cache_stats, get_quiz_cache
+
+
+class Command(BaseCommand):
+    help = 'Show hit and miss counters of the rendered quiz cache'
+
+    def handle(self, *args, **options):
+        """
+        Print the counters and the hit rate.
+
+        Raises:
+            CommandError: If the counters live in server process memory
+        """
+        if isinstance(get_quiz_cache(), LocMemCache):
+            raise CommandError(
+                'The quiz cache is local to each server process; set '
+                'QUIZ_CACHE_BACKEND to a shared cache or read '
+                'GET /api/stats/ as a staff user'
+            )
+        stats = get_cache_stats()
+        self.stdout.write(
+            f"hits={stats['hits']} misses={stats['misses']} "
+            f"hit_rate={stats['hit_rate']:.1%}"
+        )
@@ -0,0 +1,20 @@
+"""
+Management command to recover quiz jobs of stopped server processes.
+Run with: python manage.py recover_quiz_jobs
+"""
+from django.core.management.base import BaseCommand
+
+from ...jobs import recover_stale_jobs
+
+
+class Command(BaseCommand):
+    help = 'Re-queue or fail jobs whose server process stopped'
+
+    def handle(self, *args, **options):
+        """
+        Recover orphaned jobs and print what was done.
+
+        Re-queued jobs run in this process, which waits for them.
+        """
+        failed, requeued = recover_stale_jobs()
+        self.stdout.write(f'failed={failed} requeued={requeued}')
@@ -0,0 +1,62 @@
+"""
+Management command to run the shared transcription server.
+Run with: python manage.py run_transcription_server --models 2
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...transcription import load_whisper_model
+from ...transcription_server import create_transcription_server
+
+
+class Command(BaseCommand):
+    help = 'Serve Whisper transcriptions to web workers over a local socket'
+
+    def add_arguments(self, parser):
+        """
+        Add address and model pool size options.
+        """
+        parser.add_argument(
+            '--address',
+            default=settings.TRANSCRIPTION_SERVER_ADDRESS,
+            help="'unix:/path/to.sock' or 'host:port'"
+        )
+        parser.add_argument(
+            '--models',
+            type=int,
+            default=settings.TRANSCRIPTION_SERVER_MODELS,
+            help='Number of Whisper model instances to serve with'
+        )
+
+    def load_models(self, count):
+        """
+        Load the model pool, unless chunked worker processes are used.
+
+        Args:
+            count: Number of model instances
+
+        Returns:
+            list: Loaded Whisper models
+        """
+        name = settings.WHISPER_MODEL_NAME
+        workers = settings.TRANSCRIPTION_PARALLELISM
+        if workers > 1:
+            self.stdout.write(f'Transcribing with {workers} x Whisper {name}')
+            return []
+        self.stdout.write(f'Loading {count} x Whisper {name}...')
+        return [load_whisper_model(name) for _ in range(count)]
+
+    def handle(self, *args, **options):
+        """
+        Load the model pool and serve until interrupted.
+        """
+        address = options['address'] or 'unix:/tmp/quizly-transcription.sock'
+        models = self.load_models(options['models'])
+        server = create_transcription_server(address, models)
+        self.stdout.write(self.style.SUCCESS(f'Listening on {address}'))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('Shutting down transcription server.')
+        finally:
+            server.server_close()
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0002_quizjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Transcript',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=64)),
+                ('model_name', models.CharField(max_length=50)),
+                ('language', models.CharField(blank=True, max_length=16)),
+                ('text', models.TextField()),
+                ('segments', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Transcript',
+                'verbose_name_plural': 'Transcripts',
+                'ordering': ['-created_at'],
+                'constraints': [models.UniqueConstraint(fields=('video_id', 'model_name'), name='unique_transcript_per_model')],
+            },
+        ),
+    ]
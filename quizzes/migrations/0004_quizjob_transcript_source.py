@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0003_transcript'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizjob',
+            name='transcript_source',
+            field=models.CharField(blank=True, choices=[('captions_only', 'Captions only'), ('prefer_captions', 'Prefer captions'), ('whisper_only', 'Whisper only')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0004_quizjob_transcript_source'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoLease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('owner', models.CharField(max_length=64)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Video Lease',
+                'verbose_name_plural': 'Video Leases',
+            },
+        ),
+    ]
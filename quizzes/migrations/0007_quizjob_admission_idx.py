@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0006_quiz_user_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quizjob',
+            index=models.Index(fields=['status', 'updated_at'], name='quizjob_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizjob',
+            index=models.Index(fields=['user', 'created_at'], name='quizjob_user_created_idx'),
+        ),
+    ]
@@ -24,6 +24,12 @@ class Quiz(models.Model):
         verbose_name = 'Quiz'
         verbose_name_plural = 'Quizzes'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['user', '-created_at', '-id'],
+                name='quiz_user_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -51,3 +57,112 @@ class Question(models.Model):
 
     def __str__(self):
         return f"{self.quiz.title} - Question {self.id}"
+
+
+class QuizJob(models.Model):
+    """
+    Background job that generates a quiz from a YouTube URL.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        SUCCEEDED = 'succeeded', 'Succeeded'
+        FAILED = 'failed', 'Failed'
+
+    class TranscriptSource(models.TextChoices):
+        CAPTIONS_ONLY = 'captions_only', 'Captions only'
+        PREFER_CAPTIONS = 'prefer_captions', 'Prefer captions'
+        WHISPER_ONLY = 'whisper_only', 'Whisper only'
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='quiz_jobs'
+    )
+    url = models.URLField(max_length=500)
+    transcript_source = models.CharField(
+        max_length=20,
+        choices=TranscriptSource.choices,
+        blank=True
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    stage = models.CharField(max_length=50, blank=True)
+    quiz = models.ForeignKey(
+        Quiz,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs'
+    )
+    error = models.TextField(blank=True)
+    metrics = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Quiz Job'
+        verbose_name_plural = 'Quiz Jobs'
+        ordering = ['-created_at']
+        # Admission control counts active jobs and a user's recent jobs
+        indexes = [
+            models.Index(
+                fields=['status', 'updated_at'], name='quizjob_status_idx'
+            ),
+            models.Index(
+                fields=['user', 'created_at'], name='quizjob_user_created_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id} ({self.status})"
+
+
+class Transcript(models.Model):
+    """
+    Cached transcript of a YouTube video for a transcription model.
+    """
+    video_id = models.CharField(max_length=64)
+    model_name = models.CharField(max_length=50)
+    language = models.CharField(max_length=16, blank=True)
+    text = models.TextField()
+    segments = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Transcript'
+        verbose_name_plural = 'Transcripts'
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['video_id', 'model_name'],
+                name='unique_transcript_per_model'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.video_id} ({self.model_name})"
+
+
+class VideoLease(models.Model):
+    """
+    Cross-process lease held while one worker fetches a video's
+    transcript, so other nodes wait instead of downloading it again.
+    """
+    key = models.CharField(max_length=100, unique=True)
+    owner = models.CharField(max_length=64)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Video Lease'
+        verbose_name_plural = 'Video Leases'
+
+    def __str__(self):
+        return f"{self.key} ({self.owner})"
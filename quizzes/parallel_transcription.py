@@ -0,0 +1,321 @@
+"""
+Parallel chunked transcription of long audio.
+Audio is decoded once, split at low-energy (silent) points into chunks
+with small overlaps, transcribed concurrently in a process pool where
+each worker owns a Whisper model, and stitched back together.
+"""
+import multiprocessing
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.conf import settings
+
+from .transcription import load_whisper_model
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.1
+
+_pool = None
+_pool_lock = threading.Lock()
+_worker_model = None
+
+
+def decode_audio(audio_file_path):
+    """
+    Decode an audio file once into 16 kHz mono float32 samples.
+
+    Args:
+        audio_file_path: Path to audio file
+
+    Returns:
+        numpy.ndarray: Audio samples
+    """
+    from whisper.audio import load_audio
+    return load_audio(audio_file_path)
+
+
+def frame_energies(audio):
+    """
+    Compute the RMS energy of consecutive 100 ms frames.
+
+    Args:
+        audio: Audio samples
+
+    Returns:
+        numpy.ndarray: One energy value per frame
+    """
+    frame = int(SAMPLE_RATE * FRAME_SECONDS)
+    count = len(audio) // frame
+    frames = audio[:count * frame].reshape(count, frame)
+    return np.sqrt(np.mean(frames ** 2, axis=1))
+
+
+def find_split_frame(energies, start, min_frames, max_frames):
+    """
+    Find the quietest frame inside the allowed chunk length window.
+
+    Args:
+        energies: Frame energies of the whole audio
+        start: Frame where the current chunk starts
+        min_frames: Minimum chunk length in frames
+        max_frames: Maximum chunk length in frames
+
+    Returns:
+        int: Frame index at which to split
+    """
+    window = energies[start + min_frames:start + max_frames]
+    return start + min_frames + int(np.argmin(window))
+
+
+def get_chunk_limits(min_seconds=None, max_seconds=None):
+    """
+    Get chunk length limits for splitting a stream.
+
+    Args:
+        min_seconds: Minimum chunk length, defaults to the setting
+        max_seconds: Maximum chunk length, defaults to the setting
+
+    Returns:
+        dict: min_frames, max_frames, overlap (samples) and ready
+            (samples needed past a chunk start before it can be cut)
+    """
+    min_seconds = min_seconds or settings.TRANSCRIPTION_CHUNK_MIN_SECONDS
+    max_seconds = max_seconds or settings.TRANSCRIPTION_CHUNK_MAX_SECONDS
+    overlap = int(settings.TRANSCRIPTION_CHUNK_OVERLAP_SECONDS * SAMPLE_RATE)
+    return {
+        'min_frames': int(min_seconds / FRAME_SECONDS),
+        'max_frames': int(max_seconds / FRAME_SECONDS),
+        'overlap': overlap,
+        'ready': int(max_seconds * SAMPLE_RATE) + overlap,
+    }
+
+
+def find_chunk_end(samples, start, limits):
+    """
+    Find where the chunk starting at the head of samples should end.
+
+    Args:
+        samples: Samples beginning at the chunk start
+        start: Absolute sample index of the chunk start
+        limits: Chunk limits from get_chunk_limits
+
+    Returns:
+        int: Absolute sample index of the chunk end
+    """
+    frame = int(SAMPLE_RATE * FRAME_SECONDS)
+    energies = frame_energies(samples[:limits['max_frames'] * frame])
+    split = find_split_frame(
+        energies, 0, limits['min_frames'], limits['max_frames']
+    )
+    return start + split * frame
+
+
+def split_stream(blocks, min_seconds=None, max_seconds=None):
+    """
+    Cut a stream of samples into chunks ending at silence boundaries.
+
+    Chunks are yielded as soon as enough audio has arrived, together
+    with the overlap-padded samples to transcribe.
+
+    Args:
+        blocks: Iterable of float32 sample blocks
+        min_seconds: Minimum chunk length, defaults to the setting
+        max_seconds: Maximum chunk length, defaults to the setting
+
+    Yields:
+        tuple: (start_sample, end_sample, padded_start, padded_samples)
+    """
+    limits = get_chunk_limits(min_seconds, max_seconds)
+    buffer, base, start = np.empty(0, dtype=np.float32), 0, 0
+    for block in blocks:
+        buffer = np.concatenate([buffer, block])
+        while base + len(buffer) - start >= limits['ready']:
+            end = find_chunk_end(buffer[start - base:], start, limits)
+            yield start, end, base, buffer[:end - base + limits['overlap']]
+            start, old_base = end, base
+            base = max(0, start - limits['overlap'])
+            buffer = buffer[base - old_base:]
+    if base + len(buffer) > start:
+        yield start, base + len(buffer), base, buffer
+
+
+def plan_chunks(audio, min_seconds=None, max_seconds=None):
+    """
+    Split audio into chunk ranges that end at silence boundaries.
+
+    Args:
+        audio: Audio samples
+        min_seconds: Minimum chunk length, defaults to the setting
+        max_seconds: Maximum chunk length, defaults to the setting
+
+    Returns:
+        list: (start_sample, end_sample) tuples covering the audio
+    """
+    return [
+        (start, end)
+        for start, end, _, _ in split_stream([audio], min_seconds, max_seconds)
+    ]
+
+
+def init_worker(model_name, threads):
+    """
+    Process pool initializer: pin torch threads and load a model.
+
+    Args:
+        model_name: Whisper model name
+        threads: Number of torch threads for this worker
+    """
+    global _worker_model
+    import torch
+    torch.set_num_threads(threads)
+    _worker_model = load_whisper_model(model_name)
+
+
+def transcribe_chunk(audio, offset):
+    """
+    Transcribe one chunk in a worker and shift its timestamps.
+
+    Args:
+        audio: Chunk samples
+        offset: Chunk start within the whole audio in seconds
+
+    Returns:
+        dict: Result with language and absolute-time segments
+    """
+    result = _worker_model.transcribe(audio)
+    segments = [
+        {
+            'start': segment['start'] + offset,
+            'end': segment['end'] + offset,
+            'text': segment['text'],
+        }
+        for segment in result['segments']
+    ]
+    return {'language': result.get('language'), 'segments': segments}
+
+
+def get_threads_per_worker(workers):
+    """
+    Get the torch thread count for each pool worker.
+
+    Args:
+        workers: Number of pool workers
+
+    Returns:
+        int: Threads per worker
+    """
+    if settings.TRANSCRIPTION_THREADS_PER_WORKER:
+        return settings.TRANSCRIPTION_THREADS_PER_WORKER
+    return max(1, (multiprocessing.cpu_count() or 1) // workers)
+
+
+def get_transcription_pool():
+    """
+    Get the process-wide pool of Whisper worker processes.
+
+    Returns:
+        ProcessPoolExecutor: Lazily created pool
+    """
+    global _pool
+    workers = settings.TRANSCRIPTION_PARALLELISM
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker,
+                initargs=(
+                    settings.WHISPER_MODEL_NAME,
+                    get_threads_per_worker(workers)
+                )
+            )
+    return _pool
+
+
+def keep_segment(segment, start, end, stitched):
+    """
+    Decide whether a chunk segment belongs to the stitched transcript.
+
+    A segment is kept when its midpoint lies in the chunk's own range,
+    so text heard in an overlap is taken from one chunk only; exact
+    repeats of the previous segment are dropped as well.
+
+    Args:
+        segment: Segment with absolute start/end seconds
+        start: Chunk start in seconds (without overlap)
+        end: Chunk end in seconds (without overlap)
+        stitched: Segments kept so far
+
+    Returns:
+        bool: True if the segment should be kept
+    """
+    midpoint = (segment['start'] + segment['end']) / 2
+    if not start <= midpoint < end:
+        return False
+    text = segment['text'].strip()
+    return not stitched or stitched[-1]['text'].strip() != text
+
+
+def stitch_results(chunks, results):
+    """
+    Merge chunk results into one Whisper-like result.
+
+    Args:
+        chunks: (start_sample, end_sample) tuples without overlap
+        results: Chunk results in the same order
+
+    Returns:
+        dict: Result with text, segments and language
+    """
+    stitched = []
+    for (start, end), result in zip(chunks, results):
+        bounds = (start / SAMPLE_RATE, end / SAMPLE_RATE)
+        for segment in result['segments']:
+            if keep_segment(segment, *bounds, stitched):
+                stitched.append(segment)
+    languages = Counter(r['language'] for r in results if r['language'])
+    return {
+        'text': ''.join(segment['text'] for segment in stitched),
+        'segments': stitched,
+        'language': languages.most_common(1)[0][0] if languages else '',
+    }
+
+
+def transcribe_stream(blocks):
+    """
+    Transcribe streamed audio, submitting chunks as they complete.
+
+    The first chunk is already being transcribed while later audio is
+    still arriving.
+
+    Args:
+        blocks: Iterable of float32 sample blocks
+
+    Returns:
+        dict: Result with text, segments and language
+    """
+    pool = get_transcription_pool()
+    chunks, futures = [], []
+    for start, end, padded_start, samples in split_stream(blocks):
+        chunks.append((start, end))
+        futures.append(pool.submit(
+            transcribe_chunk, samples, padded_start / SAMPLE_RATE
+        ))
+    return stitch_results(chunks, [future.result() for future in futures])
+
+
+def transcribe_parallel(audio):
+    """
+    Transcribe audio by running silence-split chunks concurrently.
+
+    Args:
+        audio: Path to audio file or decoded 16 kHz samples
+
+    Returns:
+        dict: Result with text, segments and language
+    """
+    if isinstance(audio, str):
+        audio = decode_audio(audio)
+    return transcribe_stream([audio])
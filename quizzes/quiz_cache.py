@@ -0,0 +1,186 @@
+"""
+Cache of rendered quiz payloads.
+Quizzes are written once and read many times, so the serialized form
+of each quiz is kept in a Django cache (local memory by default). Keys
+carry a version built from the quiz's and its questions' updated_at
+and the question count, so a change made by any process is seen by
+all of them without having to invalidate their caches.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+STATS_KEYS = ('hits', 'misses')
+
+
+def get_quiz_cache():
+    """
+    Get the cache backend holding rendered quizzes.
+
+    Returns:
+        BaseCache: Configured QUIZ_CACHE_ALIAS cache
+    """
+    return caches[settings.QUIZ_CACHE_ALIAS]
+
+
+def get_timestamp(value):
+    """
+    Get a datetime as exact microseconds since the epoch.
+
+    Args:
+        value: Datetime or None
+
+    Returns:
+        int: Microseconds, 0 for None
+    """
+    if value is None:
+        return 0
+    return int(value.timestamp()) * 1_000_000 + value.microsecond
+
+
+def get_quiz_version(quiz_updated, question_count, question_updated):
+    """
+    Build the cache version of a quiz from its change indicators.
+
+    Args:
+        quiz_updated: updated_at of the quiz
+        question_count: Number of questions
+        question_updated: Latest updated_at of its questions
+
+    Returns:
+        str: Version changing with every edit, addition or deletion
+    """
+    return (
+        f'{get_timestamp(quiz_updated)}-{question_count}-'
+        f'{get_timestamp(question_updated)}'
+    )
+
+
+def get_loaded_version(quiz):
+    """
+    Get the version of a quiz from its prefetched questions.
+
+    Args:
+        quiz: Quiz instance with prefetched questions
+
+    Returns:
+        str: Version as built by get_quiz_version
+    """
+    questions = quiz.questions.all()
+    return get_quiz_version(
+        quiz.updated_at, len(questions),
+        max((question.updated_at for question in questions), default=None)
+    )
+
+
+def get_quiz_key(quiz_id, version):
+    """
+    Get the cache key of a quiz version.
+
+    Args:
+        quiz_id: Primary key of the quiz
+        version: Version from get_quiz_version
+
+    Returns:
+        str: Cache key
+    """
+    return f'quiz:{quiz_id}:{version}'
+
+
+def record_lookups(hits, misses):
+    """
+    Add to the hit and miss counters kept in the cache.
+
+    Args:
+        hits: Number of quizzes found in the cache
+        misses: Number of quizzes that had to be rendered
+    """
+    cache = get_quiz_cache()
+    for name, count in zip(STATS_KEYS, (hits, misses)):
+        if count:
+            cache.add(f'quiz-stats:{name}', 0, timeout=None)
+            cache.incr(f'quiz-stats:{name}', count)
+
+
+def get_cache_stats():
+    """
+    Get the hit and miss counters of the quiz cache.
+
+    With the local-memory backend the counters are per process.
+
+    Returns:
+        dict: hits, misses and hit_rate
+    """
+    values = get_quiz_cache().get_many(
+        [f'quiz-stats:{name}' for name in STATS_KEYS]
+    )
+    stats = {name: values.get(f'quiz-stats:{name}', 0) for name in STATS_KEYS}
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+    return stats
+
+
+def render_quizzes(quizzes):
+    """
+    Serialize quizzes and store their payloads in the cache.
+
+    Each payload is stored under the version of the data it was
+    rendered from.
+
+    Args:
+        quizzes: Quiz instances with prefetched questions
+
+    Returns:
+        dict: Payloads by quiz ID
+    """
+    from .api.serializers import QuizSerializer
+    data = QuizSerializer(quizzes, many=True).data
+    payloads = {
+        quiz.pk: {'user_id': quiz.user_id, 'data': dict(quiz_data)}
+        for quiz, quiz_data in zip(quizzes, data)
+    }
+    if settings.QUIZ_CACHE_ENABLED:
+        get_quiz_cache().set_many({
+            get_quiz_key(quiz.pk, get_loaded_version(quiz)): payloads[quiz.pk]
+            for quiz in quizzes
+        })
+    return payloads
+
+
+def get_rendered_quizzes(quiz_versions, user, load_quizzes):
+    """
+    Get rendered quizzes of a user, rendering the ones not cached.
+
+    Args:
+        quiz_versions: Current version by quiz primary key, in the
+            order to return
+        user: User the quizzes must belong to
+        load_quizzes: Callable returning prefetched quizzes for IDs
+
+    Returns:
+        list: Rendered quiz data in the order of quiz_versions
+    """
+    cached, quiz_ids = {}, list(quiz_versions)
+    if settings.QUIZ_CACHE_ENABLED:
+        keys = {get_quiz_key(pk, v): pk for pk, v in quiz_versions.items()}
+        found = get_quiz_cache().get_many(list(keys))
+        cached = {keys[key]: payload for key, payload in found.items()}
+    cached = {pk: p for pk, p in cached.items() if p['user_id'] == user.pk}
+    missing = [pk for pk in quiz_ids if pk not in cached]
+    if missing:
+        cached.update(render_quizzes(list(load_quizzes(missing))))
+    record_lookups(len(quiz_ids) - len(missing), len(missing))
+    return [cached[pk]['data'] for pk in quiz_ids if pk in cached]
+
+
+def cache_new_quizzes(quizzes):
+    """
+    Populate the cache with freshly created quizzes.
+
+    Args:
+        quizzes: Saved Quiz instances
+    """
+    from django.db.models import prefetch_related_objects
+    if not settings.QUIZ_CACHE_ENABLED:
+        return
+    prefetch_related_objects(quizzes, 'questions')
+    render_quizzes(quizzes)
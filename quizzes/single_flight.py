@@ -0,0 +1,145 @@
+"""
+Coalescing of concurrent work on the same video.
+Within a process, the first caller for a key runs the work and later
+callers wait for its result. Across processes and nodes, a database
+lease lets one worker fetch a transcript while the others poll until
+it has been stored.
+"""
+import copy
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def join_in_flight(key):
+    """
+    Join the running call for a key or register a new one.
+
+    Args:
+        key: Hashable key identifying the work
+
+    Returns:
+        tuple: (future, is_leader)
+    """
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        if future is not None:
+            return future, False
+        future = _in_flight[key] = Future()
+        return future, True
+
+
+def lead_in_flight(key, future, func):
+    """
+    Run the work as leader and publish its outcome to followers.
+
+    Args:
+        key: Key the future is registered under
+        future: Future followers are waiting on
+        func: Callable producing the result
+    """
+    try:
+        future.set_result(func())
+    except BaseException as e:
+        future.set_exception(e)
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+
+
+def run_single_flight(key, func, on_wait=None):
+    """
+    Run func once for concurrent callers with the same key.
+
+    Followers receive a copy of the leader's result, or its exception.
+
+    Args:
+        key: Hashable key identifying the work
+        func: Callable producing the result
+        on_wait: Optional callable invoked before a follower waits
+
+    Returns:
+        object: Result of func
+    """
+    future, is_leader = join_in_flight(key)
+    if is_leader:
+        lead_in_flight(key, future, func)
+        return future.result()
+    if on_wait is not None:
+        on_wait()
+    return copy.deepcopy(future.result())
+
+
+def acquire_lease(key, owner):
+    """
+    Try to take the database lease for a key.
+
+    Expired leases of crashed workers are removed first.
+
+    Args:
+        key: Lease key
+        owner: Unique token of the caller
+
+    Returns:
+        bool: True if the lease was acquired
+    """
+    from .models import VideoLease
+    now = timezone.now()
+    VideoLease.objects.filter(key=key, expires_at__lt=now).delete()
+    ttl = timedelta(seconds=settings.SINGLE_FLIGHT_LEASE_SECONDS)
+    try:
+        with transaction.atomic():
+            VideoLease.objects.create(
+                key=key, owner=owner, expires_at=now + ttl
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+def release_lease(key, owner):
+    """
+    Give up a database lease held by owner.
+
+    Args:
+        key: Lease key
+        owner: Token the lease was acquired with
+    """
+    from .models import VideoLease
+    VideoLease.objects.filter(key=key, owner=owner).delete()
+
+
+@contextmanager
+def hold_lease(key, on_wait=None):
+    """
+    Hold the database lease for a key, waiting while another has it.
+
+    Does nothing unless SINGLE_FLIGHT_DB_LEASE is enabled.
+
+    Args:
+        key: Lease key
+        on_wait: Optional callable invoked once before waiting
+    """
+    if not settings.SINGLE_FLIGHT_DB_LEASE:
+        yield
+        return
+    owner = uuid.uuid4().hex
+    while not acquire_lease(key, owner):
+        if on_wait is not None:
+            on_wait()
+            on_wait = None
+        time.sleep(settings.SINGLE_FLIGHT_POLL_SECONDS)
+    try:
+        yield
+    finally:
+        release_lease(key, owner)
@@ -0,0 +1,241 @@
+"""
+Schema-constrained quiz output and targeted repairs.
+The quiz structure of the prompt is turned into a JSON schema the LLM
+providers can enforce. Generated quizzes are validated question by
+question, and only the questions that fail (or are missing) are sent
+back to the model instead of regenerating the whole quiz.
+"""
+import json
+
+OPTION_COUNT = 4
+
+
+def build_json_schema(example):
+    """
+    Derive a JSON schema from an example structure.
+
+    Strings become string fields, lists arrays of their first item
+    and dictionaries objects requiring all of their keys.
+
+    Args:
+        example: Example value such as get_quiz_structure_dict()
+
+    Returns:
+        dict: JSON schema
+    """
+    if isinstance(example, dict):
+        return {
+            'type': 'object',
+            'properties': {
+                key: build_json_schema(value) for key, value in example.items()
+            },
+            'required': list(example),
+            'additionalProperties': False,
+        }
+    if isinstance(example, list):
+        return {'type': 'array', 'items': build_json_schema(example[0])}
+    return {'type': 'string'}
+
+
+def constrain_quiz_schema(schema, count):
+    """
+    Fix the number of questions and options in a quiz schema.
+
+    Args:
+        schema: Schema built from the quiz structure
+        count: Number of questions required
+
+    Returns:
+        dict: The schema, constrained in place
+    """
+    questions = schema['properties']['questions']
+    questions.update(minItems=count, maxItems=count)
+    options = questions['items']['properties']['question_options']
+    options.update(minItems=OPTION_COUNT, maxItems=OPTION_COUNT)
+    return schema
+
+
+def find_question_problems(question):
+    """
+    List what is wrong with a normalized question.
+
+    Args:
+        question: Dictionary with question, options and answer keys
+
+    Returns:
+        list: Problem descriptions, empty for a valid question
+    """
+    if not isinstance(question, dict):
+        return ['is not an object']
+    problems = []
+    if not str(question.get('question') or '').strip():
+        problems.append('has no question text')
+    options = question.get('options')
+    if not isinstance(options, list) or len(options) != OPTION_COUNT:
+        return problems + [f'does not have exactly {OPTION_COUNT} options']
+    if len({str(option).strip().casefold() for option in options}) \
+            != OPTION_COUNT:
+        problems.append('has duplicate options')
+    if question.get('answer') not in options:
+        problems.append('has an answer that is not one of the options')
+    return problems
+
+
+def find_repair_slots(questions, count):
+    """
+    Find the question positions that need a new question.
+
+    Surplus questions are dropped, invalid ones first.
+
+    Args:
+        questions: Normalized questions, trimmed in place to count
+        count: Number of questions required
+
+    Returns:
+        dict: Problem lists by index; indexes past the end stand for
+            missing questions (empty problem list)
+    """
+    for index in reversed(range(len(questions))):
+        if len(questions) > count and find_question_problems(questions[index]):
+            del questions[index]
+    del questions[count:]
+    slots = {
+        index: problems
+        for index, question in enumerate(questions)
+        if (problems := find_question_problems(question))
+    }
+    slots.update({index: [] for index in range(len(questions), count)})
+    return slots
+
+
+def build_json_fix_prompt(text):
+    """
+    Build a prompt asking the model to fix output that is not JSON.
+
+    Args:
+        text: Unparsable model output
+
+    Returns:
+        str: Prompt string
+    """
+    return (
+        "The following output was meant to be valid JSON but could not "
+        "be parsed. Return only the corrected JSON, without comments or "
+        f"markdown.\n\n{text}"
+    )
+
+
+def describe_slot(questions, index, problems):
+    """
+    Describe one question to fix or add in a repair prompt.
+
+    Args:
+        questions: Current normalized questions
+        index: Position of the question
+        problems: Problems of the question, empty for a missing one
+
+    Returns:
+        str: Prompt line
+    """
+    if not problems:
+        return f"- Question {index + 1}: write a new question."
+    return (
+        f"- Question {index + 1} {', '.join(problems)}: "
+        f"{json.dumps(questions[index], ensure_ascii=False)}"
+    )
+
+
+def build_repair_prompt(quiz_data, slots, transcript):
+    """
+    Build a prompt asking only for replacements of failing questions.
+
+    The transcript is included only when new questions are needed.
+
+    Args:
+        quiz_data: Normalized quiz data
+        slots: Problem lists by index from find_repair_slots
+        transcript: Transcript the quiz was generated from
+
+    Returns:
+        str: Prompt string
+    """
+    questions = quiz_data['questions']
+    lines = [describe_slot(questions, i, p) for i, p in slots.items()]
+    titles = [q.get('question') for q in questions if isinstance(q, dict)]
+    prompt = (
+        f"Some questions of the quiz \"{quiz_data.get('title', '')}\" "
+        f"need to be replaced. Return JSON with a 'questions' list of "
+        f"exactly {len(slots)} questions in this order, each with exactly "
+        f"{OPTION_COUNT} distinct 'question_options' and an 'answer' that "
+        "is one of them. Do not repeat these questions: "
+        f"{json.dumps(titles, ensure_ascii=False)}\n\n" + "\n".join(lines)
+    )
+    if any(not problems for problems in slots.values()):
+        prompt += f"\n\nTranscript:\n{transcript}"
+    return prompt
+
+
+def sum_usage(results, key):
+    """
+    Add up a token count over call results, skipping unknown counts.
+
+    Args:
+        results: Provider results
+        key: 'prompt_tokens' or 'completion_tokens'
+
+    Returns:
+        int: Total, or None if no call reported the count
+    """
+    counts = [r['usage'].get(key) for r in results if r.get('usage')]
+    counts = [count for count in counts if count is not None]
+    return sum(counts) if counts else None
+
+
+class LLMSession:
+    """
+    Callable sending prompts for one quiz and keeping the results.
+    """
+
+    def __init__(self, generate):
+        """
+        Start a session.
+
+        Args:
+            generate: Callable (prompt, schema) returning a provider result
+        """
+        self.generate = generate
+        self.results = []
+
+    def __call__(self, prompt, schema=None):
+        """
+        Send a prompt and return the response text.
+
+        Args:
+            prompt: Prompt string
+            schema: Optional JSON schema the output must follow
+
+        Returns:
+            str: Response text
+        """
+        self.results.append(self.generate(prompt, schema))
+        return self.results[-1]['text']
+
+    def summary(self):
+        """
+        Summarize the calls for the job metrics.
+
+        Returns:
+            dict: provider, model, calls, repairs, latency and usage
+        """
+        first = self.results[0] if self.results else {}
+        return {
+            'provider': first.get('provider'),
+            'model': first.get('model'),
+            'calls': len(self.results),
+            'repairs': max(0, len(self.results) - 1),
+            'latency': round(sum(r['latency'] for r in self.results), 3),
+            'usage': {
+                key: sum_usage(self.results, key)
+                for key in ('prompt_tokens', 'completion_tokens')
+            },
+        }
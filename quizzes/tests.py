@@ -1,18 +1,21 @@
 """
 Tests for quizzes app.
 """
-from django.test import TestCase
+import json
+
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
-from unittest.mock import patch
-from .models import Quiz, Question
+from unittest.mock import Mock, patch
+from .models import Quiz, Question, QuizJob, Transcript
 from .functions import (
     get_youtube_download_opts,
     cleanup_audio_file,
     clean_json_response,
-    normalize_question_keys
+    normalize_question_keys,
+    extract_youtube_video_id
 )
 
 
@@ -102,8 +105,8 @@ class QuizListViewTests(TestCase):
         """Test getting quizzes as authenticated user."""
         response = self.client.get('/api/quizzes/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['title'], 'Test Quiz')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['title'], 'Test Quiz')
 
     def test_get_quizzes_unauthenticated(self):
         """Test getting quizzes without authentication."""
@@ -124,8 +127,111 @@ class QuizListViewTests(TestCase):
             video_url='https://www.youtube.com/watch?v=other'
         )
         response = self.client.get('/api/quizzes/')
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['title'], 'Test Quiz')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['title'], 'Test Quiz')
+
+    def count_list_queries(self):
+        """Request the uncached quiz list and return the query count."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from quizzes.quiz_cache import get_quiz_cache
+        get_quiz_cache().clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/quizzes/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_get_quizzes_constant_query_count(self):
+        """Test listing quizzes does not issue a query per quiz."""
+        Question.objects.create(
+            quiz=self.quiz, question_title='Q', question_options=['A'],
+            answer='A'
+        )
+        self.count_list_queries()  # warm the authenticated user cache
+        baseline = self.count_list_queries()
+        for i in range(5):
+            quiz = Quiz.objects.create(
+                user=self.user, title=f'Quiz {i}', video_url='https://y/'
+            )
+            Question.objects.create(
+                quiz=quiz, question_title='Q', question_options=['A'],
+                answer='A'
+            )
+        self.assertEqual(self.count_list_queries(), baseline)
+        response = self.client.get('/api/quizzes/')
+        self.assertEqual(len(response.data['results'][0]['questions']), 1)
+
+    def test_get_quizzes_cursor_pagination(self):
+        """Test pages follow newest first and link to the next page."""
+        for i in range(4):
+            Quiz.objects.create(
+                user=self.user, title=f'Quiz {i}', video_url='https://y/'
+            )
+        titles, url = [], '/api/quizzes/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            titles += [quiz['title'] for quiz in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(
+            titles, ['Quiz 3', 'Quiz 2', 'Quiz 1', 'Quiz 0', 'Test Quiz']
+        )
+        with self.settings(QUIZ_LIST_PAGE_SIZE=3):
+            response = self.client.get('/api/quizzes/')
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_get_quizzes_page_uses_index(self):
+        """Test a list page is read from the index without sorting."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        for i in range(4):
+            Quiz.objects.create(
+                user=self.user, title=f'Quiz {i}', video_url='https://y/'
+            )
+        response = self.client.get('/api/quizzes/?page_size=2')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(response.data['next'])
+        page_sql = next(
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT "quizzes_quiz"."id"')
+        )
+        self.assertNotIn('GROUP BY', page_sql)
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {page_sql}')
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('quiz_user_created_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_get_quizzes_summary(self):
+        """Test the summary view counts questions without loading them."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        for title in ('Q1', 'Q2'):
+            Question.objects.create(
+                quiz=self.quiz, question_title=title,
+                question_options=['A'], answer='A'
+            )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/quizzes/?view=summary')
+        summary = response.data['results'][0]
+        self.assertEqual(summary['question_count'], 2)
+        self.assertNotIn('questions', summary)
+        self.assertFalse(any(
+            'quizzes_question"."question_title' in query['sql']
+            for query in queries.captured_queries
+        ))
+
+    def test_get_quizzes_sparse_fields(self):
+        """Test ?fields= limits the serialized quiz fields."""
+        response = self.client.get('/api/quizzes/?fields=id,title')
+        self.assertEqual(
+            set(response.data['results'][0]), {'id', 'title'}
+        )
+        response = self.client.get(
+            '/api/quizzes/?view=summary&fields=title,question_count'
+        )
+        self.assertEqual(response.data['results'][0], {
+            'title': 'Test Quiz', 'question_count': 0
+        })
 
 
 class QuizDetailViewTests(TestCase):
@@ -179,6 +285,47 @@ class QuizDetailViewTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Quiz.objects.filter(id=quiz_id).exists())
 
+    def test_get_quiz_detail_not_modified(self):
+        """Test unchanged quizzes answer 304 until edited or deleted."""
+        url = f'/api/quizzes/{self.quiz.id}/'
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        question = self.quiz.questions.get()
+        question.answer = 'B'
+        question.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        etag = response['ETag']
+        self.client.patch(url, {'title': 'New'}, format='json')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.delete(url)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_quiz_list_not_modified(self):
+        """Test the list validators change with quizzes and parameters."""
+        response = self.client.get('/api/quizzes/')
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+        response = self.client.get('/api/quizzes/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(
+            '/api/quizzes/?view=summary', HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.quiz.questions.get().delete()
+        response = self.client.get('/api/quizzes/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        future = 'Fri, 01 Jan 2100 00:00:00 GMT'
+        response = self.client.get(
+            '/api/quizzes/', HTTP_IF_MODIFIED_SINCE=future
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_access_other_user_quiz(self):
         """Test accessing another user's quiz."""
         other_user = User.objects.create_user(
@@ -195,15 +342,115 @@ class QuizDetailViewTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
+class QuizCacheTests(TestCase):
+    """Tests for the rendered quiz cache."""
+
+    def setUp(self):
+        """Start with an empty cache and an authenticated client."""
+        from quizzes.quiz_cache import get_quiz_cache
+        get_quiz_cache().clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user('cacheuser', password='test')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.cookies['access_token'] = str(refresh.access_token)
+
+    def create_quiz(self):
+        """Create a quiz through the bulk persistence path."""
+        from quizzes.utils import create_quiz_in_db
+        quiz_data = {'title': 'Cached', 'questions': [
+            {'question': 'Q', 'options': ['A', 'B'], 'answer': 'A'}
+        ]}
+        with self.captureOnCommitCallbacks(execute=True):
+            return create_quiz_in_db(self.user, quiz_data, 'https://y/1')
+
+    def test_created_quiz_is_served_from_cache(self):
+        """Test new quizzes are cached and reads skip question queries."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from quizzes.quiz_cache import get_cache_stats
+        quiz = self.create_quiz()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/quizzes/{quiz.id}/')
+        self.assertEqual(response.data['questions'][0]['answer'], 'A')
+        self.assertFalse(any(
+            'quizzes_question"."answer' in query['sql']
+            for query in queries.captured_queries
+        ))
+        self.client.get('/api/quizzes/')
+        self.assertEqual(get_cache_stats()['hits'], 2)
+        self.assertEqual(get_cache_stats()['misses'], 0)
+
+    def test_stats_served_to_staff(self):
+        """Test the serving process reports its counters to staff only."""
+        from django.core.management import call_command, CommandError
+        quiz = self.create_quiz()
+        self.client.get(f'/api/quizzes/{quiz.id}/')
+        response = self.client.get('/api/stats/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get('/api/stats/')
+        self.assertEqual(response.data['quiz_cache']['hits'], 1)
+        with self.assertRaises(CommandError):
+            call_command('quiz_cache_stats')
+
+    def test_changes_from_other_processes_served(self):
+        """Test edits that bypass this process never serve stale data."""
+        from django.utils import timezone
+        quiz = self.create_quiz()
+        self.client.get(f'/api/quizzes/{quiz.id}/')
+        Question.objects.filter(quiz=quiz).update(
+            answer='B', updated_at=timezone.now()
+        )
+        response = self.client.get(f'/api/quizzes/{quiz.id}/')
+        self.assertEqual(response.data['questions'][0]['answer'], 'B')
+        response = self.client.get('/api/quizzes/')
+        self.assertEqual(
+            response.data['results'][0]['questions'][0]['answer'], 'B'
+        )
+        Question.objects.filter(quiz=quiz).delete()
+        response = self.client.get(f'/api/quizzes/{quiz.id}/')
+        self.assertEqual(response.data['questions'], [])
+        Quiz.objects.filter(pk=quiz.pk).delete()
+        response = self.client.get(f'/api/quizzes/{quiz.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cached_quiz_not_shared_with_other_users(self):
+        """Test a cached quiz is only returned to its owner."""
+        quiz = self.create_quiz()
+        other = User.objects.create_user('other', password='test')
+        client = APIClient()
+        client.cookies['access_token'] = str(
+            RefreshToken.for_user(other).access_token
+        )
+        response = client.get(f'/api/quizzes/{quiz.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
 class UtilityFunctionTests(TestCase):
     """Tests for utility functions."""
 
     def test_get_youtube_download_opts(self):
         """Test YouTube download options."""
         opts = get_youtube_download_opts('/path/to/output')
-        self.assertEqual(opts['format'], 'bestaudio/best')
+        self.assertEqual(
+            opts['format'], 'worstaudio[acodec!=none][abr>=?48]/bestaudio/best'
+        )
         self.assertEqual(opts['outtmpl'], '/path/to/output')
+        self.assertEqual(opts['concurrent_fragment_downloads'], 4)
         self.assertTrue(opts['quiet'])
+        with self.settings(AUDIO_FORMAT_PROFILE='best'):
+            opts = get_youtube_download_opts('/path/to/output')
+        self.assertEqual(opts['format'], 'bestaudio/best')
+
+    def test_add_download_range(self):
+        """Test capped downloads only fetch the first seconds."""
+        from quizzes.functions import add_download_range
+        self.assertNotIn('download_ranges', add_download_range({}, 0))
+        opts = add_download_range({}, 600)
+        self.assertEqual(list(opts['download_ranges']({}, None)), [
+            {'start_time': 0, 'end_time': 600}
+        ])
 
     def test_clean_json_response(self):
         """Test JSON response cleaning."""
@@ -232,6 +479,18 @@ class UtilityFunctionTests(TestCase):
         self.assertIn('options', normalized['questions'][0])
         self.assertNotIn('question_title', normalized['questions'][0])
 
+    def test_extract_youtube_video_id(self):
+        """Test video ID extraction from supported URL formats."""
+        urls = [
+            'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+            'https://youtube.com/watch?feature=share&v=dQw4w9WgXcQ',
+            'https://youtu.be/dQw4w9WgXcQ?t=12',
+            'https://www.youtube.com/shorts/dQw4w9WgXcQ',
+        ]
+        for url in urls:
+            self.assertEqual(extract_youtube_video_id(url), 'dQw4w9WgXcQ')
+        self.assertIsNone(extract_youtube_video_id('https://example.com/'))
+
     @patch('os.path.exists')
     @patch('os.remove')
     def test_cleanup_audio_file(self, mock_remove, mock_exists):
@@ -248,11 +507,471 @@ class UtilityFunctionTests(TestCase):
         cleanup_audio_file('/path/to/file.mp3')
         mock_remove.assert_not_called()
 
+    def quiz_data(self, count=10):
+        """Build quiz data with the given number of questions."""
+        return {'title': 'Quiz', 'description': 'D', 'questions': [
+            {'question': f'Q{i}', 'options': ['A', 'B'], 'answer': 'A'}
+            for i in range(count)
+        ]}
+
+    def test_create_quiz_in_db_bulk_inserts(self):
+        """Test a quiz and all its questions take a constant query count."""
+        from quizzes.utils import create_quiz_in_db
+        user = User.objects.create_user('bulkuser', password='test')
+        with self.assertNumQueries(4):
+            quiz = create_quiz_in_db(user, self.quiz_data(), 'https://y/1')
+        self.assertEqual(quiz.questions.count(), 10)
+
+    def test_create_quiz_in_db_invalid_question(self):
+        """Test a bad question leaves no partial quiz behind."""
+        from quizzes.utils import create_quiz_in_db
+        user = User.objects.create_user('bulkuser', password='test')
+        quiz_data = self.quiz_data()
+        del quiz_data['questions'][6]['answer']
+        with self.assertRaisesMessage(ValueError, 'Question 7'):
+            create_quiz_in_db(user, quiz_data, 'https://y/1')
+        self.assertFalse(Quiz.objects.exists())
+        self.assertFalse(Question.objects.exists())
+
+    def test_create_quizzes_in_db(self):
+        """Test many quizzes are imported in one transaction."""
+        from quizzes.utils import create_quizzes_in_db
+        user = User.objects.create_user('bulkuser', password='test')
+        entries = [
+            (user, self.quiz_data(i + 1), f'https://y/{i}') for i in range(3)
+        ]
+        quizzes = create_quizzes_in_db(entries)
+        self.assertEqual(
+            [quiz.questions.count() for quiz in quizzes], [1, 2, 3]
+        )
+        with self.assertRaises(ValueError):
+            create_quizzes_in_db(entries + [(user, {'title': ''}, 'u')])
+        self.assertEqual(Quiz.objects.count(), 3)
+
+
+class GeminiClientTests(TestCase):
+    """Tests for the shared Gemini client against a local stand-in."""
+
+    def setUp(self):
+        """Start a stand-in server and point the client at it."""
+        from quizzes.gemini_client import reset_gemini_client
+        from quizzes.llm_stand_in import start_stand_in_server
+        self.server = start_stand_in_server('{"title": "Stand-in"}')
+        self.addCleanup(self.server.shutdown)
+        overrides = self.settings(
+            GEMINI_BASE_URL=self.server.base_url, GEMINI_API_KEY='test-key'
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        reset_gemini_client()
+        self.addCleanup(reset_gemini_client)
+
+    def test_client_and_connection_reused(self):
+        """Test calls share one client and one kept-alive connection."""
+        from quizzes.gemini_client import generate_content, get_gemini_client
+        client = get_gemini_client()
+        for _ in range(3):
+            self.assertEqual(generate_content('p'), '{"title": "Stand-in"}')
+        self.assertIs(get_gemini_client(), client)
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_new_client_after_fork(self):
+        """Test a process with a new PID builds its own client."""
+        from quizzes.gemini_client import get_gemini_client
+        client = get_gemini_client()
+        with patch('quizzes.gemini_client.os.getpid', return_value=-1):
+            self.assertIsNot(get_gemini_client(), client)
+
+    def test_concurrency_limited(self):
+        """Test GEMINI_MAX_CONCURRENCY serializes requests."""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from quizzes.gemini_client import generate_content
+        self.server.delay = 0.2
+        started = time.monotonic()
+        with self.settings(GEMINI_MAX_CONCURRENCY=1):
+            with ThreadPoolExecutor(2) as pool:
+                list(pool.map(generate_content, ['a', 'b']))
+        self.assertGreaterEqual(time.monotonic() - started, 0.4)
+
+    def test_request_timeout(self):
+        """Test a slow response fails after GEMINI_TIMEOUT."""
+        import httpx
+        from quizzes.gemini_client import generate_content
+        self.server.delay = 1
+        with self.settings(GEMINI_TIMEOUT=0.2):
+            with self.assertRaises(httpx.TimeoutException):
+                generate_content('p')
+
+
+def make_llm_question(title, answer='A'):
+    """Build a question as the LLM returns it."""
+    return {
+        'question_title': title,
+        'question_options': ['A', 'B', 'C', 'D'],
+        'answer': answer,
+    }
+
+
+def llm_result(data):
+    """Wrap JSON data (or raw text) in a provider result."""
+    text = data if isinstance(data, str) else json.dumps(data)
+    return {
+        'text': text, 'provider': 'test', 'model': 'test-model',
+        'usage': {'prompt_tokens': 100, 'completion_tokens': 50},
+        'latency': 0.5,
+    }
+
+
+@patch('quizzes.functions.call_llm')
+class StructuredOutputTests(TestCase):
+    """Tests for schema-constrained generation and question repair."""
+
+    def generate(self, mock_llm, *replies, count=3):
+        """Generate a quiz from canned replies and return it with metrics."""
+        from quizzes.functions import generate_quiz
+        mock_llm.side_effect = [llm_result(reply) for reply in replies]
+        progress = Mock(spec=['record'])
+        with self.settings(QUIZ_QUESTION_COUNT=count):
+            quiz = generate_quiz('The transcript', on_stage=progress)
+        return quiz, progress.record.call_args[0][1]
+
+    def test_quiz_schema_requested(self, mock_llm):
+        """Test the prompt is sent with the constrained quiz schema."""
+        questions = [make_llm_question(f'Q{i}') for i in range(3)]
+        self.generate(mock_llm, {'title': 'T', 'questions': questions})
+        schema = mock_llm.call_args[0][1]
+        quiz_questions = schema['properties']['questions']
+        self.assertEqual(quiz_questions['maxItems'], 3)
+        options = quiz_questions['items']['properties']['question_options']
+        self.assertEqual(options['minItems'], 4)
+        self.assertIn('answer', quiz_questions['items']['required'])
+
+    def test_only_failing_question_repaired(self, mock_llm):
+        """Test one invalid question is fixed without regenerating."""
+        questions = [make_llm_question(f'Q{i}') for i in range(3)]
+        questions[1]['answer'] = 'E'
+        quiz, metrics = self.generate(
+            mock_llm, {'title': 'T', 'questions': questions},
+            {'questions': [make_llm_question('Fixed')]}
+        )
+        repair_prompt = mock_llm.call_args[0][0]
+        self.assertIn('Question 2 has an answer', repair_prompt)
+        self.assertNotIn('The transcript', repair_prompt)
+        self.assertEqual(
+            [q['question'] for q in quiz['questions']], ['Q0', 'Fixed', 'Q2']
+        )
+        self.assertEqual((metrics['calls'], metrics['repairs']), (2, 1))
+        self.assertEqual(metrics['usage']['prompt_tokens'], 200)
+
+    def test_missing_questions_added(self, mock_llm):
+        """Test missing questions are requested with the transcript."""
+        quiz, _ = self.generate(
+            mock_llm, {'title': 'T', 'questions': [make_llm_question('Q0')]},
+            {'questions': [make_llm_question('N1'), make_llm_question('N2')]}
+        )
+        self.assertIn('The transcript', mock_llm.call_args[0][0])
+        self.assertEqual(len(quiz['questions']), 3)
+
+    def test_invalid_json_fixed(self, mock_llm):
+        """Test unparsable output is sent back for a JSON fix."""
+        questions = [make_llm_question(f'Q{i}') for i in range(3)]
+        quiz, _ = self.generate(
+            mock_llm, '{"title": "T", "questions": [',
+            {'title': 'T', 'questions': questions}
+        )
+        self.assertIn('could not be parsed', mock_llm.call_args[0][0])
+        self.assertEqual(quiz['title'], 'T')
+
+    def test_unrepairable_quiz_fails(self, mock_llm):
+        """Test the job fails once repair attempts are used up."""
+        bad = {'questions': [{'question_title': 'Q', 'answer': 'A'}]}
+        with self.assertRaises(ValueError):
+            self.generate(mock_llm, {'title': 'T', **bad}, bad, bad, count=1)
+        self.assertEqual(mock_llm.call_count, 3)
+
+
+class TranscriptCompactionTests(TestCase):
+    """Tests for transcript cleanup and token-budgeted selection."""
+
+    def test_noise_fillers_and_stutters_removed(self):
+        """Test caption noise, fillers and stuttered words are removed."""
+        from quizzes.transcript_compaction import normalize_transcript
+        text = '[Music] Um, so so today we talk about, uh, cells.\n\n Ähm gut.'
+        self.assertEqual(
+            normalize_transcript(text), 'so today we talk about cells. gut.'
+        )
+
+    def test_content_words_kept(self):
+        """Test units, numbers and grammatical doublings are not removed."""
+        from quizzes.transcript_compaction import normalize_transcript
+        for text in (
+            'The bolt is 5 mm wide.', 'Press the HM button',
+            'Enter the PIN 1 1 2 3', 'Die Frau, die die Zeitung liest.',
+            'He had had enough, enough.', 'Array [0] is first.',
+            'Do you know, I mean, what it is is fine.',
+        ):
+            self.assertEqual(normalize_transcript(text), text)
+
+    def test_repeated_segments_dropped(self):
+        """Test repeated caption lines are kept only once."""
+        from quizzes.transcript_compaction import compact_transcript
+        text, stats = compact_transcript(
+            'Cells divide. Cells divide! Mitosis has phases.', 0
+        )
+        self.assertEqual(text, 'Cells divide. Mitosis has phases.')
+        self.assertEqual((stats['segments'], stats['segments_kept']), (2, 2))
+
+    def test_budget_keeps_informative_segments_in_order(self):
+        """Test an oversized transcript keeps its rarest content."""
+        from quizzes.transcript_compaction import compact_transcript
+        filler = [f'This video is great part {n}.' for n in range(30)]
+        text = ' '.join(
+            filler[:10] + ['Mitochondria produce adenosine triphosphate.']
+            + filler[10:20] + ['Ribosomes synthesize proteins.']
+            + filler[20:]
+        )
+        compacted, stats = compact_transcript(text, 25)
+        self.assertEqual(
+            compacted, 'Mitochondria produce adenosine triphosphate. '
+            'Ribosomes synthesize proteins.'
+        )
+        self.assertEqual((stats['segments'], stats['segments_kept']), (32, 2))
+        self.assertGreater(stats['tokens_before'], 200)
+
+    @patch('quizzes.functions.call_llm')
+    def test_compacted_transcript_prompted(self, mock_llm):
+        """Test the prompt holds the compacted transcript."""
+        from quizzes.functions import generate_quiz
+        quiz = {'title': 'T', 'questions': [make_llm_question('Q')]}
+        mock_llm.return_value = llm_result(quiz)
+        with self.settings(QUIZ_QUESTION_COUNT=1):
+            generate_quiz('Um, cells cells divide.')
+        self.assertTrue(mock_llm.call_args[0][0].endswith('\ncells divide.'))
+
+    def test_token_counts_recorded_on_job(self):
+        """Test tokens before and after compaction are job metrics."""
+        from quizzes.functions import generate_quiz
+        from quizzes.jobs import JobProgress
+        user = User.objects.create_user('compactuser', password='test')
+        job = QuizJob.objects.create(user=user, url='https://y/')
+        with self.settings(LLM_PROVIDER='fake', TRANSCRIPT_TOKEN_BUDGET=5):
+            generate_quiz('Uh, one topic. Another topic.', JobProgress(job))
+        stats = job.metrics['transcript']
+        self.assertEqual(stats['tokens_before'], 8)
+        self.assertLessEqual(stats['tokens_after'], 5)
+
+
+class LLMProviderTests(TestCase):
+    """Tests for the pluggable LLM provider layer."""
+
+    def setUp(self):
+        """Start from fresh provider instances."""
+        from quizzes.llm_providers import reset_llm_providers
+        reset_llm_providers()
+        self.addCleanup(reset_llm_providers)
+
+    def test_fake_provider_deterministic(self):
+        """Test the fake provider returns the same valid quiz per prompt."""
+        from quizzes.functions import generate_quiz
+        with self.settings(LLM_PROVIDER='fake'):
+            quiz = generate_quiz('Transcript')
+            self.assertEqual(generate_quiz('Transcript'), quiz)
+        self.assertEqual(len(quiz['questions']), 10)
+        for question in quiz['questions']:
+            self.assertEqual(len(set(question['options'])), 4)
+            self.assertIn(question['answer'], question['options'])
+
+    def test_openai_compatible_provider(self):
+        """Test chat completions of a local server are used and measured."""
+        from quizzes.llm_providers import get_llm_provider
+        from quizzes.llm_stand_in import start_stand_in_server
+        server = start_stand_in_server('{"title": "Local"}')
+        self.addCleanup(server.shutdown)
+        with self.settings(
+            LLM_PROVIDER='openai', LLM_BASE_URL=server.base_url + '/v1',
+            LLM_MODEL='llama'
+        ):
+            result = get_llm_provider().generate('Prompt')
+            get_llm_provider().generate('Prompt', {'type': 'object'})
+        self.assertNotIn('response_format', server.requests[0])
+        self.assertEqual(
+            server.requests[1]['response_format']['type'], 'json_schema'
+        )
+        self.assertEqual(result['text'], '{"title": "Local"}')
+        self.assertEqual(result['model'], 'llama')
+        self.assertEqual(result['usage']['completion_tokens'], 20)
+        message = server.requests[0]['messages'][0]
+        self.assertEqual(message['content'], 'Prompt')
+
+    def test_unknown_provider(self):
+        """Test an unknown provider name is rejected."""
+        from quizzes.llm_providers import get_llm_provider
+        with self.settings(LLM_PROVIDER='nope'):
+            with self.assertRaises(ValueError):
+                get_llm_provider()
+
+    def test_llm_metrics_recorded_on_job(self):
+        """Test provider, usage and latency are stored in job metrics."""
+        from quizzes.functions import generate_quiz
+        from quizzes.jobs import JobProgress
+        user = User.objects.create_user('llmuser', password='test')
+        job = QuizJob.objects.create(user=user, url='https://y/')
+        with self.settings(LLM_PROVIDER='fake'):
+            generate_quiz('Transcript', on_stage=JobProgress(job))
+        self.assertEqual(job.metrics['llm']['provider'], 'fake')
+        self.assertIn('prompt_tokens', job.metrics['llm']['usage'])
+        self.assertIn('latency', job.metrics['llm'])
+
+
+class LLMCallPolicyTests(TestCase):
+    """Tests for LLM rate limits, retries and hedging."""
+
+    def setUp(self):
+        """Start with empty rate windows, counters and latencies."""
+        from django.core.cache import caches
+        from quizzes import llm_calls
+        from quizzes.gemini_client import reset_gemini_client
+        from quizzes.llm_providers import reset_llm_providers
+        caches['llm'].clear()
+        llm_calls._latencies.clear()
+        reset_gemini_client()
+        reset_llm_providers()
+        self.addCleanup(reset_gemini_client)
+        self.addCleanup(reset_llm_providers)
+        sleep = patch('quizzes.llm_calls.time.sleep')
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def start_server(self, *failures):
+        """Start a stand-in server answering with failures first."""
+        from quizzes.llm_stand_in import start_stand_in_server
+        server = start_stand_in_server('{"title": "T"}')
+        self.addCleanup(server.shutdown)
+        server.failures.extend(failures)
+        return server
+
+    def waits(self):
+        """Get the backoff sleeps (the stand-in also sleeps for 0)."""
+        return [c[0][0] for c in self.sleep.call_args_list if c[0][0]]
+
+    def test_gemini_retry_after_honored(self):
+        """Test a Gemini 429 is retried no sooner than Retry-After."""
+        from quizzes.llm_calls import generate_with_policy, get_llm_stats
+        server = self.start_server((429, {'Retry-After': '7'}))
+        with self.settings(
+            GEMINI_BASE_URL=server.base_url, GEMINI_API_KEY='test-key'
+        ):
+            result = generate_with_policy('Prompt')
+        self.assertEqual(result['text'], '{"title": "T"}')
+        self.assertGreaterEqual(self.waits()[0], 7)
+        self.assertEqual(get_llm_stats()['retried'], 1)
+
+    def test_retries_exhausted(self):
+        """Test 5xx failures are retried LLM_MAX_RETRIES times."""
+        import httpx
+        from quizzes.llm_calls import generate_with_policy, get_llm_stats
+        server = self.start_server(*[(503, {})] * 3)
+        with self.settings(
+            LLM_PROVIDER='openai', LLM_BASE_URL=server.base_url,
+            LLM_MAX_RETRIES=2
+        ):
+            with self.assertRaises(httpx.HTTPStatusError):
+                generate_with_policy('Prompt')
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(get_llm_stats()['retried'], 2)
+
+    def test_client_error_not_retried(self):
+        """Test a 400 fails without retrying."""
+        import httpx
+        from quizzes.llm_calls import generate_with_policy
+        server = self.start_server((400, {}))
+        with self.settings(
+            LLM_PROVIDER='openai', LLM_BASE_URL=server.base_url
+        ):
+            with self.assertRaises(httpx.HTTPStatusError):
+                generate_with_policy('Prompt')
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(self.waits(), [])
+
+    def test_stats_served_to_staff(self):
+        """Test the serving process reports its LLM counters."""
+        from django.core.management import call_command, CommandError
+        from quizzes.llm_calls import record_counter
+        record_counter('retried', 2)
+        staff = User.objects.create_user(
+            'staffuser', password='test', is_staff=True
+        )
+        client = APIClient()
+        client.cookies['access_token'] = str(
+            RefreshToken.for_user(staff).access_token
+        )
+        response = client.get('/api/stats/')
+        self.assertEqual(response.data['llm']['retried'], 2)
+        with self.assertRaises(CommandError):
+            call_command('llm_stats')
+
+    def test_requests_per_minute_wait_for_next_window(self):
+        """Test a call over the request budget waits for a new window."""
+        import time
+        from django.core.cache import caches
+        from quizzes.llm_calls import generate_with_policy, get_llm_stats
+        self.sleep.side_effect = lambda seconds: seconds and caches[
+            'llm'
+        ].delete(f'llm-rate:requests:{int(time.time() // 60)}')
+        with self.settings(LLM_PROVIDER='fake', LLM_REQUESTS_PER_MINUTE=1):
+            generate_with_policy('First')
+            generate_with_policy('Second')
+        self.assertEqual(get_llm_stats()['throttled'], 1)
+        self.assertEqual(get_llm_stats()['calls'], 2)
+
+    def test_token_budget_exhausted(self):
+        """Test reported usage counts against the token budget."""
+        from quizzes.llm_calls import LLMRateLimitTimeout, generate_with_policy
+        with self.settings(
+            LLM_PROVIDER='fake', LLM_TOKENS_PER_MINUTE=200,
+            LLM_COMPLETION_TOKENS=0, LLM_RATE_MAX_WAIT=0
+        ):
+            generate_with_policy('Prompt')
+            with self.assertRaises(LLMRateLimitTimeout):
+                generate_with_policy('Prompt')
+
+    def test_slow_call_hedged(self):
+        """Test a call slower than the p95 latency is raced by a hedge."""
+        import threading
+        from quizzes import llm_calls
+        release, calls = threading.Event(), []
+
+        def generate(prompt, schema):
+            calls.append(prompt)
+            if len(calls) == 1:
+                release.wait(5)
+            return {'text': str(len(calls)), 'latency': 0.01}
+        llm_calls._latencies.extend([0.05] * 20)
+        with self.settings(LLM_HEDGE_ENABLED=True):
+            result = llm_calls.generate_with_policy(
+                'Prompt', provider=Mock(generate=generate)
+            )
+        release.set()
+        self.assertEqual(result['text'], '2')
+        stats = llm_calls.get_llm_stats()
+        self.assertEqual((stats['hedged'], stats['hedge_wins']), (1, 1))
+
+    def test_retry_after_http_date(self):
+        """Test Retry-After given as an HTTP date is parsed."""
+        from email.utils import format_datetime
+        from datetime import timedelta
+        from django.utils import timezone
+        from quizzes.llm_calls import parse_retry_after
+        later = format_datetime(timezone.now() + timedelta(seconds=30), True)
+        self.assertAlmostEqual(parse_retry_after(later), 30, delta=2)
+        self.assertIsNone(parse_retry_after('soon'))
+
 
 class FunctionIntegrationTests(TestCase):
     """Integration tests for quiz generation functions."""
 
-    @patch('quizzes.functions.yt_dlp.YoutubeDL')
+    @patch('yt_dlp.YoutubeDL')
     def test_download_youtube_audio(self, mock_ytdl):
         """Test YouTube audio download."""
         from quizzes.functions import download_youtube_audio
@@ -266,28 +985,111 @@ class FunctionIntegrationTests(TestCase):
         self.assertEqual(video_id, 'test123')
         mock_instance.extract_info.assert_called_once()
 
-    @patch('quizzes.functions.WHISPER_MODEL')
+    @patch('quizzes.functions.transcribe_file')
     @patch('quizzes.functions.cleanup_audio_file')
-    def test_transcribe_audio(self, mock_cleanup, mock_model):
+    def test_transcribe_audio(self, mock_cleanup, mock_transcribe):
         """Test audio transcription."""
         from quizzes.functions import transcribe_audio
-        mock_model.transcribe.return_value = {'text': 'Test transcript'}
+        mock_transcribe.return_value = {'text': 'Test transcript'}
 
         result = transcribe_audio('/path/to/audio.mp3')
         self.assertEqual(result, 'Test transcript')
         mock_cleanup.assert_called_once_with('/path/to/audio.mp3')
 
-    @patch('quizzes.functions.WHISPER_MODEL')
+    @patch('quizzes.functions.transcribe_file')
     @patch('quizzes.functions.cleanup_audio_file')
-    def test_transcribe_audio_cleanup_on_error(self, mock_cleanup, mock_model):
+    def test_transcribe_audio_cleanup_on_error(
+        self, mock_cleanup, mock_transcribe
+    ):
         """Test cleanup happens even on transcription error."""
         from quizzes.functions import transcribe_audio
-        mock_model.transcribe.side_effect = Exception('Transcription failed')
+        mock_transcribe.side_effect = Exception('Transcription failed')
 
         with self.assertRaises(Exception):
             transcribe_audio('/path/to/audio.mp3')
         mock_cleanup.assert_called_once_with('/path/to/audio.mp3')
 
+    @patch('yt_dlp.YoutubeDL')
+    def test_download_youtube_audio_with_info(self, mock_ytdl):
+        """Test download reuses pre-flight info instead of extracting."""
+        from quizzes.functions import download_youtube_audio
+        mock_instance = mock_ytdl.return_value.__enter__.return_value
+        mock_instance.process_ie_result.return_value = {'id': 'test123'}
+        mock_instance.prepare_filename.return_value = '/path/to/test123.m4a'
+
+        info = {'id': 'test123'}
+        audio_file, video_id = download_youtube_audio('url', info=info)
+        self.assertEqual(video_id, 'test123')
+        mock_instance.extract_info.assert_not_called()
+        mock_instance.process_ie_result.assert_called_once_with(
+            info, download=True
+        )
+
+    @patch('yt_dlp.YoutubeDL')
+    def test_resolve_video_info_is_cached(self, mock_ytdl):
+        """Test pre-flight metadata is resolved once without download."""
+        from quizzes.functions import (
+            resolve_video_info,
+            get_cached_video_info,
+            clear_video_info_cache
+        )
+        clear_video_info_cache()
+        mock_instance = mock_ytdl.return_value.__enter__.return_value
+        mock_instance.extract_info.return_value = {
+            'id': 'dQw4w9WgXcQ', 'duration': 212
+        }
+
+        url = 'https://example.com/video'
+        self.assertEqual(resolve_video_info(url)['duration'], 212)
+        resolve_video_info(url)
+        mock_instance.extract_info.assert_called_once_with(
+            url, download=False
+        )
+        self.assertIsNotNone(get_cached_video_info('dQw4w9WgXcQ'))
+        clear_video_info_cache()
+
+    @patch('quizzes.functions.time.monotonic')
+    def test_video_info_cache_expires(self, mock_monotonic):
+        """Test cached pre-flight info expires after the TTL."""
+        from quizzes.functions import (
+            cache_video_info,
+            get_cached_video_info,
+            clear_video_info_cache
+        )
+        mock_monotonic.return_value = 1000.0
+        cache_video_info(['abc'], {'id': 'abc'})
+        self.assertEqual(get_cached_video_info('abc'), {'id': 'abc'})
+        mock_monotonic.return_value = 1000.0 + 10 ** 6
+        self.assertIsNone(get_cached_video_info('abc'))
+        clear_video_info_cache()
+
+    @patch('quizzes.functions.generate_quiz')
+    @patch('quizzes.functions.resolve_video_info')
+    def test_create_quiz_reuses_existing_quiz(
+        self, mock_resolve, mock_generate
+    ):
+        """Test an existing quiz for the video skips the whole pipeline."""
+        from quizzes.functions import create_quiz_from_url
+        user = User.objects.create_user('testuser', password='test')
+        quiz = Quiz.objects.create(
+            user=user,
+            title='Existing',
+            video_url='https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+        )
+        Question.objects.create(
+            quiz=quiz,
+            question_title='Q1',
+            question_options=['A', 'B', 'C', 'D'],
+            answer='A'
+        )
+        url = 'https://youtu.be/dQw4w9WgXcQ'
+        with self.settings(QUIZ_REUSE_EXISTING=True):
+            quiz_data, _ = create_quiz_from_url(url, user)
+        self.assertEqual(quiz_data['title'], 'Existing')
+        self.assertEqual(quiz_data['questions'][0]['answer'], 'A')
+        mock_resolve.assert_not_called()
+        mock_generate.assert_not_called()
+
     def test_build_gemini_prompt(self):
         """Test Gemini prompt building."""
         from quizzes.functions import build_gemini_prompt
@@ -296,51 +1098,67 @@ class FunctionIntegrationTests(TestCase):
         self.assertIn('JSON format', prompt)
         self.assertIn('10 questions', prompt)
 
-    @patch('quizzes.functions.genai.Client')
-    def test_call_gemini_api(self, mock_client):
-        """Test Gemini API call."""
-        from quizzes.functions import call_gemini_api
+    @override_settings(GEMINI_API_KEY='test-key')
+    @patch('google.genai.Client')
+    def test_gemini_provider(self, mock_client):
+        """Test the Gemini provider returns text and token usage."""
+        from quizzes.gemini_client import reset_gemini_client
+        from quizzes.llm_providers import GeminiProvider
+        reset_gemini_client()
+        self.addCleanup(reset_gemini_client)
         mock_instance = mock_client.return_value
         mock_response = mock_instance.models.generate_content.return_value
         mock_response.text = 'Generated quiz'
+        mock_response.usage_metadata.prompt_token_count = 12
+        mock_response.usage_metadata.candidates_token_count = 34
 
-        result = call_gemini_api('Test prompt')
-        self.assertEqual(result, 'Generated quiz')
+        result = GeminiProvider().generate('Test prompt')
+        self.assertEqual(result['text'], 'Generated quiz')
+        self.assertEqual(
+            result['usage'], {'prompt_tokens': 12, 'completion_tokens': 34}
+        )
 
-    @patch('quizzes.functions.call_gemini_api')
-    def test_generate_quiz_with_gemini(self, mock_api):
+    @patch('quizzes.functions.call_llm')
+    def test_generate_quiz(self, mock_llm):
         """Test complete quiz generation."""
-        from quizzes.functions import generate_quiz_with_gemini
-        mock_api.return_value = '''{"title": "Test", "questions": [
-            {"question_title": "Q1", "question_options": ["A"], "answer": "A"}
-        ]}'''
+        from quizzes.functions import generate_quiz
+        mock_llm.return_value = llm_result({'title': 'Test', 'questions': [
+            make_llm_question('Q1')
+        ]})
 
-        result = generate_quiz_with_gemini('Test transcript')
+        with self.settings(QUIZ_QUESTION_COUNT=1):
+            result = generate_quiz('Test transcript')
         self.assertEqual(result['title'], 'Test')
         self.assertIn('questions', result)
 
     def test_generate_quiz_no_api_key(self):
         """Test error when API key is missing."""
-        from quizzes.functions import generate_quiz_with_gemini
+        from quizzes.functions import generate_quiz
         from django.conf import settings
         original_key = settings.GEMINI_API_KEY
         settings.GEMINI_API_KEY = ''
 
         with self.assertRaises(ValueError):
-            generate_quiz_with_gemini('Test')
+            generate_quiz('Test')
 
         settings.GEMINI_API_KEY = original_key
 
-    @patch('quizzes.functions.generate_quiz_with_gemini')
-    @patch('quizzes.functions.transcribe_audio')
+    @patch('quizzes.functions.generate_quiz')
+    @patch('quizzes.functions.transcribe_audio_result')
     @patch('quizzes.functions.download_youtube_audio')
+    @patch('quizzes.functions.resolve_video_info')
     def test_create_quiz_from_url_integration(
-        self, mock_download, mock_transcribe, mock_generate
+        self, mock_resolve, mock_download, mock_transcribe, mock_generate
     ):
         """Test complete quiz creation pipeline."""
         from quizzes.functions import create_quiz_from_url
+        mock_resolve.return_value = {'id': 'test123'}
         mock_download.return_value = ('/path/audio.mp3', 'test123')
-        mock_transcribe.return_value = 'Transcript text'
+        mock_transcribe.return_value = {
+            'text': 'Transcript text',
+            'language': 'en',
+            'segments': [{'start': 0.0, 'end': 1.5, 'text': 'Hi', 'id': 0}]
+        }
         mock_generate.return_value = {
             'title': 'Quiz',
             'questions': []
@@ -356,6 +1174,631 @@ class FunctionIntegrationTests(TestCase):
         mock_download.assert_called_once()
         mock_transcribe.assert_called_once()
         mock_generate.assert_called_once()
+        transcript = Transcript.objects.get(video_id='test123')
+        self.assertEqual(transcript.text, 'Transcript text')
+        self.assertEqual(transcript.segments[0], {
+            'start': 0.0, 'end': 1.5, 'text': 'Hi'
+        })
+
+    @patch('quizzes.functions.generate_quiz')
+    @patch('quizzes.functions.download_youtube_audio')
+    def test_create_quiz_from_url_uses_cached_transcript(
+        self, mock_download, mock_generate
+    ):
+        """Test a cached transcript skips download and transcription."""
+        from django.conf import settings
+        from quizzes.functions import create_quiz_from_url
+        Transcript.objects.create(
+            video_id='dQw4w9WgXcQ',
+            model_name=settings.WHISPER_MODEL_NAME,
+            text='Cached transcript'
+        )
+        mock_generate.return_value = {'title': 'Quiz', 'questions': []}
+
+        url = 'https://youtu.be/dQw4w9WgXcQ?si=abc'
+        _, normalized_url = create_quiz_from_url(url, None)
+
+        mock_download.assert_not_called()
+        mock_generate.assert_called_once_with('Cached transcript', None)
+        self.assertEqual(
+            normalized_url,
+            'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+        )
+
+
+class WhisperModelRegistryTests(TestCase):
+    """Tests for lazy Whisper model loading."""
+
+    def setUp(self):
+        """Start every test with an empty registry."""
+        from quizzes import transcription
+        self.registry = transcription._models
+        self.registry.clear()
+
+    def tearDown(self):
+        """Drop models loaded by the test."""
+        self.registry.clear()
+
+    @patch('quizzes.transcription.load_whisper_model')
+    def test_model_loaded_once(self, mock_load):
+        """Test the model is loaded on first use and then reused."""
+        from quizzes.transcription import get_whisper_model
+        self.assertIs(get_whisper_model('base'), get_whisper_model('base'))
+        mock_load.assert_called_once_with('base')
+
+    @patch('quizzes.transcription.load_whisper_model')
+    def test_model_loaded_once_across_threads(self, mock_load):
+        """Test concurrent first use loads the model only once."""
+        import threading
+        from quizzes.transcription import get_whisper_model
+        threads = [
+            threading.Thread(target=get_whisper_model, args=('base',))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        mock_load.assert_called_once_with('base')
+
+    @patch('quizzes.transcription.load_whisper_model')
+    def test_warm_up_respects_setting(self, mock_load):
+        """Test the warm-up hook only loads when enabled."""
+        from quizzes.transcription import warm_up_if_configured
+        with self.settings(WHISPER_PRELOAD=False):
+            warm_up_if_configured()
+        mock_load.assert_not_called()
+        with self.settings(WHISPER_PRELOAD=True):
+            warm_up_if_configured()
+        mock_load.assert_called_once()
+
+
+class FakeWhisperModel:
+    """Stand-in model that echoes the audio path as transcript."""
+
+    def transcribe(self, audio):
+        """Return a Whisper-like result for the given audio."""
+        if not isinstance(audio, str):
+            audio = f'{len(audio)} samples'
+        if audio.endswith('broken'):
+            raise RuntimeError('decode failed')
+        return {
+            'text': f'text of {audio}',
+            'language': 'en',
+            'segments': [{'start': 0.0, 'end': 1.0, 'text': 'x', 'id': 0}]
+        }
+
+
+class TranscriptionServerTests(TestCase):
+    """Tests for the shared transcription server and its client."""
+
+    def setUp(self):
+        """Start a server with two fake models on a temporary socket."""
+        import tempfile
+        import threading
+        from quizzes.transcription_server import create_transcription_server
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.address = f'unix:{self.tmpdir.name}/whisper.sock'
+        self.server = create_transcription_server(
+            self.address, [FakeWhisperModel(), FakeWhisperModel()]
+        )
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        """Stop the server and remove the socket directory."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def test_transcribe_remote(self):
+        """Test the client receives the server's transcription."""
+        from quizzes.transcription_server import transcribe_remote
+        result = transcribe_remote('/tmp/a.m4a', address=self.address)
+        self.assertEqual(result['text'], 'text of /tmp/a.m4a')
+        self.assertEqual(result['segments'], [
+            {'start': 0.0, 'end': 1.0, 'text': 'x'}
+        ])
+        self.assertEqual(self.server.models.qsize(), 2)
+
+    def test_transcribe_remote_error(self):
+        """Test server-side failures are raised on the client."""
+        from quizzes.transcription_server import transcribe_remote
+        with self.assertRaises(RuntimeError):
+            transcribe_remote('broken', address=self.address)
+        self.assertEqual(self.server.models.qsize(), 2)
+
+    def test_transcribe_remote_stream(self):
+        """Test streamed samples are sent to the server as raw PCM."""
+        import numpy as np
+        from quizzes.transcription_server import transcribe_remote_stream
+        blocks = [np.zeros(1600, dtype=np.float32)] * 3
+        result = transcribe_remote_stream(blocks, address=self.address)
+        self.assertEqual(result['text'], 'text of 4800 samples')
+
+    def test_transcribe_file_uses_server(self):
+        """Test transcribe_file routes to the configured server."""
+        from quizzes.transcription import transcribe_file
+        with self.settings(TRANSCRIPTION_SERVER_ADDRESS=self.address):
+            result = transcribe_file('/tmp/a.m4a')
+        self.assertEqual(result['language'], 'en')
+
+    @patch('quizzes.transcription_server.transcribe_parallel')
+    def test_server_uses_parallel_engine(self, mock_parallel):
+        """Test the server transcribes in chunks when parallelism is on."""
+        from quizzes.transcription_server import transcribe_remote
+        mock_parallel.return_value = {'text': 'chunked', 'segments': []}
+        with self.settings(TRANSCRIPTION_PARALLELISM=4):
+            result = transcribe_remote('/tmp/a.m4a', address=self.address)
+        self.assertEqual(result['text'], 'chunked')
+        mock_parallel.assert_called_once_with('/tmp/a.m4a')
+
+    @patch('quizzes.transcription.transcribe_locally')
+    def test_transcribe_file_fallback(self, mock_local):
+        """Test an unreachable server falls back to the local model."""
+        from quizzes.transcription import transcribe_file
+        from quizzes.transcription_server import (
+            TranscriptionServerUnavailable
+        )
+        mock_local.return_value = {'text': 'local'}
+        missing = f'unix:{self.tmpdir.name}/missing.sock'
+        with self.settings(TRANSCRIPTION_SERVER_ADDRESS=missing):
+            self.assertEqual(transcribe_file('a.m4a'), {'text': 'local'})
+            with self.settings(TRANSCRIPTION_SERVER_FALLBACK=False):
+                with self.assertRaises(TranscriptionServerUnavailable):
+                    transcribe_file('a.m4a')
+
+
+class ParallelTranscriptionTests(TestCase):
+    """Tests for chunked parallel transcription."""
+
+    def make_audio(self, seconds, silences):
+        """Build noise audio with 1 s silent gaps at the given seconds."""
+        import numpy as np
+        rng = np.random.default_rng(0)
+        audio = rng.uniform(-0.5, 0.5, seconds * 16000).astype('float32')
+        for second in silences:
+            audio[second * 16000:(second + 1) * 16000] = 0
+        return audio
+
+    def test_plan_chunks_splits_at_silence(self):
+        """Test chunk boundaries fall into silent gaps."""
+        from quizzes.parallel_transcription import plan_chunks
+        audio = self.make_audio(150, [45, 95])
+        chunks = plan_chunks(audio, 30, 60)
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], len(audio))
+        self.assertTrue(45 * 16000 <= chunks[0][1] < 46 * 16000)
+        self.assertTrue(95 * 16000 <= chunks[1][1] < 96 * 16000)
+
+    def test_stitch_results_drops_overlap_duplicates(self):
+        """Test segments heard in an overlap are kept only once."""
+        from quizzes.parallel_transcription import stitch_results
+        chunks = [(0, 160000), (160000, 320000)]
+        results = [
+            {'language': 'en', 'segments': [
+                {'start': 0.0, 'end': 4.0, 'text': ' a'},
+                {'start': 8.0, 'end': 11.0, 'text': ' b'},
+            ]},
+            {'language': 'en', 'segments': [
+                {'start': 8.2, 'end': 11.0, 'text': ' b'},
+                {'start': 12.0, 'end': 15.0, 'text': ' c'},
+            ]},
+        ]
+        result = stitch_results(chunks, results)
+        self.assertEqual(result['text'], ' a b c')
+        self.assertEqual(result['language'], 'en')
+
+    @patch('quizzes.parallel_transcription.get_transcription_pool')
+    def test_transcribe_parallel_offsets_timestamps(self, mock_pool):
+        """Test chunks are transcribed in the pool with absolute times."""
+        from concurrent.futures import ThreadPoolExecutor
+        from quizzes import parallel_transcription
+
+        class ChunkModel:
+            """Model placing one segment in the middle of a chunk."""
+
+            def transcribe(self, audio):
+                """Return a segment labelled with the chunk length."""
+                seconds = len(audio) / 16000
+                return {'language': 'de', 'segments': [
+                    {'start': seconds / 2 - 1, 'end': seconds / 2 + 1,
+                     'text': f' {round(seconds)}'}
+                ]}
+
+        audio = self.make_audio(100, [45])
+        with ThreadPoolExecutor(2) as pool, patch.object(
+            parallel_transcription, '_worker_model', ChunkModel()
+        ):
+            mock_pool.return_value = pool
+            result = parallel_transcription.transcribe_parallel(audio)
+        self.assertEqual(len(result['segments']), 2)
+        self.assertGreater(result['segments'][1]['start'], 45)
+        self.assertEqual(result['language'], 'de')
+
+
+class AudioStreamTests(TestCase):
+    """Tests for streaming audio decoding without temporary files."""
+
+    def fake_ffmpeg(self, script):
+        """Build a command running a Python script instead of ffmpeg."""
+        import sys
+        return [sys.executable, '-c', script]
+
+    def test_iter_pcm_blocks_reads_samples(self):
+        """Test decoder output is yielded as float32 blocks."""
+        import numpy as np
+        from quizzes.audio_stream import collect_pcm, iter_pcm_blocks
+        command = self.fake_ffmpeg(
+            'import sys, array; '
+            'sys.stdout.buffer.write(array.array("f", range(20000)))'
+        )
+        with self.settings(AUDIO_STREAM_BLOCK_SECONDS=0.5):
+            blocks = list(iter_pcm_blocks({}, command=command))
+        self.assertEqual(len(blocks), 3)
+        samples = collect_pcm(blocks)
+        np.testing.assert_array_equal(samples, np.arange(20000))
+
+    def test_iter_pcm_blocks_errors(self):
+        """Test decoder failures raise AudioStreamError."""
+        from quizzes.audio_stream import AudioStreamError, iter_pcm_blocks
+        failing = self.fake_ffmpeg('import sys; sys.exit("bad input")')
+        with self.assertRaisesMessage(AudioStreamError, 'bad input'):
+            list(iter_pcm_blocks({}, command=failing))
+        with self.assertRaises(AudioStreamError):
+            list(iter_pcm_blocks({}, command=['/nonexistent/ffmpeg']))
+
+    def test_collect_pcm_uses_memmap_for_long_audio(self):
+        """Test long inputs are buffered in a memory-mapped file."""
+        import numpy as np
+        from quizzes.audio_stream import collect_pcm
+        blocks = [np.ones(16000, dtype=np.float32)] * 4
+        with self.settings(AUDIO_STREAM_MEMMAP_SECONDS=1):
+            samples = collect_pcm(iter(blocks), duration=1)
+        self.assertEqual(len(samples), 64000)
+        self.assertEqual(float(samples.sum()), 64000)
+
+    def test_build_ffmpeg_command(self):
+        """Test the selected audio URL and headers are passed to ffmpeg."""
+        from quizzes.audio_stream import build_ffmpeg_command
+        info = {'requested_formats': [
+            {'url': 'https://v/video', 'acodec': 'none'},
+            {'url': 'https://v/audio', 'acodec': 'opus',
+             'http_headers': {'User-Agent': 'ua'}},
+        ]}
+        command = build_ffmpeg_command(info, max_seconds=90)
+        self.assertIn('User-Agent: ua\r\n', command)
+        self.assertEqual(command[command.index('-t') + 1], '90')
+        self.assertEqual(command[command.index('-i') + 1], 'https://v/audio')
+        self.assertEqual(command[-5:], ['-ac', '1', '-ar', '16000', '-'])
+
+    @patch('quizzes.functions.transcribe_audio_result')
+    @patch('quizzes.functions.download_youtube_audio')
+    @patch('quizzes.functions.transcribe_pcm_stream')
+    @patch('quizzes.functions.get_video_info')
+    def test_transcribe_youtube_video_streams_first(
+        self, mock_info, mock_stream, mock_download, mock_transcribe
+    ):
+        """Test streaming is used and failures fall back to a download."""
+        from quizzes.audio_stream import AudioStreamError
+        from quizzes.functions import transcribe_youtube_video
+        mock_info.return_value = {'id': 'abc', 'duration': 5}
+        mock_stream.return_value = {'text': 'streamed', 'segments': []}
+        stages = []
+        text = transcribe_youtube_video('abc', on_stage=stages.append)
+        self.assertEqual(text, 'streamed')
+        self.assertEqual(stages, ['streaming'])
+        mock_download.assert_not_called()
+
+        Transcript.objects.all().delete()
+        mock_stream.side_effect = AudioStreamError('no ffmpeg')
+        mock_download.return_value = ('/tmp/abc.m4a', 'abc')
+        mock_transcribe.return_value = {'text': 'downloaded'}
+        self.assertEqual(transcribe_youtube_video('abc'), 'downloaded')
+
+
+class VideoAdmissionTests(TestCase):
+    """Tests for duration and size limits applied before downloading."""
+
+    INFO = {'id': 'abc', 'duration': 7200, 'filesize': 60_000_000}
+
+    def test_admit_video_within_limits(self):
+        """Test videos within the limits are fetched completely."""
+        from quizzes.functions import admit_video
+        self.assertIsNone(admit_video(self.INFO))
+        with self.settings(VIDEO_MAX_DURATION=7200):
+            self.assertIsNone(admit_video(self.INFO))
+
+    def test_admit_video_rejects(self):
+        """Test too long and too large videos are rejected."""
+        from quizzes.functions import admit_video, VideoTooLargeError
+        with self.settings(VIDEO_MAX_DURATION=3600):
+            with self.assertRaises(VideoTooLargeError) as ctx:
+                admit_video(self.INFO)
+        self.assertEqual(ctx.exception.status_code, 422)
+        with self.settings(VIDEO_MAX_BYTES=10_000_000):
+            with self.assertRaises(VideoTooLargeError) as ctx:
+                admit_video(self.INFO)
+        self.assertEqual(ctx.exception.status_code, 413)
+        with self.settings(VIDEO_MAX_DURATION=3600):
+            with self.assertRaises(VideoTooLargeError):
+                admit_video({'id': 'live', 'is_live': True})
+
+    def test_admit_video_truncates(self):
+        """Test the truncate policy returns the tightest allowed window."""
+        from quizzes.functions import admit_video
+        with self.settings(
+            VIDEO_OVERSIZE_POLICY='truncate',
+            VIDEO_MAX_DURATION=3600,
+            VIDEO_MAX_BYTES=10_000_000
+        ):
+            self.assertEqual(admit_video(self.INFO), 1200)
+
+    @patch('quizzes.functions.transcribe_audio_result')
+    @patch('quizzes.functions.download_youtube_audio')
+    @patch('quizzes.functions.get_video_info')
+    def test_truncated_download(self, mock_info, mock_download, mock_result):
+        """Test a truncated video only downloads the allowed window."""
+        from quizzes.functions import transcribe_youtube_video
+        mock_info.return_value = self.INFO
+        mock_download.return_value = ('/tmp/abc.m4a', 'abc')
+        mock_result.return_value = {'text': 'start only'}
+        with self.settings(
+            AUDIO_STREAMING=False,
+            VIDEO_OVERSIZE_POLICY='truncate',
+            VIDEO_MAX_DURATION=600
+        ):
+            transcribe_youtube_video('abc')
+        mock_download.assert_called_once_with(
+            'https://www.youtube.com/watch?v=abc', self.INFO, 600
+        )
+
+    @patch('quizzes.functions.transcribe_audio_result')
+    @patch('quizzes.functions.download_youtube_audio')
+    @patch('quizzes.functions.get_video_info')
+    def test_truncated_transcript_stored_apart(
+        self, mock_info, mock_download, mock_result
+    ):
+        """Test a truncated transcript is never served as the full one."""
+        from quizzes.functions import (
+            get_stored_transcript, transcribe_youtube_video
+        )
+        mock_info.return_value = self.INFO
+        mock_download.return_value = ('/tmp/abc.m4a', 'abc')
+        mock_result.return_value = {'text': 'start only'}
+        with self.settings(AUDIO_STREAMING=False, AUDIO_MAX_SECONDS=600):
+            transcribe_youtube_video('abc')
+            self.assertEqual(transcribe_youtube_video('abc'), 'start only')
+        self.assertEqual(mock_download.call_count, 1)
+        stored = Transcript.objects.get(video_id='abc')
+        self.assertTrue(stored.model_name.endswith('@600s'))
+        self.assertIsNone(get_stored_transcript('abc', 'whisper_only'))
+
+
+class SingleFlightTests(TestCase):
+    """Tests for coalescing concurrent work on the same video."""
+
+    def test_run_single_flight_shares_result(self):
+        """Test concurrent callers run the work once and share it."""
+        import threading
+        import time
+        from quizzes.single_flight import run_single_flight
+        started, release = threading.Event(), threading.Event()
+        calls, results, waits = [], [], []
+
+        def work():
+            """Block until released so a follower can join."""
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {'title': 'Quiz'}
+
+        leader = threading.Thread(
+            target=lambda: results.append(run_single_flight('v', work))
+        )
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=lambda: results.append(
+            run_single_flight('v', work, on_wait=lambda: waits.append(1))
+        ))
+        follower.start()
+        while not waits:
+            time.sleep(0.01)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, [{'title': 'Quiz'}] * 2)
+
+    def test_run_single_flight_raises_and_resets(self):
+        """Test errors propagate and the key can be retried afterwards."""
+        from quizzes.single_flight import run_single_flight
+
+        def fail():
+            """Simulate a failing download."""
+            raise ValueError('download failed')
+
+        with self.assertRaises(ValueError):
+            run_single_flight('v', fail)
+        self.assertEqual(run_single_flight('v', lambda: 1), 1)
+
+    @patch('quizzes.functions.fetch_caption_transcript', return_value=None)
+    @patch('quizzes.functions.transcribe_youtube_video')
+    def test_policies_share_transcription(self, mock_transcribe, _):
+        """Test jobs with different policies share one transcription."""
+        import threading
+        from quizzes.functions import fetch_transcript
+        started, release = threading.Event(), threading.Event()
+        waiting, results = threading.Event(), []
+
+        def transcribe(video_id, on_stage):
+            """Block until released so the other job can join."""
+            started.set()
+            release.wait(5)
+            return 'transcribed'
+
+        mock_transcribe.side_effect = transcribe
+        leader = threading.Thread(target=lambda: results.append(
+            fetch_transcript('abc', 'whisper_only')
+        ))
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=lambda: results.append(
+            fetch_transcript('abc', 'prefer_captions', lambda stage: (
+                waiting.set() if stage == 'waiting' else None
+            ))
+        ))
+        follower.start()
+        waiting.wait(5)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+        mock_transcribe.assert_called_once()
+        self.assertEqual(results, ['transcribed'] * 2)
+
+    def test_acquire_lease(self):
+        """Test a lease is exclusive until released or expired."""
+        from datetime import timedelta
+        from django.utils import timezone
+        from quizzes.models import VideoLease
+        from quizzes.single_flight import acquire_lease, release_lease
+        self.assertTrue(acquire_lease('abc', 'a'))
+        self.assertFalse(acquire_lease('abc', 'b'))
+        release_lease('abc', 'a')
+        self.assertTrue(acquire_lease('abc', 'b'))
+        VideoLease.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertTrue(acquire_lease('abc', 'c'))
+
+    @patch('quizzes.functions.fetch_transcript')
+    def test_get_transcript_holds_lease(self, mock_fetch):
+        """Test transcripts are fetched under a lease that is released."""
+        from quizzes.functions import get_transcript
+        from quizzes.models import VideoLease
+        from quizzes.single_flight import hold_lease
+        mock_fetch.side_effect = lambda *args: Transcript.objects.create(
+            video_id='abc', model_name='base', text='stored'
+        ).text
+        with self.settings(
+            SINGLE_FLIGHT_DB_LEASE=True, WHISPER_MODEL_NAME='base'
+        ):
+            with hold_lease('abc'):
+                self.assertTrue(VideoLease.objects.exists())
+            for _ in range(2):
+                self.assertEqual(
+                    get_transcript('abc', source='whisper_only'), 'stored'
+                )
+        mock_fetch.assert_called_once()
+        self.assertFalse(VideoLease.objects.exists())
+
+
+class CaptionTranscriptTests(TestCase):
+    """Tests for caption-first transcripts."""
+
+    VTT = (
+        "WEBVTT\nKind: captions\nLanguage: en\n\n"
+        "00:00:00.000 --> 00:00:02.000 align:start position:0%\n"
+        "Hello<00:00:00.500><c> world</c>\n\n"
+        "00:00:02.000 --> 00:00:02.010\n"
+        "Hello world\n\n"
+        "00:00:02.010 --> 00:00:04.000\n"
+        "Hello world\nthis is &amp; a test\n"
+    )
+
+    def test_parse_vtt_removes_tags_and_repeats(self):
+        """Test rolling auto-caption lines are deduplicated."""
+        from quizzes.functions import parse_vtt
+        segments = parse_vtt(self.VTT)
+        self.assertEqual(
+            [s['text'] for s in segments],
+            ['Hello world', 'this is & a test']
+        )
+        self.assertEqual(segments[1]['start'], 2.01)
+
+    def test_parse_srv(self):
+        """Test srv1 and srv3 captions are converted to segments."""
+        from quizzes.functions import parse_srv
+        srv1 = (
+            '<transcript><text start="1.5" dur="2">First</text>'
+            '<text start="3.5" dur="1">Second</text></transcript>'
+        )
+        srv3 = (
+            '<timedtext><body><p t="1500" d="2000"><s>First</s>'
+            '<s> line</s></p></body></timedtext>'
+        )
+        self.assertEqual(parse_srv(srv1)[1], {
+            'start': 3.5, 'end': 4.5, 'text': 'Second'
+        })
+        self.assertEqual(parse_srv(srv3)[0]['text'], 'First line')
+
+    def test_select_caption_track_prefers_manual(self):
+        """Test manual subtitles win over automatic captions."""
+        from quizzes.functions import select_caption_track
+        info = {
+            'language': 'en',
+            'subtitles': {'en': [
+                {'ext': 'json3', 'url': 'j'}, {'ext': 'vtt', 'url': 'm'}
+            ]},
+            'automatic_captions': {'en': [{'ext': 'vtt', 'url': 'a'}]},
+        }
+        track, language = select_caption_track(info)
+        self.assertEqual(track['url'], 'm')
+        self.assertEqual(language, 'en')
+        self.assertEqual(select_caption_track({}), (None, None))
+
+    def test_translated_automatic_captions_ignored(self):
+        """Test only original-language automatic captions are used."""
+        from quizzes.functions import select_caption_track
+        translated = {'de': [{'ext': 'vtt', 'url': 'de'}]}
+        info = {'language': 'fr', 'automatic_captions': {
+            **translated, 'fr-orig': [{'ext': 'vtt', 'url': 'orig'}]
+        }}
+        self.assertEqual(select_caption_track(info)[0]['url'], 'orig')
+        self.assertEqual(select_caption_track(info)[1], 'fr')
+        for language in ('fr', None):
+            info = {'language': language, 'automatic_captions': translated}
+            self.assertEqual(select_caption_track(info), (None, None))
+
+    @patch('quizzes.functions.transcribe_youtube_video')
+    @patch('quizzes.functions.download_captions')
+    @patch('quizzes.functions.get_video_info')
+    def test_prefer_captions_skips_whisper(
+        self, mock_info, mock_captions, mock_transcribe
+    ):
+        """Test available captions are used and stored."""
+        from quizzes.functions import get_transcript, CAPTION_MODEL_NAME
+        mock_info.return_value = {
+            'automatic_captions': {'de-orig': [{'ext': 'vtt', 'url': 'a'}]}
+        }
+        mock_captions.return_value = {
+            'text': 'Caption text', 'segments': [], 'language': 'de'
+        }
+        self.assertEqual(get_transcript('abc'), 'Caption text')
+        mock_transcribe.assert_not_called()
+        self.assertTrue(Transcript.objects.filter(
+            video_id='abc', model_name=CAPTION_MODEL_NAME
+        ).exists())
+
+    @patch('quizzes.functions.get_video_info')
+    def test_captions_only_without_captions(self, mock_info):
+        """Test captions_only fails when the video has no captions."""
+        from quizzes.functions import get_transcript, CAPTIONS_ONLY
+        mock_info.return_value = {'id': 'abc'}
+        with self.assertRaises(ValueError):
+            get_transcript('abc', source=CAPTIONS_ONLY)
+
+    @patch('quizzes.functions.transcribe_youtube_video')
+    @patch('quizzes.functions.fetch_caption_transcript')
+    def test_whisper_only_ignores_captions(
+        self, mock_captions, mock_transcribe
+    ):
+        """Test whisper_only never looks at captions."""
+        from quizzes.functions import get_transcript, WHISPER_ONLY
+        mock_transcribe.return_value = 'Whisper text'
+        result = get_transcript('abc', source=WHISPER_ONLY)
+        self.assertEqual(result, 'Whisper text')
+        mock_captions.assert_not_called()
 
 
 class CreateQuizViewTests(TestCase):
@@ -372,31 +1815,51 @@ class CreateQuizViewTests(TestCase):
         refresh = RefreshToken.for_user(self.user)
         self.client.cookies['access_token'] = str(refresh.access_token)
 
-    @patch('quizzes.api.views.create_quiz_from_url')
-    def test_create_quiz_success(self, mock_create_quiz):
-        """Test successful quiz creation."""
-        mock_create_quiz.return_value = (
-            {
-                'title': 'Test Quiz',
-                'description': 'Test Description',
-                'questions': [
-                    {
-                        'question': 'Q1',
-                        'options': ['A', 'B', 'C', 'D'],
-                        'answer': 'A'
-                    }
-                ]
-            },
-            'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
-        )
+    @patch('quizzes.api.views.enqueue_quiz_job')
+    def test_create_quiz_success(self, mock_enqueue):
+        """Test quiz creation is queued as a background job."""
         response = self.client.post(
             '/api/createQuiz/',
             {'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'},
             format='json'
         )
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(response.data['title'], 'Test Quiz')
-        self.assertTrue(Quiz.objects.filter(title='Test Quiz').exists())
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'pending')
+        job = QuizJob.objects.get(id=response.data['id'])
+        self.assertEqual(job.user, self.user)
+        mock_enqueue.assert_called_once_with(job)
+
+    @patch('quizzes.api.views.enqueue_quiz_job')
+    def test_create_quiz_with_transcript_source(self, mock_enqueue):
+        """Test the transcript source policy is stored on the job."""
+        response = self.client.post(
+            '/api/createQuiz/',
+            {
+                'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+                'transcript_source': 'whisper_only'
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = QuizJob.objects.get(id=response.data['id'])
+        self.assertEqual(job.transcript_source, 'whisper_only')
+
+    @patch('quizzes.api.views.enqueue_quiz_job')
+    @patch('quizzes.functions.resolve_video_info')
+    def test_create_quiz_rejects_long_video(self, mock_resolve, mock_enqueue):
+        """Test oversized videos are refused before a job is queued."""
+        mock_resolve.return_value = {'id': 'dQw4w9WgXcQ', 'duration': 7200}
+        url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+        with self.settings(VIDEO_MAX_DURATION=3600):
+            response = self.client.post(
+                '/api/createQuiz/', {'url': url}, format='json'
+            )
+        self.assertEqual(
+            response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        self.assertIn('3600 seconds', response.data['detail'])
+        self.assertFalse(QuizJob.objects.exists())
+        mock_enqueue.assert_not_called()
 
     def test_create_quiz_invalid_url(self):
         """Test quiz creation with invalid URL."""
@@ -417,18 +1880,236 @@ class CreateQuizViewTests(TestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
-    @patch('quizzes.api.views.create_quiz_from_url')
-    def test_create_quiz_error_handling(self, mock_create_quiz):
-        """Test quiz creation error handling."""
-        mock_create_quiz.side_effect = Exception(
-            'API Error'
+    def test_create_quiz_schedules_on_commit(self):
+        """Test the job is handed to the worker pool after commit."""
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(
+                '/api/createQuiz/',
+                {'url': 'https://www.youtube.com/watch?v=test'},
+                format='json'
+            )
+        self.assertEqual(len(callbacks), 1)
+
+
+@patch('quizzes.api.views.enqueue_quiz_job')
+class QuizAdmissionTests(TestCase):
+    """Tests for per-user and global limits on quiz creation."""
+
+    url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+
+    def setUp(self):
+        """Set up an authenticated client and a second user."""
+        self.client = APIClient()
+        self.user = User.objects.create_user('limited', password='test')
+        self.other = User.objects.create_user('other', password='test')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.cookies['access_token'] = str(refresh.access_token)
+
+    def create(self):
+        """Request a new quiz."""
+        return self.client.post(
+            '/api/createQuiz/', {'url': self.url}, format='json'
         )
-        response = self.client.post(
-            '/api/createQuiz/',
-            {'url': 'https://www.youtube.com/watch?v=test'},
-            format='json'
+
+    def add_job(self, user, status=QuizJob.Status.PENDING, **fields):
+        """Create a job row for a user."""
+        return QuizJob.objects.create(
+            user=user, url=self.url, status=status, **fields
+        )
+
+    def test_active_jobs_per_user_limited(self, mock_enqueue):
+        """Test a user with a job in flight is asked to retry later."""
+        self.add_job(
+            self.other, QuizJob.Status.SUCCEEDED,
+            metrics={'stages': {'transcribing': 20, 'generating': 10}}
         )
+        self.add_job(self.user)
+        with self.settings(QUIZ_MAX_ACTIVE_JOBS_PER_USER=1):
+            response = self.create()
         self.assertEqual(
-            response.status_code,
-            status.HTTP_500_INTERNAL_SERVER_ERROR)
-        self.assertIn('Error creating quiz', response.data['detail'])
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(QuizJob.objects.filter(user=self.user).count(), 1)
+        mock_enqueue.assert_not_called()
+
+    def test_orphaned_job_not_counted(self, mock_enqueue):
+        """Test a job without heartbeat since a restart frees its slot."""
+        from datetime import timedelta
+        from django.utils import timezone
+        job = self.add_job(self.user, QuizJob.Status.RUNNING)
+        QuizJob.objects.filter(pk=job.pk).update(
+            updated_at=timezone.now() - timedelta(minutes=10)
+        )
+        with self.settings(QUIZ_MAX_ACTIVE_JOBS_PER_USER=1):
+            response = self.create()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+    @patch('quizzes.functions.resolve_video_info')
+    def test_refused_before_preflight(self, mock_resolve, mock_enqueue):
+        """Test a refused request does not fetch video metadata."""
+        self.add_job(self.user)
+        with self.settings(
+            QUIZ_MAX_ACTIVE_JOBS_PER_USER=1, VIDEO_MAX_DURATION=3600
+        ):
+            response = self.create()
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        mock_resolve.assert_not_called()
+
+    @patch('quizzes.functions.resolve_video_info')
+    def test_failed_preflight_removes_job(self, mock_resolve, mock_enqueue):
+        """Test a pre-flight error leaves no pending job behind."""
+        mock_resolve.side_effect = OSError('network down')
+        with self.settings(VIDEO_MAX_DURATION=3600):
+            with self.assertRaises(OSError):
+                self.create()
+        self.assertFalse(QuizJob.objects.exists())
+        mock_enqueue.assert_not_called()
+
+    def test_finished_jobs_not_active(self, mock_enqueue):
+        """Test finished jobs do not count against the active limit."""
+        self.add_job(self.user, QuizJob.Status.FAILED)
+        with self.settings(QUIZ_MAX_ACTIVE_JOBS_PER_USER=1):
+            response = self.create()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+    def test_rate_limit_per_user(self, mock_enqueue):
+        """Test the rate window counts finished jobs as well."""
+        for _ in range(2):
+            self.add_job(self.user, QuizJob.Status.SUCCEEDED)
+        with self.settings(QUIZ_RATE_LIMIT=2, QUIZ_RATE_WINDOW=600):
+            response = self.create()
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertTrue(590 <= int(response['Retry-After']) <= 600)
+
+    def test_global_queue_depth(self, mock_enqueue):
+        """Test a full queue is reported as 503 for everyone."""
+        self.add_job(self.other, QuizJob.Status.RUNNING)
+        self.add_job(self.other)
+        with self.settings(
+            QUIZ_MAX_QUEUE_DEPTH=2, QUIZ_JOB_DEFAULT_SECONDS=40
+        ):
+            response = self.create()
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(response['Retry-After'], '40')
+
+
+class QuizJobTests(TestCase):
+    """Tests for background quiz jobs and the job status endpoint."""
+
+    def setUp(self):
+        """Set up test client, authenticated user and a pending job."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='TestPass123!'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.cookies['access_token'] = str(refresh.access_token)
+        self.job = QuizJob.objects.create(
+            user=self.user,
+            url='https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+        )
+
+    @patch('quizzes.jobs.create_quiz_from_url')
+    def test_execute_quiz_job_success(self, mock_create_quiz):
+        """Test a job runs the pipeline and links the created quiz."""
+        from quizzes.jobs import execute_quiz_job
+        mock_create_quiz.return_value = (
+            {
+                'title': 'Test Quiz',
+                'description': 'Test Description',
+                'questions': [
+                    {
+                        'question': 'Q1',
+                        'options': ['A', 'B', 'C', 'D'],
+                        'answer': 'A'
+                    }
+                ]
+            },
+            'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+        )
+        execute_quiz_job(self.job)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, QuizJob.Status.SUCCEEDED)
+        self.assertEqual(self.job.quiz.title, 'Test Quiz')
+        self.assertEqual(self.job.quiz.questions.count(), 1)
+        self.assertIn('saving', self.job.metrics['stages'])
+
+    @patch('quizzes.jobs.create_quiz_from_url')
+    def test_execute_quiz_job_failure(self, mock_create_quiz):
+        """Test pipeline errors are stored on the job."""
+        from quizzes.jobs import execute_quiz_job
+        mock_create_quiz.side_effect = Exception('API Error')
+        execute_quiz_job(self.job)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, QuizJob.Status.FAILED)
+        self.assertEqual(self.job.error, 'API Error')
+        self.assertIsNone(self.job.quiz)
+
+    def make_orphaned(self, job, status):
+        """Put a job in a state whose process stopped a day ago."""
+        from datetime import timedelta
+        from django.utils import timezone
+        QuizJob.objects.filter(pk=job.pk).update(
+            status=status, updated_at=timezone.now() - timedelta(days=1)
+        )
+
+    @patch('quizzes.jobs.submit_job')
+    def test_orphaned_jobs_recovered(self, mock_submit):
+        """Test orphaned pending jobs are re-queued once, running failed."""
+        from quizzes.jobs import ORPHANED_ERROR, recover_stale_jobs
+        running = QuizJob.objects.create(user=self.user, url=self.job.url)
+        self.make_orphaned(self.job, QuizJob.Status.PENDING)
+        self.make_orphaned(running, QuizJob.Status.RUNNING)
+        QuizJob.objects.create(user=self.user, url=self.job.url)
+        self.assertEqual(recover_stale_jobs(), (1, 1))
+        mock_submit.assert_called_once_with(self.job.pk)
+        running.refresh_from_db()
+        self.assertEqual(running.status, QuizJob.Status.FAILED)
+        self.assertEqual(running.error, ORPHANED_ERROR)
+        self.assertEqual(recover_stale_jobs(), (0, 0))
+
+    def test_polled_orphaned_job_resolved(self):
+        """Test polling a job of a stopped process reports it failed."""
+        self.make_orphaned(self.job, QuizJob.Status.RUNNING)
+        response = self.client.get(f'/api/jobs/{self.job.id}/')
+        self.assertEqual(response.data['status'], 'failed')
+
+    def test_heartbeat_keeps_held_jobs_fresh(self):
+        """Test jobs held by this process are not taken for orphaned."""
+        from quizzes import jobs
+        self.make_orphaned(self.job, QuizJob.Status.RUNNING)
+        jobs._held_jobs.add(self.job.pk)
+        self.addCleanup(jobs._held_jobs.discard, self.job.pk)
+        jobs.send_heartbeat()
+        self.assertEqual(jobs.recover_stale_jobs(), (0, 0))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, QuizJob.Status.RUNNING)
+
+    def test_get_job_status(self):
+        """Test getting the state of an own job."""
+        response = self.client.get(f'/api/jobs/{self.job.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertIsNone(response.data['quiz'])
+
+    def test_get_other_user_job(self):
+        """Test jobs of other users are not visible."""
+        other_user = User.objects.create_user(
+            username='otheruser',
+            password='TestPass123!'
+        )
+        other_job = QuizJob.objects.create(
+            user=other_user,
+            url='https://www.youtube.com/watch?v=other'
+        )
+        response = self.client.get(f'/api/jobs/{other_job.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
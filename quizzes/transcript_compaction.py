@@ -0,0 +1,204 @@
+"""
+Token-budgeted transcript compaction before prompting.
+Transcripts are cleaned of caption noise ([Music]), fillers (um, äh)
+and stuttered words, split into sentence segments and stripped of
+repeated segments. A transcript still above TRANSCRIPT_TOKEN_BUDGET
+keeps its most informative segments by TF-IDF score, in their
+original order, so long videos fit a bounded prompt.
+"""
+import math
+import re
+from collections import Counter
+
+from .llm_providers import estimate_tokens
+
+# Only known caption tags are removed; other bracketed text ("Array
+# [0]") is content
+CAPTION_TAGS = (
+    r'music|applause|laughter|inaudible|silence|'
+    r'musik|applaus|gelächter|lachen|unverständlich'
+)
+NOISE_PATTERN = re.compile(
+    rf'\[\s*(?:{CAPTION_TAGS})\s*\]|\(\s*(?:{CAPTION_TAGS})\s*\)',
+    re.IGNORECASE
+)
+FILLER_PATTERN = re.compile(
+    r'(?:,\s*)?\b(?:u+h+|u+m+|e+r+m+|ä+h+m*|ö+h+m*)\b,?',
+    re.IGNORECASE
+)
+STUTTER_PATTERN = re.compile(r'\b([^\W\d_]+)(?:\s+\1\b)+', re.IGNORECASE)
+# Words that are legitimately said twice in a row ("die die Zeitung
+# liest", "had had", "what it is is")
+GRAMMATICAL_DOUBLES = frozenset({
+    'das', 'dem', 'den', 'der', 'des', 'die', 'sie', 'had', 'is', 'that',
+})
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+')
+WORD_PATTERN = re.compile(r'\w+')
+SEGMENT_MAX_WORDS = 60
+
+
+def collapse_stutter(match):
+    """
+    Reduce a stuttered word to one, keeping grammatical doublings.
+
+    Args:
+        match: STUTTER_PATTERN match
+
+    Returns:
+        str: Replacement text
+    """
+    word = match.group(1)
+    if word.casefold() in GRAMMATICAL_DOUBLES:
+        return match.group(0)
+    return word
+
+
+def normalize_transcript(text):
+    """
+    Remove caption noise, fillers and stutters and collapse whitespace.
+
+    Only known caption tags and unambiguous fillers are removed (not
+    "mm" or "hm", which are also units and abbreviations, nor phrases
+    like "you know" that can carry meaning), and only words repeated
+    without punctuation in between count as stutters; numbers are
+    never collapsed.
+
+    Args:
+        text: Raw transcript
+
+    Returns:
+        str: Cleaned transcript
+    """
+    text = NOISE_PATTERN.sub(' ', text)
+    text = FILLER_PATTERN.sub(' ', text)
+    text = STUTTER_PATTERN.sub(collapse_stutter, text)
+    text = re.sub(r'\s+', ' ', text)
+    return re.sub(r'\s+([,.!?;:])', r'\1', text).strip()
+
+
+def split_segments(text):
+    """
+    Split a transcript into sentences of at most SEGMENT_MAX_WORDS words.
+
+    Unpunctuated captions are cut into word windows instead.
+
+    Args:
+        text: Normalized transcript
+
+    Returns:
+        list: Segment strings
+    """
+    segments = []
+    for sentence in SENTENCE_PATTERN.split(text):
+        words = sentence.split()
+        segments.extend(
+            ' '.join(words[start:start + SEGMENT_MAX_WORDS])
+            for start in range(0, len(words), SEGMENT_MAX_WORDS)
+        )
+    return segments
+
+
+def drop_repeats(segments):
+    """
+    Keep only the first of segments with the same words.
+
+    Args:
+        segments: Segment strings
+
+    Returns:
+        list: Segments without repetitions (case and punctuation ignored)
+    """
+    seen, unique = set(), []
+    for segment in segments:
+        key = ' '.join(WORD_PATTERN.findall(segment.casefold()))
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(segment)
+    return unique
+
+
+def get_terms(segment):
+    """
+    Get the scoring terms of a segment.
+
+    Args:
+        segment: Segment string
+
+    Returns:
+        list: Lowercase words longer than two characters
+    """
+    return [
+        word for word in WORD_PATTERN.findall(segment.casefold())
+        if len(word) > 2
+    ]
+
+
+def score_segments(segments):
+    """
+    Score segments by the TF-IDF weight of their terms.
+
+    Each segment counts as a document, so words said throughout the
+    video weigh little. The sum is divided by the square root of the
+    segment length to favor dense over merely long segments.
+
+    Args:
+        segments: Segment strings
+
+    Returns:
+        list: Score per segment
+    """
+    terms = [get_terms(segment) for segment in segments]
+    frequency = Counter(term for words in terms for term in set(words))
+    count = len(segments)
+    return [
+        sum(math.log(count / frequency[term]) for term in words) /
+        math.sqrt(len(words) or 1)
+        for words in terms
+    ]
+
+
+def select_segments(segments, budget):
+    """
+    Pick the highest scoring segments that fit a token budget.
+
+    Args:
+        segments: Segment strings
+        budget: Maximum estimated tokens
+
+    Returns:
+        list: Selected segments in transcript order
+    """
+    scores = score_segments(segments)
+    ranked = sorted(range(len(segments)), key=lambda i: -scores[i])
+    chosen, used = [], 0
+    for index in ranked:
+        cost = estimate_tokens(segments[index]) + 1
+        if used + cost <= budget:
+            chosen.append(index)
+            used += cost
+    return [segments[index] for index in sorted(chosen)]
+
+
+def compact_transcript(text, budget):
+    """
+    Clean a transcript and shrink it to a token budget.
+
+    Args:
+        text: Raw transcript
+        budget: Maximum estimated tokens, 0 to only clean it
+
+    Returns:
+        tuple: (compacted transcript, stats dict with tokens_before,
+            tokens_after, segments and segments_kept)
+    """
+    segments = drop_repeats(split_segments(normalize_transcript(text)))
+    kept = segments
+    if budget and estimate_tokens(' '.join(segments)) > budget:
+        kept = select_segments(segments, budget)
+    compacted = ' '.join(kept)
+    return compacted, {
+        'tokens_before': estimate_tokens(text),
+        'tokens_after': estimate_tokens(compacted),
+        'segments': len(segments),
+        'segments_kept': len(kept),
+    }
@@ -0,0 +1,168 @@
+"""
+Whisper model registry and transcription entry point.
+Models are loaded lazily on first use (or via an explicit warm-up) so
+management commands and web workers do not pay the torch import and
+model load at startup.
+"""
+import logging
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def load_whisper_model(name):
+    """
+    Import Whisper and load a model from the local cache.
+
+    Args:
+        name: Whisper model name (e.g. 'base')
+
+    Returns:
+        whisper.Whisper: Loaded model
+    """
+    import whisper
+    return whisper.load_model(name)
+
+
+def get_whisper_model(name=None):
+    """
+    Get a loaded Whisper model, loading it once per process.
+
+    Args:
+        name: Whisper model name, defaults to WHISPER_MODEL_NAME
+
+    Returns:
+        whisper.Whisper: Shared model instance
+    """
+    name = name or settings.WHISPER_MODEL_NAME
+    model = _models.get(name)
+    if model is None:
+        with _models_lock:
+            model = _models.get(name)
+            if model is None:
+                model = load_whisper_model(name)
+                _models[name] = model
+    return model
+
+
+def warm_up_whisper():
+    """
+    Load the configured Whisper model ahead of the first transcription.
+    """
+    get_whisper_model()
+
+
+def warm_up_if_configured():
+    """
+    Warm up Whisper at server start when WHISPER_PRELOAD is enabled.
+    """
+    if settings.WHISPER_PRELOAD:
+        warm_up_whisper()
+
+
+def transcribe_locally(audio_file_path):
+    """
+    Transcribe a file on this machine without the transcription server.
+
+    Uses the parallel chunked engine when TRANSCRIPTION_PARALLELISM is
+    above 1, otherwise the in-process Whisper model.
+
+    Args:
+        audio_file_path: Path to audio file
+
+    Returns:
+        dict: Whisper result with text, segments and language
+    """
+    if settings.TRANSCRIPTION_PARALLELISM > 1:
+        from .parallel_transcription import transcribe_parallel
+        return transcribe_parallel(audio_file_path)
+    return get_whisper_model().transcribe(audio_file_path)
+
+
+def transcribe_with_fallback(remote, local):
+    """
+    Run a transcription on the server when configured, else locally.
+
+    Falls back to the local callable if the server is unreachable and
+    TRANSCRIPTION_SERVER_FALLBACK is enabled.
+
+    Args:
+        remote: Callable transcribing through the server
+        local: Callable transcribing in this process
+
+    Returns:
+        dict: Transcription result with text, segments and language
+    """
+    from .transcription_server import TranscriptionServerUnavailable
+    if not settings.TRANSCRIPTION_SERVER_ADDRESS:
+        return local()
+    try:
+        return remote()
+    except TranscriptionServerUnavailable:
+        if not settings.TRANSCRIPTION_SERVER_FALLBACK:
+            raise
+        logger.warning('Transcription server down, using local model')
+        return local()
+
+
+def transcribe_file(audio_file_path):
+    """
+    Transcribe a file via the transcription server when configured.
+
+    Args:
+        audio_file_path: Path to audio file
+
+    Returns:
+        dict: Transcription result with text, segments and language
+    """
+    from .transcription_server import transcribe_remote
+    return transcribe_with_fallback(
+        lambda: transcribe_remote(audio_file_path),
+        lambda: transcribe_locally(audio_file_path)
+    )
+
+
+def transcribe_stream_locally(blocks, duration=None):
+    """
+    Transcribe streamed samples on this machine.
+
+    With TRANSCRIPTION_PARALLELISM above 1, chunks are transcribed as
+    soon as they have arrived; otherwise the samples are collected
+    and passed to the in-process model.
+
+    Args:
+        blocks: Iterable of 16 kHz float32 sample blocks
+        duration: Expected audio length in seconds
+
+    Returns:
+        dict: Whisper result with text, segments and language
+    """
+    if settings.TRANSCRIPTION_PARALLELISM > 1:
+        from .parallel_transcription import transcribe_stream
+        return transcribe_stream(blocks)
+    from .audio_stream import collect_pcm
+    samples = collect_pcm(blocks, duration)
+    return get_whisper_model().transcribe(samples)
+
+
+def transcribe_pcm_stream(blocks, duration=None):
+    """
+    Transcribe streamed samples via the server when configured.
+
+    Args:
+        blocks: Iterable of 16 kHz float32 sample blocks
+        duration: Expected audio length in seconds
+
+    Returns:
+        dict: Transcription result with text, segments and language
+    """
+    from .transcription_server import transcribe_remote_stream
+    return transcribe_with_fallback(
+        lambda: transcribe_remote_stream(blocks, duration),
+        lambda: transcribe_stream_locally(blocks, duration)
+    )
@@ -0,0 +1,298 @@
+"""
+Local transcription daemon and its client.
+One server process owns a pool of Whisper models (or, with
+TRANSCRIPTION_PARALLELISM above 1, the chunked worker processes); web
+workers send it audio file paths or decoded samples over a Unix socket
+or localhost TCP instead of each loading their own copy of the model.
+
+Wire format: every message is a 4-byte big-endian length followed by
+a UTF-8 JSON document of that length. A request with a pcm_bytes key
+is followed by that many bytes of 16 kHz mono float32 samples.
+"""
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+
+import numpy as np
+from django.conf import settings
+
+from .audio_stream import collect_pcm
+from .parallel_transcription import transcribe_parallel
+from .utils import compact_segments
+
+HEADER = struct.Struct('>I')
+
+
+class TranscriptionServerUnavailable(OSError):
+    """
+    Raised when the transcription server cannot be reached.
+    """
+
+
+def parse_server_address(address):
+    """
+    Parse a transcription server address setting.
+
+    Args:
+        address: 'unix:/path/to/socket' or 'host:port'
+
+    Returns:
+        tuple: (socket_family, address) usable with socket.connect
+    """
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+    host, _, port = address.rpartition(':')
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+
+def recv_exactly(sock, size):
+    """
+    Read an exact number of bytes from a socket.
+
+    Args:
+        sock: Connected socket
+        size: Number of bytes to read
+
+    Returns:
+        bytes: Received data
+
+    Raises:
+        ConnectionError: If the peer closes the connection early
+    """
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError('Connection closed by peer')
+        data.extend(chunk)
+    return bytes(data)
+
+
+def send_message(sock, message):
+    """
+    Send a length-prefixed JSON message.
+
+    Args:
+        sock: Connected socket
+        message: JSON-serializable dictionary
+    """
+    payload = json.dumps(message).encode('utf-8')
+    sock.sendall(HEADER.pack(len(payload)) + payload)
+
+
+def recv_message(sock):
+    """
+    Receive a length-prefixed JSON message.
+
+    Args:
+        sock: Connected socket
+
+    Returns:
+        dict: Decoded message
+    """
+    (size,) = HEADER.unpack(recv_exactly(sock, HEADER.size))
+    return json.loads(recv_exactly(sock, size).decode('utf-8'))
+
+
+def result_to_message(result):
+    """
+    Reduce a Whisper result to its JSON-safe essentials.
+
+    Args:
+        result: Whisper transcription result
+
+    Returns:
+        dict: Result with text, language and compact segments
+    """
+    return {
+        'text': result['text'],
+        'language': result.get('language') or '',
+        'segments': compact_segments(result.get('segments', [])),
+    }
+
+
+class TranscriptionHandler(socketserver.BaseRequestHandler):
+    """
+    Handle one transcription request using a model from the pool.
+    """
+
+    def read_audio(self, request):
+        """
+        Get the audio to transcribe from a request.
+
+        Args:
+            request: Decoded request message
+
+        Returns:
+            str or numpy.ndarray: Audio file path or received samples
+        """
+        if 'pcm_bytes' not in request:
+            return request['audio_path']
+        data = recv_exactly(self.request, request['pcm_bytes'])
+        return np.frombuffer(data, dtype=np.float32).copy()
+
+    def transcribe(self, audio):
+        """
+        Transcribe audio with the chunked engine or a pooled model.
+
+        With TRANSCRIPTION_PARALLELISM above 1 the server's Whisper
+        worker processes do the work, so only the server runs them.
+
+        Args:
+            audio: Audio file path or 16 kHz samples
+
+        Returns:
+            dict: Whisper result with text, segments and language
+        """
+        if settings.TRANSCRIPTION_PARALLELISM > 1:
+            return transcribe_parallel(audio)
+        model = self.server.models.get()
+        try:
+            return model.transcribe(audio)
+        finally:
+            self.server.models.put(model)
+
+    def handle(self):
+        """
+        Transcribe the requested audio and reply with the result.
+        """
+        audio = self.read_audio(recv_message(self.request))
+        try:
+            result = self.transcribe(audio)
+            reply = {'ok': True, 'result': result_to_message(result)}
+        except Exception as e:
+            reply = {'ok': False, 'error': str(e)}
+        send_message(self.request, reply)
+
+
+class UnixTranscriptionServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Threaded transcription server listening on a Unix socket.
+    """
+    daemon_threads = True
+
+
+class TCPTranscriptionServer(socketserver.ThreadingTCPServer):
+    """
+    Threaded transcription server listening on localhost TCP.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def create_transcription_server(address, models):
+    """
+    Create a server whose requests share a fixed pool of models.
+
+    Args:
+        address: Server address setting ('unix:/path' or 'host:port')
+        models: List of loaded Whisper models
+
+    Returns:
+        socketserver.BaseServer: Bound server, not yet serving
+    """
+    family, bind_address = parse_server_address(address)
+    if family == socket.AF_UNIX:
+        if os.path.exists(bind_address):
+            os.remove(bind_address)
+        server = UnixTranscriptionServer(bind_address, TranscriptionHandler)
+    else:
+        server = TCPTranscriptionServer(bind_address, TranscriptionHandler)
+    server.models = queue.Queue()
+    for model in models:
+        server.models.put(model)
+    return server
+
+
+def connect_to_server(address):
+    """
+    Open a connection to the transcription server.
+
+    Args:
+        address: Server address ('unix:/path' or 'host:port')
+
+    Returns:
+        socket.socket: Connected socket
+
+    Raises:
+        TranscriptionServerUnavailable: If the connection fails
+    """
+    family, connect_address = parse_server_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(settings.TRANSCRIPTION_SERVER_TIMEOUT)
+    try:
+        sock.connect(connect_address)
+    except OSError as e:
+        sock.close()
+        raise TranscriptionServerUnavailable(str(e)) from e
+    return sock
+
+
+def read_reply(sock):
+    """
+    Receive the server's reply and unpack the result.
+
+    Args:
+        sock: Connected socket with a request already sent
+
+    Returns:
+        dict: Result with text, language and segments
+
+    Raises:
+        RuntimeError: If the server reports a transcription error
+    """
+    reply = recv_message(sock)
+    if not reply['ok']:
+        raise RuntimeError(reply['error'])
+    return reply['result']
+
+
+def transcribe_remote(audio_file_path, address=None):
+    """
+    Transcribe a file through the transcription server.
+
+    Args:
+        audio_file_path: Path to an audio file readable by the server
+        address: Server address, defaults to the setting
+
+    Returns:
+        dict: Result with text, language and segments
+
+    Raises:
+        TranscriptionServerUnavailable: If the server cannot be reached
+        RuntimeError: If the server reports a transcription error
+    """
+    address = address or settings.TRANSCRIPTION_SERVER_ADDRESS
+    with connect_to_server(address) as sock:
+        send_message(sock, {'audio_path': os.path.abspath(audio_file_path)})
+        return read_reply(sock)
+
+
+def transcribe_remote_stream(blocks, duration=None, address=None):
+    """
+    Transcribe streamed samples through the transcription server.
+
+    The connection is opened before the stream is consumed, so an
+    unreachable server leaves the stream untouched for a fallback.
+
+    Args:
+        blocks: Iterable of 16 kHz float32 sample blocks
+        duration: Expected audio length in seconds
+        address: Server address, defaults to the setting
+
+    Returns:
+        dict: Result with text, language and segments
+
+    Raises:
+        TranscriptionServerUnavailable: If the server cannot be reached
+        RuntimeError: If the server reports a transcription error
+    """
+    address = address or settings.TRANSCRIPTION_SERVER_ADDRESS
+    with connect_to_server(address) as sock:
+        samples = collect_pcm(blocks, duration)
+        send_message(sock, {'pcm_bytes': samples.nbytes})
+        sock.sendall(memoryview(np.ascontiguousarray(samples)).cast('B'))
+        return read_reply(sock)
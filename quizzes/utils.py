@@ -1,18 +1,58 @@
 """
 Utility functions for quizzes app.
 """
+from functools import partial
 
+from django.db import transaction
 
-def create_question_in_db(quiz, q_data):
+from .quiz_cache import cache_new_quizzes
+
+
+QUESTION_KEYS = ('question', 'options', 'answer')
+
+# Columns serialized by QuizSerializer and QuestionSerializer
+QUIZ_COLUMNS = (
+    'id', 'title', 'description', 'video_url', 'created_at', 'updated_at'
+)
+QUESTION_COLUMNS = (
+    'id', 'quiz', 'question_title', 'question_options', 'answer',
+    'created_at', 'updated_at'
+)
+
+
+def validate_quiz_data(quiz_data):
     """
-    Create a single question for a quiz.
+    Check quiz data before anything is written to the database.
 
     Args:
-        quiz: Quiz model instance
+        quiz_data: Dictionary with title, description, questions
+
+    Raises:
+        ValueError: If the title or a question key is missing
+    """
+    if not quiz_data.get('title'):
+        raise ValueError("Quiz data has no title")
+    for number, q_data in enumerate(quiz_data.get('questions', []), 1):
+        missing = [key for key in QUESTION_KEYS if key not in q_data]
+        if missing:
+            raise ValueError(f"Question {number} is missing {missing}")
+        if not isinstance(q_data['options'], list):
+            raise ValueError(f"Question {number} options are not a list")
+
+
+def build_question(quiz, q_data):
+    """
+    Build an unsaved question for a quiz.
+
+    Args:
+        quiz: Saved Quiz model instance
         q_data: Dictionary with question, options, answer keys
+
+    Returns:
+        Question: Unsaved question model instance
     """
     from .models import Question
-    Question.objects.create(
+    return Question(
         quiz=quiz,
         question_title=q_data['question'],
         question_options=q_data['options'],
@@ -20,9 +60,27 @@ def create_question_in_db(quiz, q_data):
     )
 
 
-def create_quiz_in_db(user, quiz_data, url):
+def build_questions(quizzes, entries):
     """
-    Create quiz and questions in database.
+    Build the unsaved questions of freshly saved quizzes.
+
+    Args:
+        quizzes: Saved Quiz instances
+        entries: (user, quiz_data, url) tuples in the same order
+
+    Returns:
+        list: Unsaved question model instances
+    """
+    return [
+        build_question(quiz, q_data)
+        for quiz, (_, quiz_data, _) in zip(quizzes, entries)
+        for q_data in quiz_data.get('questions', [])
+    ]
+
+
+def build_quiz(user, quiz_data, url):
+    """
+    Build an unsaved quiz.
 
     Args:
         user: User model instance
@@ -30,15 +88,272 @@ def create_quiz_in_db(user, quiz_data, url):
         url: YouTube video URL string
 
     Returns:
-        Quiz: Created quiz model instance
+        Quiz: Unsaved quiz model instance
     """
     from .models import Quiz
-    quiz = Quiz.objects.create(
+    return Quiz(
         user=user,
         title=quiz_data['title'],
         description=quiz_data.get('description', ''),
         video_url=url
     )
-    for q_data in quiz_data['questions']:
-        create_question_in_db(quiz, q_data)
-    return quiz
+
+
+def create_quiz_in_db(user, quiz_data, url):
+    """
+    Create quiz and questions in database.
+
+    All questions are validated first and written with one bulk insert
+    in the same transaction as the quiz, so a bad question never
+    leaves a partial quiz behind.
+
+    Args:
+        user: User model instance
+        quiz_data: Dictionary with title, description, questions
+        url: YouTube video URL string
+
+    Returns:
+        Quiz: Created quiz model instance
+
+    Raises:
+        ValueError: If the quiz data is incomplete
+    """
+    return create_quizzes_in_db([(user, quiz_data, url)])[0]
+
+
+def create_quizzes_in_db(entries):
+    """
+    Create many quizzes with their questions in one transaction.
+
+    Intended for batch imports: quizzes and questions are each written
+    with a single bulk insert. Their rendered payloads are cached once
+    the transaction commits.
+
+    Args:
+        entries: Iterable of (user, quiz_data, url) tuples
+
+    Returns:
+        list: Created quiz model instances in input order
+
+    Raises:
+        ValueError: If any quiz data is incomplete (nothing is saved)
+    """
+    from .models import Question, Quiz
+    entries = list(entries)
+    for _, quiz_data, _ in entries:
+        validate_quiz_data(quiz_data)
+    with transaction.atomic():
+        quizzes = Quiz.objects.bulk_create(
+            [build_quiz(*entry) for entry in entries]
+        )
+        Question.objects.bulk_create(build_questions(quizzes, entries))
+    transaction.on_commit(partial(cache_new_quizzes, quizzes))
+    return quizzes
+
+
+def get_user_quizzes(user, with_questions=True):
+    """
+    Get a user's quizzes with their questions in two queries.
+
+    Questions are prefetched in order and both querysets only load the
+    serialized columns, so listing quizzes does not cost one query per
+    quiz.
+
+    Args:
+        user: User model instance
+        with_questions: Prefetch questions (skip if not serialized)
+
+    Returns:
+        QuerySet: User's quizzes with prefetched questions
+    """
+    from django.db.models import Prefetch
+    from .models import Question, Quiz
+    quizzes = Quiz.objects.filter(user=user).only(*QUIZ_COLUMNS, 'user')
+    if not with_questions:
+        return quizzes
+    questions = Question.objects.only(*QUESTION_COLUMNS).order_by('id')
+    return quizzes.prefetch_related(
+        Prefetch('questions', queryset=questions)
+    )
+
+
+def get_user_quiz_summaries(user):
+    """
+    Get a user's quizzes as summary rows with their question count.
+
+    Question rows are only counted in the database, never loaded.
+
+    Args:
+        user: User model instance
+
+    Returns:
+        QuerySet: Dictionaries with the summary columns
+    """
+    from django.db.models import Count
+    from .models import Quiz
+    return Quiz.objects.filter(user=user).annotate(
+        question_count=Count('questions')
+    ).values(*QUIZ_COLUMNS, 'question_count')
+
+
+def get_question_states(quiz_ids):
+    """
+    Get the question count and latest update of each quiz.
+
+    Only the given quizzes' questions are aggregated, so a list page
+    can be paginated on the plain quiz index first.
+
+    Args:
+        quiz_ids: Quiz primary keys
+
+    Returns:
+        dict: (question_count, question_updated) by quiz primary key
+    """
+    from django.db.models import Count, Max
+    from .models import Question
+    rows = Question.objects.filter(quiz_id__in=quiz_ids).values(
+        'quiz_id'
+    ).annotate(count=Count('id'), updated=Max('updated_at')).order_by()
+    return {row['quiz_id']: (row['count'], row['updated']) for row in rows}
+
+
+def get_quiz_list_state(user):
+    """
+    Get cheap change indicators for all quizzes of a user.
+
+    Args:
+        user: User model instance
+
+    Returns:
+        dict: Counts and latest updated_at of quizzes and questions
+    """
+    from django.db.models import Count, Max
+    from .models import Question, Quiz
+    quizzes = Quiz.objects.filter(user=user).aggregate(
+        quiz_count=Count('id'), quiz_updated=Max('updated_at')
+    )
+    questions = Question.objects.filter(quiz__user=user).aggregate(
+        question_count=Count('id'), question_updated=Max('updated_at')
+    )
+    return {**quizzes, **questions}
+
+
+def get_quiz_state(user, pk):
+    """
+    Get cheap change indicators for one quiz and its questions.
+
+    Args:
+        user: User model instance owning the quiz
+        pk: Primary key of the quiz
+
+    Returns:
+        dict: Quiz updated_at, question count and latest question
+            updated_at (quiz_updated is None if there is no such quiz)
+    """
+    from django.db.models import Count, Max
+    from .models import Quiz
+    return Quiz.objects.filter(user=user, pk=pk).aggregate(
+        quiz_updated=Max('updated_at'),
+        question_count=Count('questions'),
+        question_updated=Max('questions__updated_at')
+    )
+
+
+def get_cached_transcript(video_id, model_name):
+    """
+    Look up a stored transcript for a video.
+
+    Args:
+        video_id: YouTube video ID string
+        model_name: Name of the transcription model
+
+    Returns:
+        Transcript: Stored transcript or None if not cached
+    """
+    from .models import Transcript
+    return Transcript.objects.filter(
+        video_id=video_id,
+        model_name=model_name
+    ).first()
+
+
+def compact_segments(segments):
+    """
+    Keep only timing and text of transcription segments.
+
+    Args:
+        segments: List of segment dictionaries from Whisper
+
+    Returns:
+        list: Segments with start, end and text keys
+    """
+    return [
+        {'start': s['start'], 'end': s['end'], 'text': s['text']}
+        for s in segments
+    ]
+
+
+def store_transcript(video_id, model_name, result):
+    """
+    Persist a transcription result for later requests.
+
+    Args:
+        video_id: YouTube video ID string
+        model_name: Name of the transcription model
+        result: Dictionary with text, segments and language keys
+
+    Returns:
+        Transcript: Stored (or concurrently created) transcript
+    """
+    from .models import Transcript
+    transcript, _ = Transcript.objects.get_or_create(
+        video_id=video_id,
+        model_name=model_name,
+        defaults={
+            'language': result.get('language') or '',
+            'text': result['text'],
+            'segments': compact_segments(result.get('segments', [])),
+        }
+    )
+    return transcript
+
+
+def quiz_to_quiz_data(quiz):
+    """
+    Convert a stored quiz back into pipeline quiz data.
+
+    Args:
+        quiz: Quiz model instance
+
+    Returns:
+        dict: Quiz data in create_quiz_in_db format
+    """
+    return {
+        'title': quiz.title,
+        'description': quiz.description,
+        'questions': [
+            {
+                'question': q.question_title,
+                'options': q.question_options,
+                'answer': q.answer,
+            }
+            for q in quiz.questions.all()
+        ],
+    }
+
+
+def get_quiz_data_for_video(video_url):
+    """
+    Get quiz data of the latest quiz created for a video.
+
+    Args:
+        video_url: Normalized YouTube URL string
+
+    Returns:
+        dict: Quiz data in create_quiz_in_db format or None
+    """
+    from .models import Quiz
+    quiz = Quiz.objects.filter(
+        video_url=video_url
+    ).prefetch_related('questions').first()
+    return quiz_to_quiz_data(quiz) if quiz else None